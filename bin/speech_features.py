@@ -159,10 +159,26 @@ def parser_config(subparsers, epilog):
         '--no-cmvn', action='store_true',
         help='Configure without CMVN normalization')
 
+    group.add_argument(
+        '--sliding-cmvn', action='store_true',
+        help='Configure with sliding-window CMVN normalization on each '
+        'utterance instead of normalization by speaker or utterance')
+
     group.add_argument(
         '--no-delta', action='store_true',
         help='Configure without deltas extraction')
 
+    group.add_argument(
+        '--dtype', choices=['float64', 'float32', 'float16'], default=None,
+        help='Configure the precision of the extracted features. '
+        'By default use the precision of the features processors.')
+
+    group.add_argument(
+        '--chunk-duration', type=float, default=None, metavar='<float>',
+        help='Configure the extraction of utterances longer than this '
+        'duration (in seconds) by chunks, to bound the memory used on '
+        'very long utterances. By default process utterances as a whole.')
+
 
 def command_config(args):
     config = pipeline.get_default_config(
@@ -170,7 +186,10 @@ def command_config(args):
         to_yaml=True, yaml_commented=not args.no_comments,
         with_pitch=not args.no_pitch,
         with_cmvn=not args.no_cmvn,
-        with_delta=not args.no_delta)
+        with_delta=not args.no_delta,
+        sliding_cmvn=args.sliding_cmvn,
+        dtype=args.dtype,
+        chunk_duration=args.chunk_duration)
 
     output = sys.stdout if not args.output else open(args.output, 'w')
     output.write(config)
@@ -259,8 +278,9 @@ def command_extract(args):
         args.config, open(args.utts_index, 'r'), njobs=args.njobs, log=log)
 
     # save the features
+    # features are already validated by the pipeline
     log.info('saving the features to %s', output_file)
-    features.save(output_file)
+    features.save(output_file, validate=False)
 
 
 @utils.CatchExceptions
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""Compare the performances of audio resampling backends
+
+Comparison is on resampling speed and on the distance to the sox
+output (the signal to noise ratio, in dB, of each backend output
+relative to the sox one).
+
+"""
+
+import argparse
+import datetime
+import os
+import numpy as np
+import tabulate
+
+from shennong.audio import Audio
+from shennong.utils import list_files_with_extension
+
+
+BACKENDS = ('polyphase', 'sox', 'scipy')
+
+
+def snr(reference, signal):
+    """Signal to noise ratio of `signal` relative to `reference` in dB"""
+    size = min(reference.nsamples, signal.nsamples)
+    reference = reference.data[:size].astype(np.float64)
+    noise = signal.data[:size].astype(np.float64) - reference
+    return 10 * np.log10((reference ** 2).sum() / (noise ** 2).sum())
+
+
+def analyze_backend(audio_data, sample_rate, backend):
+    print('resampling to {}Hz with {}...'.format(sample_rate, backend))
+    t1 = datetime.datetime.now()
+    resampled = {
+        k: v.resample(sample_rate, backend=backend)
+        for k, v in audio_data.items()}
+    t2 = datetime.datetime.now()
+    print('took {}'.format(t2 - t1))
+    return t2 - t1, resampled
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,)
+    parser.add_argument(
+        'data_dir', help='input directory with wavs')
+    parser.add_argument(
+        'sample_rate', type=int, default=8000, nargs='?',
+        help='sample rate to resample the wavs to, default to %(default)s')
+
+    args = parser.parse_args()
+
+    if not Audio._sox_found():
+        print('sox not found, the sox backend falls back to polyphase')
+
+    # load audio data and compute total duration
+    audio_data = {
+        os.path.basename(f): Audio.load(f)
+        for f in list_files_with_extension(args.data_dir, '.wav')}
+    total_duration = datetime.timedelta(
+        seconds=int(sum(a.duration for a in audio_data.values())))
+    print('found {} wav files, total duration of {}'
+          .format(len(audio_data), str(total_duration)))
+
+    results = {
+        backend: analyze_backend(audio_data, args.sample_rate, backend)
+        for backend in BACKENDS}
+
+    reference = results['sox'][1]
+    print('total duration: {}'.format(total_duration))
+    print(
+        tabulate.tabulate(
+            [[backend, str(time), '{:.1f}'.format(np.mean(
+                [snr(reference[k], v) for k, v in resampled.items()]))
+              if backend != 'sox' else '-']
+             for backend, (time, resampled) in results.items()],
+            headers=['backend', 'time', 'snr to sox (dB)'],
+            tablefmt='fancy_grid'))
+
+
+if __name__ == '__main__':
+    main()
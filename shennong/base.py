@@ -23,6 +23,15 @@ class BaseProcessor(object):
     def __repr__(self):
         return self.__class__.__name__
 
+    def __getstate__(self):
+        # processors may wrap Kaldi objects that cannot be pickled, so
+        # they are pickled as their parameters and instanciated again
+        # when unpickled
+        return self.get_params(deep=False)
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
     @classmethod
     def _get_param_names(cls):
         """Get parameter names for the processor"""
@@ -1,3 +1,4 @@
 """Speech features extraction and manipulation"""
 
-from shennong.features.features import Features, FeaturesCollection
+from shennong.features.features import (
+    Features, FeaturesCollection, LazyFeaturesCollection, RegularTimes)
@@ -2,26 +2,262 @@
 
 
 import collections
+import collections.abc
+import contextlib
 import copy
 import logging
+import threading
 import numpy as np
 
 from shennong.features.serializers import get_serializer
-from shennong.utils import dict_equal
+from shennong.utils import LRUCache, dict_equal, freeze, intern_dict
+
+
+class RegularTimes:
+    """A compact representation of regularly spaced frames timestamps
+
+    The frames produced by the processors are regularly spaced in
+    time: the frame `n` starts at ``offset + n * shift`` and ends
+    ``length`` seconds later. Instead of an array of shape [nframes,
+    2], a RegularTimes stores those four numbers. It is given as
+    `times` to :class:`Features` and the timestamps array is built
+    only when required, by :attr:`Features.times`.
+
+    Parameters
+    ----------
+    offset : float
+        The start time of the first frame, in seconds
+    shift : float
+        The shift between two successive frames, in seconds
+    length : float
+        The duration of a frame, in seconds
+    nframes : int
+        The number of frames
+
+    """
+    def __init__(self, offset, shift, length, nframes):
+        self.offset = float(offset)
+        self.shift = float(shift)
+        self.length = float(length)
+        self.nframes = int(nframes)
+
+    def __repr__(self):
+        return (
+            'RegularTimes(offset={}, shift={}, length={}, nframes={})'
+            .format(self.offset, self.shift, self.length, self.nframes))
+
+    def __eq__(self, other):
+        if not isinstance(other, RegularTimes):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.to_array()
+        return array if dtype is None else array.astype(dtype)
+
+    def _key(self):
+        return self.offset, self.shift, self.length, self.nframes
+
+    @property
+    def ndim(self):
+        """The number of dimensions of the timestamps array, always 2"""
+        return 2
+
+    @property
+    def shape(self):
+        """The shape of the timestamps array, as (nframes, 2)"""
+        return (self.nframes, 2)
+
+    def resize(self, nframes):
+        """Returns the same time axis with `nframes` frames"""
+        return RegularTimes(self.offset, self.shift, self.length, nframes)
+
+    def to_array(self):
+        """Returns the timestamps as an array of shape [nframes, 2]"""
+        frames = np.arange(self.nframes)
+        start = frames * self.shift
+        if self.offset:
+            # an offset on the frames grid (as for sliced or online
+            # times) gives the exact same timestamps as the whole grid
+            first = round(self.offset / self.shift) if self.shift else 0
+            if first * self.shift == self.offset:
+                start = (frames + first) * self.shift
+            else:
+                start = start + self.offset
+        return np.vstack((start, start + self.length)).T
+
+
+def _trim_times(times, nframes):
+    """Returns the `nframes` first frames of the `times`"""
+    if isinstance(times, RegularTimes):
+        return times.resize(nframes)
+    return times[:nframes]
+
+
+def _times_close(times1, times2):
+    """Returns True if `times1` and `times2` are almost equal"""
+    if isinstance(times1, RegularTimes) and isinstance(times2, RegularTimes):
+        if times1.nframes != times2.nframes:
+            return False
+        # the timestamps are linear in the frame index, comparing the
+        # first and last frames is enough
+        return times1.nframes == 0 or np.allclose(
+            _bounds(times1), _bounds(times2))
+    return np.allclose(np.asarray(times1), np.asarray(times2))
+
+
+def _bounds(times):
+    """Returns the first and last frames of regular `times`"""
+    start = np.asarray([0, times.nframes - 1]) * times.shift + times.offset
+    return np.vstack((start, start + times.length)).T
+
+
+def _frames_range(times, tstart, tstop):
+    """Returns the frames whose center is in [`tstart`, `tstop`[
+
+    `tstart` and `tstop` are floats or arrays of floats (possibly
+    infinite). Returns the indices of the first and the last + 1
+    frames in the range.
+
+    """
+    if isinstance(times, RegularTimes) and times.shift > 0:
+        # arithmetic on the regular grid, tolerates rounding errors on
+        # a range starting or stopping at a frame center
+        center = times.offset + times.length / 2
+        bounds = np.ceil(
+            (np.asarray([tstart, tstop], dtype=np.float64) - center)
+            / times.shift - 1e-6)
+        first, last = np.clip(bounds, 0, times.nframes).astype(np.int64)
+    else:
+        # binary search on the frames centers
+        times = np.asarray(times)
+        centers = times if times.ndim == 1 else times.mean(axis=1)
+        first, last = np.searchsorted(centers, [tstart, tstop])
+    return first, np.maximum(first, last)
+
+
+def _slice_times(times, first, last):
+    """Returns the frames `first` to `last` of the `times`, as a view"""
+    if isinstance(times, RegularTimes):
+        return RegularTimes(
+            times.offset + first * times.shift, times.shift, times.length,
+            last - first)
+    return times[first:last]
+
+
+def _slice_properties(properties, tstart, tstop):
+    """Narrows the audio segment in `properties` to [`tstart`, `tstop`[
+
+    Returns a shallow copy of `properties`, the sliced features share
+    the read-only entries of the source features (see
+    :attr:`Features.properties`) but for the audio segment.
+
+    """
+    if 'audio' not in properties or (tstart is None and tstop is None):
+        return dict(properties)
+
+    # the times are relative to the start of the audio segment
+    audio = dict(properties['audio'])
+    offset = audio.get('tstart', 0)
+    stop = audio.get('duration')
+    if tstop is not None:
+        stop = tstop if stop is None else min(stop, tstop)
+    start = 0 if tstart is None else max(tstart, 0)
+
+    audio['tstart'] = offset + start
+    if stop is not None:
+        audio['tstop'] = offset + max(start, stop)
+        audio['duration'] = audio['tstop'] - audio['tstart']
+
+    return dict(properties, audio=freeze(audio))
+
+
+def _is_sorted(times):
+    """Returns True if the `times` are sorted in increasing order
+
+    For 2D times, the rows are sorted by the second column, then by
+    the first one.
+
+    """
+    if isinstance(times, RegularTimes):
+        return times.shift >= 0
+
+    if times.ndim == 1:
+        return bool(np.all(times[1:] >= times[:-1]))
+
+    start = np.diff(times[:, 0])
+    stop = np.diff(times[:, 1])
+    return bool(np.all((stop > 0) | ((stop == 0) & (start >= 0))))
 
 
 class Features:
     _log = logging.getLogger()
 
-    def __init__(self, data, times, properties={}, validate=True):
+    # the validation policy, specific to each thread
+    _validation = threading.local()
+
+    def __init__(self, data, times, properties={}, validate=None):
         self._data = data
         self._times = times
         self._properties = properties
 
         # make sure the features are in a valid state
+        if validate is None:
+            validate = self.validation_enabled()
         if validate is True:
             self.validate()
 
+    @classmethod
+    def validation_enabled(cls):
+        """Returns True if the features are validated at instanciation
+
+        This is the validation policy applied when the `validate`
+        parameter is not specified in the constructor, see
+        :func:`validation`.
+
+        """
+        return getattr(cls._validation, 'enabled', True)
+
+    @classmethod
+    @contextlib.contextmanager
+    def validation(cls, enabled):
+        """Context manager setting the features validation policy
+
+        By default, the features are validated when instanciated. On
+        hot paths, where features are built from already validated
+        ones (e.g. by a chain of post-processors), the validation can
+        be disabled and done only once on the final features. The
+        policy applies to the current thread only and is restored
+        when exiting the context.
+
+        Parameters
+        ----------
+        enabled : bool
+            When False, the features are not validated at
+            instanciation, unless requested by the `validate`
+            parameter of the constructor.
+
+        Examples
+        --------
+
+        >>> import numpy as np
+        >>> from shennong.features import Features
+        >>> with Features.validation(False):
+        ...     features = Features(np.zeros((2, 1)), np.asarray([1, 0]))
+        >>> features.is_valid()
+        False
+
+        """
+        previous = cls.validation_enabled()
+        cls._validation.enabled = bool(enabled)
+        try:
+            yield
+        finally:
+            cls._validation.enabled = previous
+
     @property
     def data(self):
         """The underlying features data as a numpy matrix"""
@@ -29,7 +265,26 @@ class Features:
 
     @property
     def times(self):
-        """The frames timestamps on the vertical axis"""
+        """The frames timestamps on the vertical axis
+
+        This is an array of shape [nframes, 2] or [nframes]. When the
+        features are built on a :class:`RegularTimes`, the array is
+        built at each call, see :attr:`time_axis`.
+
+        """
+        if isinstance(self._times, RegularTimes):
+            return self._times.to_array()
+        return self._times
+
+    @property
+    def time_axis(self):
+        """The frames timestamps as given to the constructor
+
+        This is either an array or a compact :class:`RegularTimes`. Use
+        it to build new features on the same time axis without
+        building the timestamps array.
+
+        """
         return self._times
 
     @property
@@ -60,6 +315,12 @@ class Features:
         parameters and source audio file used to generate the
         features.
 
+        The properties are copied on write: each features has its own
+        dictionary but the entries in it (parameters blocks, pipeline,
+        audio description) are read-only and shared with the features
+        they have been computed from. To change such an entry, replace
+        it instead of modifying it in place.
+
         """
         return self._properties
 
@@ -73,9 +334,17 @@ class Features:
             'properties'.
 
         """
+        # regular times are stored as three numbers
+        times = self.time_axis
+        if isinstance(times, RegularTimes):
+            times = {
+                'offset': times.offset,
+                'shift': times.shift,
+                'length': times.length}
+
         return {
             'data': self.data,
-            'times': self.times,
+            'times': times,
             'properties': self.properties}
 
     @staticmethod
@@ -87,7 +356,9 @@ class Features:
         features : dict
             The dictionary to load the features from. Must have the
             following keys: 'data', 'times' and
-            'properties'.
+            'properties'. The 'times' are either an array or a dict
+            with keys 'offset', 'shift' and 'length' for regular
+            times.
 
         validate : bool, optional
             When True, validate the features before returning. Default
@@ -111,9 +382,15 @@ class Features:
                 'cannot read features from dict, missing keys: {}'
                 .format(', '.join(missing_keys)))
 
+        times = features['times']
+        if isinstance(times, dict):
+            times = RegularTimes(
+                times['offset'], times['shift'], times['length'],
+                len(features['data']))
+
         return Features(
             features['data'],
-            features['times'],
+            times,
             properties=features['properties'],
             validate=validate)
 
@@ -134,7 +411,7 @@ class Features:
             return False
 
         # timestamps equality
-        if not np.array_equal(self.times, other.times):
+        if not self._times_equal(other):
             return False
 
         # features matrices equality
@@ -175,7 +452,7 @@ class Features:
         if not dict_equal(self.properties, other.properties):
             return False
 
-        if not np.array_equal(self.times, other.times):
+        if not self._times_equal(other):
             return False
 
         if not np.allclose(self.data, other.data, atol=atol, rtol=rtol):
@@ -183,16 +460,25 @@ class Features:
 
         return True
 
+    def _times_equal(self, other):
+        """Returns True if `self` and `other` have the same times"""
+        t1, t2 = self.time_axis, other.time_axis
+        if isinstance(t1, RegularTimes) and isinstance(t2, RegularTimes):
+            return t1 == t2
+        return np.array_equal(self.times, other.times)
+
     def copy(self, dtype=None):
         """Returns a copy of the features
 
-        Allocates new arrays for data, times and properties
+        Allocates new arrays for data, times and properties. The
+        read-only blocks in properties (see
+        :class:`~shennong.utils.FrozenDict`) are shared with the copy.
 
         Parameters
         ----------
         dtype : type, optional
             When specified converts the data and times arrays to the
-            requested `dtype`
+            requested `dtype` (regular times are left as is)
 
         Returns
         -------
@@ -200,19 +486,77 @@ class Features:
            A new instance of Features copied from this one.
 
         """
+        # regular times are immutable, no need to copy them
+        times = self.time_axis
         if dtype:
             return Features(
                 self.data.astype(dtype),
-                self.times.astype(dtype),
+                times if isinstance(times, RegularTimes)
+                else times.astype(dtype),
                 properties=copy.deepcopy(self.properties),
                 validate=False)
 
         return Features(
             self.data.copy(),
-            self.times.copy(),
+            times if isinstance(times, RegularTimes) else times.copy(),
             properties=copy.deepcopy(self.properties),
             validate=False)
 
+    def slice(self, tstart=None, tstop=None):
+        """Returns the frames of the features in a time range
+
+        The selected frames are the ones with a center in
+        [`tstart`, `tstop`[ (for 1D times, the timestamp of the frame
+        is its center). They are found by binary search on the times,
+        or by arithmetic on regular times (see
+        :class:`RegularTimes`). The frames centers are assumed to be
+        sorted.
+
+        The returned features are views on the data and times of
+        these features: nothing is copied. The properties are copied
+        on write (see :attr:`properties`). The times are not shifted,
+        but the audio segment described in the properties (if any) is
+        narrowed to the time range.
+
+        Parameters
+        ----------
+        tstart : float, optional
+            The start of the range in seconds, default to the start of
+            the features
+        tstop : float, optional
+            The end of the range in seconds (excluded), default to the
+            end of the features
+
+        Returns
+        -------
+        features : :class:`Features`
+            The features in the range, possibly with no frame
+
+        Raises
+        ------
+        ValueError
+            If `tstart` is greater than `tstop`
+
+        """
+        if tstart is not None and tstop is not None and tstart > tstop:
+            raise ValueError(
+                'tstart must be lower than tstop but {} > {}'
+                .format(tstart, tstop))
+
+        first, last = _frames_range(
+            self.time_axis,
+            -np.inf if tstart is None else tstart,
+            np.inf if tstop is None else tstop)
+        return self._slice(first, last, tstart, tstop)
+
+    def _slice(self, first, last, tstart, tstop):
+        # returns the frames `first` to `last` as a view
+        return Features(
+            self.data[first:last],
+            _slice_times(self.time_axis, first, last),
+            properties=_slice_properties(self.properties, tstart, tstop),
+            validate=False)
+
     def is_valid(self):
         """Returns True if the features are in a valid state
 
@@ -234,11 +578,12 @@ class Features:
         """Raises a ValueError if the features are not in a valid state"""
         # accumulate detected errors and display them at the end
         errors = []
+        times = self.time_axis
 
         # basic checks on types
         if not isinstance(self.data, np.ndarray):
             errors.append('data must be a numpy array')
-        if not isinstance(self.times, np.ndarray):
+        if not isinstance(times, (np.ndarray, RegularTimes)):
             errors.append('times must be a numpy array')
         if not isinstance(self.properties, dict):
             errors.append('properties must be a dictionnary')
@@ -251,16 +596,16 @@ class Features:
         if not self.data.ndim == 2:
             errors.append(
                 'data dimension must be 2 but is {}'.format(self.data.ndim))
-        if self.times.ndim > 2:
+        if times.ndim > 2:
             errors.append(
                 'times dimension must be 1 or 2 but is {}'.format(
-                    self.times.ndim))
-        if self.times.ndim == 2 and self.times.shape[1] != 2:
+                    times.ndim))
+        if times.ndim == 2 and times.shape[1] != 2:
             errors.append('times shape[1] must be 2, it is {}'.format(
-                self.times.shape[1]))
+                times.shape[1]))
 
         nframes1 = self.data.shape[0]
-        nframes2 = self.times.shape[0]
+        nframes2 = times.shape[0]
         if not nframes1 == nframes2:
             errors.append(
                 'mismatch in number of frames: {} for data but {} '
@@ -270,11 +615,10 @@ class Features:
             raise ValueError(
                 'invalid features dimensions: {}'.format(', '.join(errors)))
 
-        # check if time is increasing. This check comes from
-        # h5features/labels.py
-        index = (np.argsort(self.times) if self.times.ndim == 1
-                 else np.lexsort(self.times.T))
-        if not all(n == index[n] for n in range(self.nframes)):
+        # check if time is increasing. For 2D times, the frames are
+        # sorted by stop times, then by start times (as in
+        # h5features/labels.py)
+        if not _is_sorted(times):
             raise ValueError('times is not sorted in increasing order')
 
         # check all values in array are finit (not infinity nor nan)
@@ -287,7 +631,8 @@ class Features:
 
         Build a new Features instance made of the concatenation of
         this instance with the other instance. Their `times` must be
-        the equal.
+        the equal. This is the same as ``Features.hstack([self,
+        other], tolerance)``.
 
         Parameters
         ----------
@@ -314,67 +659,222 @@ class Features:
             inconsistencies: number of frames difference greater than
             tolerance, inequal times values.
 
+        See Also
+        --------
+        Features.hstack
+
         """
+        return self.hstack([self, other], tolerance=tolerance)
+
+    @staticmethod
+    def hstack(features, tolerance=0):
+        """Returns the horizontal concatenation of several `features`
+
+        The output data is allocated once and the features are copied
+        in it, the properties are merged and the columns in the
+        properties pipeline are shifted accordingly. The features must
+        share the same times.
+
+        Parameters
+        ----------
+        features : sequence of Features
+            The features to concatenate, in that order
+        tolerance : int, optional
+            If the number of frames of the features differ, trim them
+            to the shortest one up to a frame difference of
+            `tolerance`, otherwise raise a ValueError. See
+            :func:`concatenate`. Default to 0.
+
+        Returns
+        -------
+        features : Features, shape = [nframes, sum of ndims]
+            The concatenated features, their properties are the ones
+            of the input features, the latter ones taking precedence.
+
+        Raises
+        ------
+        ValueError
+            If `features` is empty, if the number of frames difference
+            is greater than `tolerance` or if the times are not equal.
+
+        """
+        features = list(features)
+        if not features:
+            raise ValueError('cannot concatenate an empty list of features')
+
         # check the number of frames is within the tolerance
-        need_trim = False
-        diff = abs(self.nframes - other.nframes)
-        if diff:
+        nframes = [f.nframes for f in features]
+        shortest, longest = min(nframes), max(nframes)
+        if shortest != longest:
             if not tolerance:
                 raise ValueError(
                     'features have a different number of frames')
-            if tolerance and diff > tolerance:
+            if longest - shortest > tolerance:
                 raise ValueError(
                     'features differs number of frames, and '
                     'greater than tolerance: |{} - {}| > {}'.format(
-                        self.nframes, other.nframes, tolerance))
-            else:
-                self._log.warning(
-                    'features differs in number of frames, but '
-                    'within tolerance (|%s - %s| <= %s), trim the longest one',
-                    self.nframes, other.nframes, tolerance)
-                need_trim = True
-
-        # trim the longest features to the size of the shortest one
-        d1 = self.data
-        d2 = other.data
-        t1 = self.times
-        t2 = other.times
-        if need_trim:
-            if self.nframes > other.nframes:
-                d1 = d1[:-diff]
-                t1 = t1[:-diff]
-            else:
-                d2 = d2[:-diff]
-                t2 = t2[:-diff]
-
-        # ensures time axis is shared accross the two features
-        if not np.allclose(t1, t2):
-            raise ValueError('times are not equal')
-
-        # merge properties of the two features
-        properties = copy.deepcopy(self.properties)
-        other_properties = copy.deepcopy(other.properties)
-        properties.update(
-            {k: v for k, v in other_properties.items() if k != 'pipeline'})
-        if 'pipeline' not in properties:
-            properties['pipeline'] = []
-        if 'pipeline' in other_properties:
-            for k in other_properties['pipeline']:
-                properties['pipeline'].append(k)
-                c = properties['pipeline'][-1]['columns']
-                properties['pipeline'][-1]['columns'] = [
-                    c[0] + self.ndims, c[1] + self.ndims]
-
-        return Features(np.hstack((d1, d2)), t1, properties=properties)
+                        longest, shortest, tolerance))
+            features[0]._log.warning(
+                'features differs in number of frames, but '
+                'within tolerance (|%s - %s| <= %s), trim the longest ones',
+                longest, shortest, tolerance)
+
+        # ensures time axis is shared accross the features, the
+        # longest ones being trimmed to the shortest
+        times = _trim_times(features[0].time_axis, shortest)
+        for f in features[1:]:
+            if not _times_close(times, _trim_times(f.time_axis, shortest)):
+                raise ValueError('times are not equal')
+
+        # copy the data in a single array
+        data = np.empty(
+            (shortest, sum(f.ndims for f in features)),
+            dtype=np.result_type(*(f.dtype for f in features)))
+
+        # merge properties of the features, the read-only entries are
+        # shared and the pipeline rebuilt
+        properties = {}
+        pipeline = []
+        column = 0
+        for f in features:
+            data[:, column:column + f.ndims] = f.data[:shortest]
+            properties.update(
+                {k: v for k, v in f.properties.items() if k != 'pipeline'})
+            for k in f.properties.get('pipeline', ()):
+                c = k['columns']
+                pipeline.append(intern_dict(
+                    dict(k, columns=[c[0] + column, c[1] + column])))
+            column += f.ndims
+        properties['pipeline'] = tuple(pipeline)
+
+        return Features(data, times, properties=properties)
 
 
 class FeaturesCollection(dict):
     # a tweak inspired by C++ metaprogramming to avoid import loops
     # with shennong.features.serializers
     _value_type = Features
+    _times_type = RegularTimes
+
+    Packed = collections.namedtuple('Packed', 'data offsets keys')
+    """The packed representation of a collection, see :func:`pack`"""
+
+    def __getstate__(self):
+        # the packed buffer is not pickled along with the features
+        return {k: v for k, v in self.__dict__.items() if k != '_packed'}
+
+    @classmethod
+    def _from_packed(cls, data, offsets, keys, times, properties,
+                     validate=True):
+        """Builds a collection of features as views on a single buffer
+
+        Parameters
+        ----------
+        data : array, shape = [total_frames, ndims]
+            The features of all the items, stacked in the order of
+            `keys`
+        offsets : array of int, shape = [nitems + 1]
+            The item `i` is made of the frames ``data[offsets[i]:
+            offsets[i+1]]``
+        keys : sequence of str
+            The key of each item in the collection
+        times : sequence
+            The time axis of each item
+        properties : sequence of dict
+            The properties of each item
+        validate : bool, optional
+            When True (default), validate each features
+
+        """
+        collection = cls()
+        views = []
+        for i, key in enumerate(keys):
+            features = cls._value_type(
+                data[offsets[i]:offsets[i+1]], times[i],
+                properties=properties[i], validate=validate)
+            collection[key] = features
+            views.append(features.data)
+
+        collection._packed = (
+            cls.Packed(data, np.asarray(offsets), tuple(keys)), views)
+        return collection
+
+    @property
+    def packed(self):
+        """The packed representation of the collection, or None
+
+        When the collection has been built by :func:`pack`, this is a
+        :class:`Packed` tuple ``(data, offsets, keys)``: the features
+        of all the items are stored in the single array `data`, the
+        item ``keys[i]`` being ``data[offsets[i]:offsets[i+1]]``. This
+        allows to process the whole collection in vectorized
+        operations.
+
+        This is None if the collection is not packed, or if it has
+        been modified since packing (an item being added, removed or
+        replaced).
+
+        """
+        try:
+            packed, views = self._packed
+        except AttributeError:
+            return None
+
+        if len(packed.keys) != len(self) or not all(
+                self.get(k) is not None and self[k].data is v
+                for k, v in zip(packed.keys, views)):
+            return None
+        return packed
+
+    def pack(self):
+        """Returns a copy of the collection packed in a single array
+
+        The features data of all the items are copied in a single
+        contiguous array of shape [total_frames, ndims] and each
+        features in the returned collection is a view on it. The time
+        axis and properties are shared with this collection. See
+        :attr:`packed`.
+
+        Returns
+        -------
+        packed : :class:`FeaturesCollection`
+            The packed collection, the features are converted to a
+            common data type if they differ
+
+        Raises
+        ------
+        ValueError
+            If the collection is empty or if the features have
+            different dimensions.
+
+        """
+        if not self:
+            raise ValueError('cannot pack an empty collection')
+
+        dim = set(f.ndims for f in self.values())
+        if len(dim) != 1:
+            raise ValueError(
+                'features in the collection must have consistent dimensions '
+                'but dimensions are: {}'.format(sorted(dim)))
+
+        keys = list(self.keys())
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum([self[k].nframes for k in keys], out=offsets[1:])
+
+        data = np.empty(
+            (offsets[-1], dim.pop()),
+            dtype=np.result_type(*(f.dtype for f in self.values())))
+        for i, key in enumerate(keys):
+            data[offsets[i]:offsets[i+1]] = self[key].data
+
+        return self._from_packed(
+            data, offsets, keys,
+            [self[k].time_axis for k in keys],
+            [self[k].properties for k in keys],
+            validate=False)
 
     @classmethod
-    def load(cls, filename, serializer=None):
+    def load(cls, filename, serializer=None, validate=True):
         """Loads a FeaturesCollection from a `filename`
 
         Parameters
@@ -384,6 +884,9 @@ class FeaturesCollection(dict):
         serializer : str, optional
             The file serializer to use for loading, if not specified
             guess the serializer from the `filename` extension
+        validate : bool, optional
+            When True (default), make sure the loaded features are in
+            a valid state
 
         Returns
         -------
@@ -399,7 +902,62 @@ class FeaturesCollection(dict):
             if the features loading fails.
 
         """
-        return get_serializer(cls, filename, serializer).load()
+        return get_serializer(cls, filename, serializer).load(
+            validate=validate)
+
+    @classmethod
+    def open(cls, filename, serializer=None, cache=None, validate=True,
+             **kwargs):
+        """Opens a collection of features from `filename` without loading it
+
+        Only the index of the items stored in the file is read at
+        opening, the features are loaded from the file when they are
+        accessed. This is supported by the h5features, numpy and
+        Kaldi serializers (with a .scp index for the latter).
+
+        Numpy files are saved compressed by default, they are read
+        lazily only if saved from a packed collection without
+        compression, as ``collection.pack().save('feats.npz',
+        compress=False)``. The packed features are then memory mapped.
+        Otherwise all the features are loaded at opening and a warning
+        is logged.
+
+        Parameters
+        ----------
+        filename : str
+            The file to open
+        serializer : str, optional
+            The file serializer to use for loading, if not specified
+            guess the serializer from the `filename` extension
+        cache : int, optional
+            When specified, the loaded features are cached up to
+            `cache` bytes of features data, the least recently used
+            features being evicted first. By default the features are
+            loaded from the file at each access.
+        validate : bool, optional
+            When True (default), make sure the features are in a
+            valid state when loaded
+        kwargs : optional
+            Optional supplementary arguments, specific to each serializer.
+
+        Returns
+        -------
+        features : :class:`LazyFeaturesCollection`
+            A read-only mapping of the features stored in `filename`
+
+        Raises
+        ------
+        IOError
+            If the `filename` cannot be read
+        ValueError
+            If the `serializer` or the file extension is not
+            supported, or if the serializer cannot load the features
+            one by one.
+
+        """
+        return LazyFeaturesCollection(
+            get_serializer(cls, filename, serializer),
+            cache=cache, validate=validate, **kwargs)
 
     def save(self, filename, serializer=None, **kwargs):
         get_serializer(
@@ -482,3 +1040,150 @@ class FeaturesCollection(dict):
 
         return {k: FeaturesCollection({item: self[item] for item in items})
                 for k, items in reverse_index.items()}
+
+    def slice(self, segments):
+        """Returns segments of the features as a new collection
+
+        This is the collection-level version of
+        :func:`Features.slice`. The segments of a same item are
+        located in a single vectorized operation. The returned
+        features are views on the features in this collection.
+
+        Parameters
+        ----------
+        segments : dict
+            The segments table, mapping each segment name to a tuple
+            ``(item, tstart, tstop)``. `item` is a key in this
+            collection, `tstart` and `tstop` are the time range of the
+            segment within the item, in seconds, one of them or both
+            can be None (see :func:`Features.slice`).
+
+        Returns
+        -------
+        features : :class:`FeaturesCollection`
+            The features of each segment, indexed by segment names
+
+        Raises
+        ------
+        ValueError
+            If a segment refers to an item not in the collection or if
+            its `tstart` is greater than its `tstop`.
+
+        """
+        undefined_items = set(
+            v[0] for v in segments.values()).difference(self.keys())
+        if undefined_items:
+            raise ValueError(
+                'following items are not defined in the collection: {}'
+                .format(', '.join(sorted(undefined_items))))
+
+        index = collections.defaultdict(list)
+        for name, (item, tstart, tstop) in segments.items():
+            if tstart is not None and tstop is not None and tstart > tstop:
+                raise ValueError(
+                    'tstart must be lower than tstop for segment {} '
+                    'but {} > {}'.format(name, tstart, tstop))
+            index[item].append(name)
+
+        sliced = {}
+        for item, names in index.items():
+            tstart = np.asarray(
+                [segments[n][1] for n in names], dtype=np.float64)
+            tstop = np.asarray(
+                [segments[n][2] for n in names], dtype=np.float64)
+            first, last = _frames_range(
+                self[item].time_axis,
+                np.where(np.isnan(tstart), -np.inf, tstart),
+                np.where(np.isnan(tstop), np.inf, tstop))
+
+            for i, name in enumerate(names):
+                sliced[name] = self[item]._slice(
+                    first[i], last[i], segments[name][1], segments[name][2])
+
+        return FeaturesCollection({k: sliced[k] for k in segments.keys()})
+
+
+class LazyFeaturesCollection(collections.abc.Mapping):
+    """A read-only collection of features loaded from a file on access
+
+    This is the mapping returned by :func:`FeaturesCollection.open`,
+    a :class:`FeaturesCollection` can be built from it (e.g. on a
+    subset of the items) with ``FeaturesCollection({k: lazy[k] for k
+    in keys})``.
+
+    Parameters
+    ----------
+    serializer : :class:`~shennong.features.serializers.FeaturesSerializer`
+        The serializer of the file to read the features from
+    cache : int, optional
+        The size of the cache of loaded features, in bytes, default
+        to no cache
+    validate : bool, optional
+        When True (default), the features are validated when loaded
+    kwargs : optional
+        Optional supplementary arguments given to the serializer
+
+    """
+    def __init__(self, serializer, cache=None, validate=True, **kwargs):
+        self._filename = serializer.filename
+        self._validate = validate
+        self._lock = threading.Lock()
+        self._cache = (
+            LRUCache(cache, sizeof=lambda features: features.data.nbytes)
+            if cache else None)
+
+        keys, self._load, self._close = serializer.open(**kwargs)
+        self._keys = dict.fromkeys(keys)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+
+        if self._cache is None:
+            return self._load_item(key)
+        return self._cache.get(key, lambda: self._load_item(key))
+
+    @property
+    def filename(self):
+        """The file the features are loaded from"""
+        return self._filename
+
+    def cache_info(self):
+        """Returns the cache statistics, or None if there is no cache
+
+        See :func:`shennong.utils.LRUCache.info`.
+
+        """
+        return None if self._cache is None else self._cache.info()
+
+    def close(self):
+        """Closes the file, the features cannot be loaded anymore"""
+        self._close()
+        if self._cache is not None:
+            self._cache.clear()
+
+    def _load_item(self, key):
+        # the readers are not thread-safe
+        with self._lock:
+            features = self._load(key)
+
+        if self._validate and not features.is_valid():
+            raise ValueError(
+                'features not valid in file {}: {}'.format(
+                    self._filename, key))
+        return features
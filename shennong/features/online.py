@@ -0,0 +1,498 @@
+"""Online (chunked, low-latency) features extraction
+
+The processors and post-processors in shennong take a complete input
+(an :class:`~shennong.audio.Audio` or a
+:class:`~shennong.features.features.Features`) and return complete
+features. This module provides online counterparts to them: they
+accept the input by chunks, keep the framing and context state between
+calls and output the newly finalized frames at each call::
+
+    chunk 1 --> OnlineProcessor --> frames [0, n1[
+    chunk 2 --> OnlineProcessor --> frames [n1, n2[
+    ...
+    flush() --> OnlineProcessor --> frames [nk, nframes[
+
+The concatenation of the online outputs is identical to the output of
+the batch `process` method on the whole signal, but for pitch (see
+:class:`OnlinePitchProcessor`). The available online processors are:
+
+* :class:`OnlineFramesProcessor` for MFCC, filterbank, PLP,
+  spectrogram and energy,
+
+* :class:`OnlinePitchProcessor` for pitch estimation,
+
+* :class:`OnlinePostProcessor` for post-processors working on a
+  bounded frames context, such as delta, sliding CMVN or pitch
+  post-processing.
+
+Use :func:`get_online_processor` to build the online counterpart of a
+given (post-)processor.
+
+Examples
+--------
+
+>>> import numpy as np
+>>> from shennong.audio import Audio
+>>> from shennong.features.processor.mfcc import MfccProcessor
+>>> from shennong.features.postprocessor.delta import DeltaPostProcessor
+>>> from shennong.features.online import get_online_processor
+>>> audio = Audio.load('./test/data/test.wav')
+
+Batch computation of MFCC with deltas (dithering is disabled to have
+reproducible results):
+
+>>> mfcc = MfccProcessor(sample_rate=audio.sample_rate, dither=0)
+>>> delta = DeltaPostProcessor()
+>>> batch = delta.process(mfcc.process(audio))
+
+Online computation, the audio is read from the file by chunks of 100
+ms (see :func:`~shennong.audio.Audio.stream`):
+
+>>> online_mfcc = get_online_processor(mfcc)
+>>> online_delta = get_online_processor(delta)
+>>> online = []
+>>> for chunk in Audio.stream('./test/data/test.wav', 0.1):
+...     frames = online_delta.accept(online_mfcc.accept(chunk))
+...     if frames is not None:
+...         online.append(frames)
+>>> online.append(online_delta.flush())
+
+The online and batch features are the same:
+
+>>> np.array_equal(np.vstack([f.data for f in online]), batch.data)
+True
+>>> np.array_equal(np.vstack([f.times for f in online]), batch.times)
+True
+
+"""
+
+import abc
+
+import kaldi.feat.pitch
+import kaldi.matrix
+import numpy as np
+
+from shennong.audio import Audio
+from shennong.features import Features, RegularTimes
+from shennong.features.postprocessor.base import FeaturesPostProcessor
+from shennong.features.processor.base import MelFeaturesProcessor
+from shennong.features.processor.energy import EnergyProcessor
+from shennong.features.processor.pitch import PitchProcessor
+from shennong.features.processor.spectrogram import SpectrogramProcessor
+
+
+def get_online_processor(processor, **kwargs):
+    """Returns the online counterpart of a (post-)processor
+
+    Parameters
+    ----------
+    processor : FeaturesProcessor or FeaturesPostProcessor
+        The processor to be used online.
+    kwargs : optional
+        Supplementary arguments sent to the online processor
+        constructor.
+
+    Returns
+    -------
+    online : OnlineProcessor
+        An instance of :class:`OnlineFramesProcessor`,
+        :class:`OnlinePitchProcessor` or :class:`OnlinePostProcessor`,
+        depending on the type of `processor`.
+
+    Raises
+    ------
+    ValueError
+        If the `processor` cannot be used online.
+
+    """
+    if isinstance(processor, PitchProcessor):
+        return OnlinePitchProcessor(processor, **kwargs)
+    if isinstance(processor, FeaturesPostProcessor):
+        return OnlinePostProcessor(processor, **kwargs)
+    return OnlineFramesProcessor(processor, **kwargs)
+
+
+def _times(processor, first_frame, nframes):
+    """Returns the times of the frames [first_frame, first_frame+nframes[
+
+    The times are a compact :class:`~shennong.features.RegularTimes`,
+    the same as the frames `first_frame` to `first_frame + nframes` of
+    the batch features.
+
+    """
+    return RegularTimes(
+        first_frame * processor.frame_shift, processor.frame_shift,
+        processor.frame_length, nframes)
+
+
+class OnlineProcessor(metaclass=abc.ABCMeta):
+    """Base class of online (post-)processors
+
+    Parameters
+    ----------
+    processor : FeaturesProcessor or FeaturesPostProcessor
+        The underlying processor used to compute the features.
+
+    """
+    def __init__(self, processor):
+        self._processor = processor
+        self._nframes = 0
+
+    @property
+    def processor(self):
+        """The processor wrapped by this online processor"""
+        return self._processor
+
+    @property
+    def nframes(self):
+        """The number of frames emitted since the last reset"""
+        return self._nframes
+
+    @abc.abstractmethod
+    def accept(self, chunk):  # pragma: nocover
+        """Processes a chunk of input and returns the newly finalized frames
+
+        Parameters
+        ----------
+        chunk : Audio or Features
+            The next chunk of input, directly following the previous
+            one.
+
+        Returns
+        -------
+        features : Features or None
+            The frames finalized by this chunk, or None if no new frame
+            is ready yet.
+
+        """
+        pass
+
+    @abc.abstractmethod
+    def flush(self):  # pragma: nocover
+        """Returns the remaining frames and resets the processor
+
+        Must be called once the last chunk of input has been accepted.
+
+        Returns
+        -------
+        features : Features or None
+            The frames not yet emitted, or None if there is no frame
+            left.
+
+        """
+        pass
+
+    @abc.abstractmethod
+    def reset(self):  # pragma: nocover
+        """Resets the processor to process a new input"""
+        pass
+
+    def process(self, chunks):
+        """Processes a whole sequence of `chunks` at once
+
+        This is a convenience method equivalent to calling
+        :meth:`accept` on each chunk and :meth:`flush` at the end, the
+        emitted frames being concatenated.
+
+        Parameters
+        ----------
+        chunks : sequence of Audio or Features
+            The successive chunks of input.
+
+        Returns
+        -------
+        features : Features or None
+            The concatenation of all the emitted frames, or None if no
+            frame has been emitted.
+
+        """
+        outputs = [self.accept(chunk) for chunk in chunks] + [self.flush()]
+        outputs = [o for o in outputs if o is not None]
+        if not outputs:
+            return None
+
+        return Features(
+            np.vstack([o.data for o in outputs]),
+            np.concatenate([o.times for o in outputs]),
+            properties=outputs[-1].properties,
+            validate=False)
+
+
+class OnlineFramesProcessor(OnlineProcessor):
+    """Online extraction of frame based features
+
+    Works with :class:`~shennong.features.processor.mfcc.MfccProcessor`,
+    :class:`~shennong.features.processor.filterbank.FilterbankProcessor`,
+    :class:`~shennong.features.processor.plp.PlpProcessor`,
+    :class:`~shennong.features.processor.spectrogram.SpectrogramProcessor`
+    and :class:`~shennong.features.processor.energy.EnergyProcessor`:
+    for those processors a frame depends only on the samples it
+    contains. The audio samples received are buffered until a complete
+    frame is available.
+
+    Parameters
+    ----------
+    processor : FramesProcessor
+        The features processor to use online, its `snip_edges` option
+        must be True.
+
+    Raises
+    ------
+    ValueError
+        If the `processor` is not supported or if its `snip_edges`
+        option is False (the last frames would depend on the end of
+        the signal).
+
+    """
+    def __init__(self, processor):
+        if not isinstance(processor, (
+                MelFeaturesProcessor, SpectrogramProcessor, EnergyProcessor)):
+            raise ValueError(
+                'processor {} cannot be used online'.format(processor))
+
+        if not processor.snip_edges:
+            raise ValueError(
+                'online processing requires snip_edges to be True')
+
+        super().__init__(processor)
+        self.reset()
+
+    def reset(self):
+        self._nframes = 0
+        self._buffer = None
+
+    def accept(self, chunk):
+        if chunk.nchannels != 1:
+            raise ValueError(
+                'signal must have one dimension, but it has {}'
+                .format(chunk.nchannels))
+
+        if self._buffer is None:
+            self._buffer = chunk.data
+        else:
+            if chunk.dtype != self._buffer.dtype:
+                raise ValueError(
+                    'chunks must have the same dtype, {} != {}'.format(
+                        chunk.dtype, self._buffer.dtype))
+            self._buffer = np.concatenate((self._buffer, chunk.data))
+
+        # number of frames fully contained in the buffer
+        options = self.processor._frame_options
+        window_size = options.window_size()
+        window_shift = options.window_shift()
+        if self._buffer.shape[0] < window_size:
+            return None
+        nframes = 1 + (self._buffer.shape[0] - window_size) // window_shift
+
+        features = self.processor.process(Audio(
+            self._buffer[:(nframes - 1) * window_shift + window_size],
+            chunk.sample_rate, validate=False))
+
+        # forget the samples that will not be used by the next frames
+        self._buffer = self._buffer[nframes * window_shift:]
+
+        features = Features(
+            features.data,
+            _times(self.processor, self._nframes, nframes),
+            properties=features.properties,
+            validate=False)
+        self._nframes += nframes
+        return features
+
+    def flush(self):
+        # with snip_edges the remaining samples cannot fill a frame
+        self.reset()
+        return None
+
+
+class OnlinePitchProcessor(OnlineProcessor):
+    """Online estimation of pitch
+
+    Wraps the Kaldi online pitch tracker. The frames have the same
+    times as the output of :meth:`PitchProcessor.process
+    <shennong.features.processor.pitch.PitchProcessor.process>`.
+
+    Notes
+    -----
+    Unlike other features, the pitch is not computed independently for
+    each frame: it is tracked by a Viterbi search along the signal. A
+    frame emitted by :meth:`accept` is the best estimate given the
+    signal received so far and is not revised afterwards, so it can
+    differ from the batch estimate, which knows the whole signal. The
+    `latency` parameter delays the emission of frames to trade latency
+    for stability.
+
+    Parameters
+    ----------
+    processor : PitchProcessor
+        The pitch processor to use online
+    latency : int, optional
+        The maximum number of frames by which the frames output are
+        delayed to stabilize the pitch tracking, default to 0.
+
+    """
+    def __init__(self, processor, latency=0):
+        if not isinstance(processor, PitchProcessor):
+            raise ValueError(
+                'processor must be a PitchProcessor, it is {}'
+                .format(processor))
+
+        if latency < 0:
+            raise ValueError(
+                'latency must be positive, it is {}'.format(latency))
+
+        super().__init__(processor)
+        self._latency = latency
+        self.reset()
+
+    @property
+    def latency(self):
+        """Maximum number of frames by which the output is delayed"""
+        return self._latency
+
+    def reset(self):
+        self._nframes = 0
+
+        # work on a copy of the processor options, so that the
+        # latency does not alter the wrapped processor
+        options = PitchProcessor(**self.processor.get_params())._options
+        options.max_frames_latency = self.latency
+        self._pitch = kaldi.feat.pitch.OnlinePitchFeature(options)
+
+    def _emit(self):
+        nframes = self._pitch.num_frames_ready() - self._nframes
+        if nframes <= 0:
+            return None
+
+        data = np.empty((nframes, self.processor.ndims), dtype=np.float32)
+        frame = kaldi.matrix.Vector(self.processor.ndims)
+        for n in range(nframes):
+            self._pitch.get_frame(self._nframes + n, frame)
+            data[n] = frame.numpy()
+
+        features = Features(
+            data,
+            _times(self.processor, self._nframes, nframes),
+            properties=self.processor.get_properties(),
+            validate=False)
+        self._nframes += nframes
+        return features
+
+    def accept(self, chunk):
+        if chunk.nchannels != 1:
+            raise ValueError(
+                'audio signal must have one channel, but it has {}'
+                .format(chunk.nchannels))
+
+        if self.processor.sample_rate != chunk.sample_rate:
+            raise ValueError(
+                'processor and signal mismatch in sample rates: '
+                '{} != {}'.format(self.processor.sample_rate,
+                                  chunk.sample_rate))
+
+        # force 16 bits samples, as in PitchProcessor.process
+        self._pitch.accept_waveform(
+            chunk.sample_rate,
+            kaldi.matrix.SubVector(chunk.as_int16_float32()))
+        return self._emit()
+
+    def flush(self):
+        self._pitch.input_finished()
+        features = self._emit()
+        self.reset()
+        return features
+
+
+class OnlinePostProcessor(OnlineProcessor):
+    """Online post-processing of features
+
+    Works with the post-processors having a bounded frames context
+    (see :attr:`FeaturesPostProcessor.context
+    <shennong.features.postprocessor.base.FeaturesPostProcessor.context>`),
+    such as :class:`~shennong.features.postprocessor.delta.DeltaPostProcessor`
+    or :class:`~shennong.features.processor.pitch.PitchPostProcessor`. The
+    input frames are buffered until their right context is
+    available. Only the left context of the frames not yet emitted is
+    kept in memory.
+
+    Parameters
+    ----------
+    processor : FeaturesPostProcessor
+        The post-processor to use online.
+
+    Raises
+    ------
+    ValueError
+        If the post-processor needs the whole features to operate
+        (i.e. its context is None), as for CMVN or VAD.
+
+    """
+    def __init__(self, processor):
+        if not isinstance(processor, FeaturesPostProcessor):
+            raise ValueError(
+                'processor must be a FeaturesPostProcessor, it is {}'
+                .format(processor))
+
+        if processor.context is None:
+            raise ValueError(
+                'post-processor {} cannot be used online'.format(processor))
+
+        super().__init__(processor)
+        self.reset()
+
+    def reset(self):
+        self._nframes = 0
+
+        # buffered input frames, the first one being at global index
+        # self._first
+        self._first = 0
+        self._data = None
+        self._times = None
+        self._properties = None
+
+    def _emit(self, last):
+        """Returns the frames [self._nframes, last[ and updates the buffer"""
+        if last <= self._nframes:
+            return None
+
+        features = self.processor.process(Features(
+            self._data, self._times, self._properties, validate=False))
+
+        first = self._nframes - self._first
+        features = Features(
+            features.data[first:last - self._first],
+            features.times[first:last - self._first],
+            properties=features.properties,
+            validate=False)
+
+        # keep only the left context of the next frame to emit
+        keep = max(self._first, last - self.processor.context[0])
+        self._data = self._data[keep - self._first:]
+        self._times = self._times[keep - self._first:]
+        self._first = keep
+
+        self._nframes = last
+        return features
+
+    def accept(self, chunk):
+        if chunk is None:
+            return None
+
+        if self._data is None:
+            self._data = chunk.data
+            self._times = chunk.times
+        else:
+            self._data = np.concatenate((self._data, chunk.data))
+            self._times = np.concatenate((self._times, chunk.times))
+        self._properties = chunk.properties
+
+        # a frame is final once its right context is available
+        available = self._first + self._data.shape[0]
+        return self._emit(available - self.processor.context[1])
+
+    def flush(self):
+        features = None
+        if self._data is not None:
+            features = self._emit(self._first + self._data.shape[0])
+        self.reset()
+        return features
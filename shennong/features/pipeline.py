@@ -7,7 +7,9 @@ generates a configuration for the pipeline given some arguments, and
 :func:`extract_features` which takes as input a configuration and a
 list of utterances, extracts the features, do the postprocessing and
 returns the extracted features as an instance of
-:class:`~shennong.features.features.FeaturesCollection`.
+:class:`~shennong.features.features.FeaturesCollection`. The
+:class:`Pipeline` class allows to reuse a configured pipeline on
+several inputs.
 
 Examples
 --------
@@ -65,13 +67,42 @@ on columns 0 to 12 and pitch on columns 13 to 15):
 >>> p.keys()
 dict_keys(['pipeline', 'mfcc', 'speaker', 'audio', 'pitch'])
 >>> p['pipeline']
-[{'name': 'mfcc', 'columns': [0, 12]}, {'name': 'pitch', 'columns': [13, 15]}]
+({'name': 'mfcc', 'columns': (0, 12)}, {'name': 'pitch', 'columns': (13, 15)})
+
+When extracting features several times with the same configuration,
+use a :class:`Pipeline` instance: the configuration is validated and
+the processors are instanciated only once. The pipeline can process
+utterances as above or audio signals already loaded in memory:
+
+>>> from shennong.features.pipeline import Pipeline
+>>> pipeline = Pipeline(config)
+>>> features = pipeline.process_many(utterances)
+>>> features.keys()
+dict_keys(['utt1', 'utt2'])
+>>> audio = Audio.load(wav)
+>>> pipeline.process(audio, speaker='spk1').shape
+(140, 16)
+
+The CMVN statistics accumulated on some utterances can be reused to
+normalize other ones:
+
+>>> pipeline = Pipeline(get_default_config('mfcc'))
+>>> features = pipeline.process_many(utterances)
+>>> pipeline.load_cmvn_stats(features)
+>>> list(pipeline.cmvn_stats.keys())
+['spk1']
+>>> pipeline.process(audio, speaker='spk1').shape
+(140, 42)
 
 """
 
+import asyncio
 import collections
+import concurrent.futures
 import datetime
+import functools
 import importlib
+import itertools
 import joblib
 import numpy as np
 import os
@@ -79,9 +110,10 @@ import re
 import textwrap
 import yaml
 
+from shennong import sharedmem
 from shennong.audio import Audio
-from shennong.features import FeaturesCollection
-from shennong.utils import get_logger, get_njobs
+from shennong.features import Features, FeaturesCollection
+from shennong.utils import freeze, get_logger, get_njobs
 
 
 def valid_features():
@@ -95,7 +127,8 @@ def valid_features():
 
 
 def get_default_config(features, to_yaml=False, yaml_commented=True,
-                       with_pitch=True, with_cmvn=True, with_delta=True):
+                       with_pitch=True, with_cmvn=True, with_delta=True,
+                       sliding_cmvn=False, dtype=None, chunk_duration=None):
     """Returns the default configuration for the specified pipeline
 
     The pipeline is specified with the main `features` it computes and
@@ -124,6 +157,26 @@ def get_default_config(features, to_yaml=False, yaml_commented=True,
     with_delta : bool, optional
         Configure the pipeline for features's delta extraction,
         default to True.
+    sliding_cmvn : bool, optional
+        When ``with_cmvn`` is True, configure the pipeline for a
+        sliding-window CMVN normalization on each utterance instead of
+        a normalization based on statistics accumulated by speaker or
+        by utterance. The features are then extracted in a single pass.
+        Default to False.
+    dtype : str, optional
+        The precision of the extracted features, must be 'float64',
+        'float32' or 'float16'. The features are computed in float64
+        for 'float64' and in float32 otherwise, 'float16' being a
+        storage precision. By default, the features are returned in
+        the precision of the processors (float32 for most of them).
+    chunk_duration : float, optional
+        When specified, the utterances longer than ``chunk_duration``
+        seconds are split in chunks of that duration for features
+        extraction (see :func:`FramesProcessor.process_chunked
+        <shennong.features.processor.base.FramesProcessor.process_chunked>`),
+        this bounds the memory used by the processors on very long
+        utterances. Not supported for 'bottleneck' features. By
+        default the utterances are processed as a whole.
 
     Returns
     -------
@@ -134,7 +187,8 @@ def get_default_config(features, to_yaml=False, yaml_commented=True,
     Raises
     ------
     ValueError
-        If ``features`` is not in :func:`valid_features`.
+        If ``features`` is not in :func:`valid_features` or if
+        ``dtype`` or ``chunk_duration`` is not valid.
 
     """
     # check features are correct
@@ -142,14 +196,20 @@ def get_default_config(features, to_yaml=False, yaml_commented=True,
         raise ValueError('invalid features "{}", must be in {}'.format(
             features, ', '.join(valid_features())))
 
+    if dtype is not None:
+        _check_dtype(dtype)
+
+    if chunk_duration is not None:
+        _check_chunk_duration(chunk_duration, features)
+
     config = {}
 
     # filter out sample rate parameter because it is dependent of
-    # the input wav file
+    # the input wav file, and the dtype defined by the pipeline
     config[features] = {
         k: v for k, v in
         _Manager.get_processor_params(features).items()
-        if k not in ('sample_rate', 'htk_compat')}
+        if k not in ('sample_rate', 'htk_compat', 'dtype')}
 
     if with_pitch:
         # filter out the frame parameters, already specified for
@@ -161,13 +221,22 @@ def get_default_config(features, to_yaml=False, yaml_commented=True,
         config['pitch']['postprocessing'] = (
             _Manager.get_processor_params('pitch_post'))
 
-    if with_cmvn:
+    if with_cmvn and sliding_cmvn:
+        config['cmvn'] = {
+            'sliding': _Manager.get_processor_params('sliding_cmvn')}
+    elif with_cmvn:
         config['cmvn'] = {'by_speaker': True, 'with_vad': True}
         config['cmvn']['vad'] = _Manager.get_processor_params('vad')
 
     if with_delta:
         config['delta'] = _Manager.get_processor_params('delta')
 
+    if dtype is not None:
+        config['dtype'] = dtype
+
+    if chunk_duration is not None:
+        config['chunk_duration'] = chunk_duration
+
     if to_yaml:
         return _get_config_to_yaml(config, comments=yaml_commented)
     return config
@@ -221,19 +290,454 @@ def extract_features(configuration, utterances_index,
         extraction.
 
     """
-    # intialize the pipeline configuration, the list of wav files to
-    # process, instanciate the pipeline processors and make all the
-    # checks to ensure all is correct
-    njobs = get_njobs(njobs, log=log)
-    config = _init_config(configuration, log=log)
-    utterances = _init_utterances(utterances_index, log=log)
+    return Pipeline(configuration, log=log).process_many(
+        utterances_index, njobs=njobs)
+
+
+class Pipeline:
+    """A features extraction pipeline ready to process utterances
+
+    The pipeline configuration is parsed and validated once at
+    instanciation. The features processors and the metadata of the
+    wav files are cached between calls to :func:`process` and
+    :func:`process_many`, so that the same pipeline can be used
+    efficiently on successive (small) sets of utterances.
+
+    Parameters
+    ----------
+    config : dict or str
+        The pipeline configuration, can be a dictionary, a path to a
+        YAML file or a string formatted in YAML. To get a
+        configuration example, see :func:`get_default_config`
+    log : logging.Logger
+        A logger to display messages during pipeline execution
+
+    Raises
+    ------
+    ValueError
+        If the configuration is not valid.
+
+    """
+    def __init__(self, config, log=get_logger()):
+        self._log = log
+        self._config = _init_config(config, log=log)
 
-    # check the OMP_NUM_THREADS variable for parallel computations
-    _check_environment(njobs, log=log)
+        # the features type to be extracted
+        self._features = [
+            k for k in self.config.keys() if k in valid_features()][0]
 
-    # do all the computations
-    return _extract_features(
-        config, utterances, njobs=njobs, log=log)
+        # cache of the features processors and of the wavs metadata
+        self._processors = {}
+        self._wavs_metadata = {}
+
+        # CMVN statistics loaded by the user
+        self._cmvn_stats = {}
+
+    @property
+    def config(self):
+        """The pipeline configuration as a dictionary"""
+        return self._config
+
+    @property
+    def features(self):
+        """The name of the features extracted by the pipeline"""
+        return self._features
+
+    @property
+    def cmvn_stats(self):
+        """The loaded CMVN statistics as a dict {key: stats}
+
+        The keys are speakers if the CMVN is done by speaker, or
+        utterances otherwise. See :func:`load_cmvn_stats`.
+
+        """
+        return self._cmvn_stats
+
+    def load_cmvn_stats(self, stats):
+        """Loads CMVN statistics, for instance from a previous run
+
+        When stats are loaded for a speaker (or for an utterance if the
+        CMVN is not done by speaker), they are applied as is to the
+        features of that speaker, no accumulation is done on the
+        processed utterances.
+
+        Parameters
+        ----------
+        stats : dict or FeaturesCollection
+            The CMVN statistics to load as a dict {key: stats}, where
+            the keys are speakers if CMVN is by speaker, or utterances
+            otherwise, and stats are arrays of shape [2, dim+1] (see
+            :attr:`CmvnPostProcessor.stats
+            <shennong.features.postprocessor.cmvn.CmvnPostProcessor.stats>`).
+            Can also be features previously extracted with CMVN, the
+            stats are then read from the features properties.
+
+        Raises
+        ------
+        ValueError
+            If the pipeline is not configured for CMVN with accumulated
+            stats, or if the stats cannot be read from the features.
+
+        """
+        if 'cmvn' not in self.config or 'sliding' in self.config['cmvn']:
+            raise ValueError(
+                'cannot load cmvn stats, the pipeline is not configured '
+                'for cmvn or uses sliding cmvn')
+        by_speaker = self.config['cmvn']['by_speaker']
+
+        if isinstance(stats, FeaturesCollection):
+            collection, stats = stats, {}
+            for name, features in collection.items():
+                try:
+                    key = (features.properties['speaker'] if by_speaker
+                           else name)
+                    stats[key] = features.properties['cmvn']['stats']
+                except KeyError:
+                    raise ValueError(
+                        'cannot read cmvn stats from features {}'
+                        .format(name))
+
+        for key, value in stats.items():
+            value = np.array(value, dtype=np.float64)
+            if value.ndim != 2 or value.shape[0] != 2:
+                raise ValueError(
+                    'cmvn stats must be an array of shape (2, dim+1), '
+                    'but stats for {} are shaped as {}'
+                    .format(key, value.shape))
+            self._cmvn_stats[key] = value
+
+    def _manager(self, utterances, audios=None):
+        return _Manager(
+            self.config, utterances, log=self._log, audios=audios,
+            wavs_metadata=self._wavs_metadata, processors=self._processors,
+            cmvn_stats=self._cmvn_stats)
+
+    def process(self, audio, speaker=None):
+        """Extracts the features from an `audio` signal
+
+        Parameters
+        ----------
+        audio : :class:`~shennong.audio.Audio`
+            The audio signal to extract the features on.
+        speaker : str, optional
+            The speaker of the signal. Required if the pipeline does
+            CMVN by speaker: the CMVN stats loaded for that speaker
+            are applied, or if there is no loaded stats, the stats are
+            accumulated on that signal only.
+
+        Returns
+        -------
+        features : :class:`~shennong.features.features.Features`
+            The extracted features. If the `audio` has several
+            channels, returns a
+            :class:`~shennong.features.features.FeaturesCollection`
+            with the features of each channel as 'channel_0',
+            'channel_1', etc.
+
+        Raises
+        ------
+        ValueError
+            If something goes wrong during features extraction.
+
+        """
+        utterances = {'utt': _Utterance(
+            file=None, speaker=speaker, tstart=None, tstop=None)}
+        manager = self._manager(utterances, audios={'utt': audio})
+        features = _extract_features(manager, njobs=1, log=self._log)
+        if audio.nchannels == 1:
+            return features['utt']
+        return FeaturesCollection(
+            **{k.replace('utt_', '', 1): v for k, v in features.items()})
+
+    def process_many(self, utterances_index, njobs=1):
+        """Extracts the features from a list of utterances
+
+        The utterances in the ``utterances_index`` can be defined in
+        one of the formats described in :func:`extract_features`.
+
+        Parameters
+        ----------
+        utterances_index : sequence of tuples
+            The list of utterances to extract the features on.
+        njobs : int, optional
+            The number to subprocesses to execute in parallel, use a
+            single process by default.
+
+        Returns
+        -------
+        features : :class:`~shennong.features.features.FeaturesCollection`
+           The extracted speech features
+
+        Raises
+        ------
+        ValueError
+            If the ``utterances_index`` is invalid, or if something
+            goes wrong during features extraction.
+
+        """
+        njobs = get_njobs(njobs, log=self._log)
+        utterances = _init_utterances(utterances_index, log=self._log)
+
+        # check the OMP_NUM_THREADS variable for parallel computations
+        _check_environment(njobs, log=self._log)
+
+        return _extract_features(
+            self._manager(utterances), njobs=njobs, log=self._log)
+
+    def __getstate__(self):
+        # the cached processors are not sent to subprocesses
+        state = self.__dict__.copy()
+        state['_processors'] = {}
+        return state
+
+    async def aprocess(self, audio, speaker=None, executor=None):
+        """Extracts the features from an `audio` signal asynchronously
+
+        This is the asynchronous version of :func:`process`, the
+        computations are done in an `executor` so that the event loop
+        is not blocked.
+
+        Parameters
+        ----------
+        audio : :class:`~shennong.audio.Audio`
+            The audio signal to extract the features on, see
+            :func:`process`.
+        speaker : str, optional
+            The speaker of the signal, see :func:`process`.
+        executor : concurrent.futures.Executor, optional
+            The executor in which to run the computations. When a
+            :class:`~concurrent.futures.ProcessPoolExecutor` is used,
+            the pipeline is copied to the subprocess and the audio
+            signal and features are transfered through shared memory
+            (see :mod:`shennong.sharedmem`). Use the default executor
+            of the event loop by default.
+
+        Returns
+        -------
+        features : :class:`~shennong.features.features.Features`
+            The extracted features
+
+        """
+        if not isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, self.process, audio, speaker)
+
+        shared = sharedmem.share(audio)
+        try:
+            return sharedmem.unshare(
+                await asyncio.get_running_loop().run_in_executor(
+                    executor, _shared_call, self.process, shared, speaker))
+        finally:
+            sharedmem.release(shared)
+
+    async def aprocess_many(self, utterances_index, executor=None,
+                            max_workers=None, max_pending=None):
+        """Asynchronous iterator on features extracted from utterances
+
+        This is the asynchronous version of :func:`process_many`, the
+        computations are done in an `executor` and the features are
+        yielded as soon as they are extracted, as pairs (utterance,
+        features), in no particular order. At most `max_pending` batches
+        of utterances are processed or waiting to be consumed at the
+        same time.
+
+        When the pipeline accumulates CMVN statistics, the features
+        are yielded only once all the utterances have been processed
+        by the first pass (statistics accumulation). Use sliding CMVN
+        or load CMVN stats (see :func:`load_cmvn_stats`) to get a
+        streaming behavior.
+
+        If the iteration is cancelled or stopped before its end, the
+        pending computations are cancelled (but a computation already
+        started in the executor cannot be interrupted).
+
+        Parameters
+        ----------
+        utterances_index : sequence of tuples
+            The list of utterances to extract the features on, see
+            :func:`extract_features` for the accepted formats.
+        executor : str or concurrent.futures.Executor, optional
+            The executor in which to run the computations. Can be
+            'thread' or 'process' to use a new thread or process pool,
+            shutdown at the end of the iteration, or an existing
+            executor. Use the default executor of the event loop by
+            default. With a process pool, the features are transfered
+            through shared memory (see :mod:`shennong.sharedmem`).
+        max_workers : int, optional
+            The number of workers of the created executor when
+            `executor` is 'thread' or 'process'. Default to the number
+            of CPU cores.
+        max_pending : int, optional
+            The maximum number of batches of utterances being processed
+            at the same time, default to `max_workers`.
+
+        Yields
+        ------
+        utterance, features : str, :class:`~shennong.features.features.Features`
+            The extracted features of each utterance
+
+        Raises
+        ------
+        ValueError
+            If the ``utterances_index`` or the ``executor`` are
+            invalid, or if something goes wrong during features
+            extraction.
+
+        """
+        max_workers = get_njobs(max_workers, log=self._log)
+        max_pending = max_pending or max_workers
+        if max_pending <= 0:
+            raise ValueError(
+                'max_pending must be strictly positive, it is {}'
+                .format(max_pending))
+
+        if executor in ('thread', 'process'):
+            executor = (
+                concurrent.futures.ThreadPoolExecutor if executor == 'thread'
+                else concurrent.futures.ProcessPoolExecutor)(max_workers)
+            owned = True
+        elif executor is None or isinstance(
+                executor, concurrent.futures.Executor):
+            owned = False
+        else:
+            raise ValueError(
+                'executor must be "thread", "process" or an Executor, '
+                'it is {}'.format(executor))
+
+        # features are transfered to/from subprocesses in shared memory
+        shared = isinstance(executor, concurrent.futures.ProcessPoolExecutor)
+
+        try:
+            utterances = _init_utterances(utterances_index, log=self._log)
+            manager = self._manager(utterances)
+            batches = manager.get_batches(max_workers)
+
+            if any(manager.accumulate_cmvn(u) for u in manager.utterances):
+                # first pass on all the utterances, the cmvn stats are
+                # accumulated here as the batches are done
+                pass_one = []
+                results = _as_completed(
+                    executor, functools.partial(
+                        _extract_pass_one, manager=manager,
+                        accumulate=False, log=self._log),
+                    batches, max_pending, shared=shared)
+                try:
+                    async for batch in results:
+                        _accumulate_cmvn(batch, manager, log=self._log)
+                        pass_one.append(batch)
+                finally:
+                    await results.aclose()
+
+                batches = pass_one
+                function = _extract_pass_two
+            else:
+                function = _extract_single_pass
+
+            results = _as_completed(
+                executor, functools.partial(
+                    function, manager=manager, log=self._log),
+                batches, max_pending, shared=shared)
+            try:
+                async for batch in results:
+                    for utt_name, features in batch:
+                        yield utt_name, features
+            finally:
+                await results.aclose()
+        finally:
+            if owned:
+                executor.shutdown(wait=False)
+
+
+async def _as_completed(executor, function, arguments, max_pending,
+                        shared=False):
+    """Yields the results of `function` on each argument when available
+
+    The calls to `function` are done in the `executor`, with at most
+    `max_pending` calls submitted at the same time. On exit, the calls
+    not yet completed are cancelled. When `shared` is True, the audio
+    and features in the arguments and results are transfered through
+    shared memory. The shared results not consumed (because a call
+    failed or the iteration stopped) are released, for the calls
+    already started in the executor this is done (along with their
+    arguments) once they complete.
+
+    """
+    loop = asyncio.get_running_loop()
+    arguments = iter(arguments)
+    if shared:
+        function = functools.partial(_shared_call, function)
+        sharedmem.start_tracker()
+
+    # the submitted futures as a dict {future: (argument, source)},
+    # with shared memory the source is the concurrent future in the
+    # executor
+    pending = {}
+
+    def submit():
+        for argument in itertools.islice(
+                arguments, max_pending - len(pending)):
+            if shared:
+                argument = sharedmem.share(argument)
+                source = executor.submit(function, argument)
+                future = asyncio.wrap_future(source, loop=loop)
+            else:
+                source = None
+                future = loop.run_in_executor(executor, function, argument)
+            pending[future] = argument, source
+
+    try:
+        submit()
+        while pending:
+            done, _ = await asyncio.wait(
+                set(pending), return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                sharedmem.release(pending.pop(future)[0])
+            submit()
+
+            done = list(done)
+            try:
+                while done:
+                    result = done.pop().result()
+                    yield sharedmem.unshare(result) if shared else result
+            finally:
+                # on error or exit, release the results not consumed
+                if shared:
+                    for future in done:
+                        _release_result(future)
+    finally:
+        for future, (argument, source) in pending.items():
+            future.cancel()
+            if source is None or source.cancel():
+                sharedmem.release(argument)
+            else:
+                # a call already started cannot be cancelled, its
+                # argument and results are released once it completes
+                source.add_done_callback(
+                    functools.partial(_release_call, argument))
+
+
+def _release_result(future):
+    """Releases the shared memory in the result of a completed `future`"""
+    if not future.cancelled() and future.exception() is None:
+        sharedmem.release(future.result())
+
+
+def _release_call(argument, future):
+    """Releases the shared `argument` and result of a completed `future`"""
+    sharedmem.release(argument)
+    _release_result(future)
+
+
+def _shared_call(function, *args):
+    """Calls `function` on shared arguments and returns shared results
+
+    This is the entry point of the subprocesses when audio and features
+    are transfered through shared memory (see
+    :mod:`shennong.sharedmem`). The arguments are released by the
+    caller and the results by the consumer.
+
+    """
+    return sharedmem.share(function(*sharedmem.unshare(args, release=False)))
 
 
 # a little tweak to change the &log message in joblib parallel loops
@@ -316,11 +820,22 @@ def _get_config_to_yaml(config, comments=True):
             # special case of pitch_postprocessor
             if processor == 'postprocessing':
                 processor = 'pitch_post'
+            # special case of sliding cmvn
+            if processor == 'sliding':
+                processor = 'sliding_cmvn'
 
             if processor == 'vad':
                 config_commented.append(
                     "  # The vad options are not used if 'with_vad' is false")
             config_commented.append(line)
+        elif not line.startswith(' '):
+            # a pipeline parameter, not attached to a processor
+            param = line.split(': ')[0].strip()
+            default = line.split(': ')[1].strip()
+            config_commented += [
+                '# ' + w for w in textwrap.wrap(
+                    _pipeline_params[param].format(default), width=68)]
+            config_commented.append(line)
         else:
             param = line.split(': ')[0].strip()
             default = line.split(': ')[1].strip()
@@ -338,7 +853,9 @@ def _get_config_to_yaml(config, comments=True):
                 docstring = _Manager.get_docstring(
                     processor, param, default)
 
-            offset = 4 if processor in ('vad', 'pitch_post') else 2
+            offset = (
+                4 if processor in ('vad', 'pitch_post', 'sliding_cmvn')
+                else 2)
             config_commented += [
                 ' ' * offset + '# ' + w
                 for w in textwrap.wrap(docstring, width=68 - offset)]
@@ -365,7 +882,7 @@ def _init_config(config, log=get_logger()):
     # ensure all the keys in config are known
     unknown_keys = [
         k for k in config.keys()
-        if k not in _Manager._valid_processors]
+        if k not in _Manager._valid_processors and k not in _pipeline_params]
     if unknown_keys:
         raise ValueError(
             'invalid keys in configuration: {}'.format(
@@ -385,7 +902,16 @@ def _init_config(config, log=get_logger()):
             '(must have one and only one entry of {}): {}'
             .format(', '.join(valid_features()), ', '.join(features)))
 
-    if 'cmvn' in config:
+    if 'cmvn' in config and 'sliding' in config['cmvn']:
+        # sliding cmvn is applied on each utterance independently
+        # and does not require voice activity detection
+        if config['cmvn'].get('by_speaker') or config['cmvn'].get('with_vad'):
+            log.warning(
+                'by_speaker and with_vad options are ignored '
+                'with sliding cmvn')
+        config['cmvn']['by_speaker'] = False
+        config['cmvn']['with_vad'] = False
+    elif 'cmvn' in config:
         # force by_speaker to False if not existing
         if 'by_speaker' not in config['cmvn']:
             log.warning(
@@ -400,25 +926,93 @@ def _init_config(config, log=get_logger()):
     if 'pitch' in config and 'postprocessing' not in config['pitch']:
         config['pitch']['postprocessing'] = {}
 
+    if 'dtype' in config:
+        config['dtype'] = _check_dtype(config['dtype'])
+
+    if 'chunk_duration' in config:
+        _check_chunk_duration(config['chunk_duration'], features[0])
+
     # log message describing the pipeline configuration
     msg = []
     if 'pitch' in config:
         msg.append('pitch')
     if 'delta' in config:
         msg.append('delta')
-    if 'cmvn' in config:
+    if 'cmvn' in config and 'sliding' in config['cmvn']:
+        msg.append('sliding cmvn')
+    elif 'cmvn' in config:
         by = 'speaker' if config['cmvn']['by_speaker'] else 'utterance'
         vad = ' with vad' if config['cmvn']['with_vad'] else ''
         msg.append('cmvn by {}{}'.format(by, vad))
     log.info(
-        'pipeline configured for %s features extraction%s',
-        features[0], ' with {}'.format(', '.join(msg)) if msg else '')
+        'pipeline configured for %s features extraction%s%s',
+        features[0], ' with {}'.format(', '.join(msg)) if msg else '',
+        ' in {}'.format(config['dtype']) if 'dtype' in config else '')
 
     return config
 
 
+_pipeline_params = {
+    'dtype': (
+        'The precision of the extracted features, must be float64, '
+        'float32 or float16. The features are computed in float64 for '
+        'float64 and in float32 otherwise, float16 being a storage '
+        'precision. Default is {}.'),
+    'chunk_duration': (
+        'The utterances longer than this duration (in seconds) are '
+        'split in chunks for features extraction, this bounds the '
+        'memory used on very long utterances. Default is {}.')}
+"""The pipeline parameters not attached to a processor, with docstrings"""
+
+
+def _check_dtype(dtype):
+    """Returns the name of `dtype`, raises a ValueError if not supported"""
+    try:
+        name = np.dtype(dtype).name
+    except TypeError:
+        name = None
+    if name not in _Manager._valid_dtypes:
+        raise ValueError('invalid dtype "{}", must be in {}'.format(
+            dtype, ', '.join(_Manager._valid_dtypes)))
+    return name
+
+
+def _check_chunk_duration(chunk_duration, features):
+    """Raises a ValueError if `chunk_duration` is not supported"""
+    if features == 'bottleneck':
+        raise ValueError(
+            'chunk_duration is not supported for bottleneck features')
+    try:
+        valid = chunk_duration > 0
+    except TypeError:
+        valid = False
+    if not valid:
+        raise ValueError(
+            'chunk_duration must be strictly positive, it is {}'
+            .format(chunk_duration))
+
+
+_WavMetadata = collections.namedtuple(
+    '_WavMetadata', Audio._metawav._fields + ('partial', ))
+"""The metadata of a wav, see :func:`~shennong.audio.Audio.scan`
+
+The field `partial` is True if the samples format supports partial
+reads (see :func:`~shennong.audio.Audio.load_segment`).
+
+"""
+
+
+def _scan_wav(wav):
+    """Returns the metadata of a `wav` as a :class:`_WavMetadata`"""
+    header = Audio._scan(wav)
+    return _WavMetadata(
+        header.nchannels, header.sample_rate, header.nsamples,
+        header.nsamples / header.sample_rate, header.dtype is not None)
+
+
 _Utterance = collections.namedtuple(
-    '_Utterance', ['file', 'speaker', 'tstart', 'tstop'])
+    '_Utterance', ['file', 'speaker', 'tstart', 'tstop', 'channel'])
+_Utterance.__new__.__defaults__ = (None,)  # channel is None by default
 
 
 def _init_utterances(utts_index, log=get_logger()):
@@ -495,66 +1089,114 @@ def _init_utterances(utts_index, log=get_logger()):
     return utterances
 
 
-def _extract_features(config, utterances, njobs=1, log=get_logger()):
-    # the manager will instanciate the pipeline components
-    manager = _Manager(config, utterances, log=log)
-
+def _extract_features(manager, njobs=1, log=get_logger()):
     # verbosity level for joblib (no joblib verbosity on debug level
     # (level <= 10) because each step is already detailed in inner
     # loops
     verbose = 8 if log.getEffectiveLevel() > 10 else 0
 
+    # the utterances are processed by batches, this reduces the
+    # overhead of jobs dispatching and processors instanciation when
+    # processing a lot of short utterances
+    batches = manager.get_batches(njobs)
+
     # cmvn : two passes. 1st with features pitch and cmvn
     # accumulation, 2nd with cmvn application and delta
-    if 'cmvn' in config:
+    if 'cmvn' in manager.config and not manager.sliding_cmvn:
         # extract features and pitch, accumulate cmvn stats
         pass_one = _Parallel(
             'features extraction, pass 1', log,
             n_jobs=njobs, verbose=verbose, prefer='threads')(
                 joblib.delayed(_extract_pass_one)(
-                    utterance, manager, log=log) for utterance in utterances)
+                    batch, manager, log=log) for batch in batches)
 
         # apply cmvn and extract deltas
-        features = FeaturesCollection(**{k: v for k, v in _Parallel(
+        batches = _Parallel(
             'features extraction, pass 2', log,
             n_jobs=njobs, verbose=verbose, prefer='threads')(
                 joblib.delayed(_extract_pass_two)(
-                    utterance, manager, features, pitch, log=log)
-                for utterance, features, pitch in pass_one)})
+                    batch, manager, log=log) for batch in pass_one)
 
-    # no cmvn: single pass
+    # no cmvn or sliding cmvn: single pass
     else:
-        features = FeaturesCollection(**{k: v for k, v in _Parallel(
+        batches = _Parallel(
             'features extraction', log,
             n_jobs=njobs, verbose=verbose, prefer='threads')(
                 joblib.delayed(_extract_single_pass)(
-                    utterance, manager, log=log) for utterance in utterances)})
-
+                    batch, manager, log=log) for batch in batches)
+
+    return FeaturesCollection(
+        **{k: v for batch in batches for k, v in batch})
+
+
+def _extract_pass_one(utt_names, manager, accumulate=True, log=get_logger()):
+    # load audio signals of the utterances
+    audios = []
+    for utt_name in utt_names:
+        log.debug('%s: load audio', utt_name)
+        audios.append(manager.get_audio(utt_name))
+
+    # the intermediate features are not validated, the final ones are
+    # validated once at the end of the pass two
+    with Features.validation(False):
+        # main features extraction, all the utterances in the batch
+        # share the same features processor
+        log.debug(
+            '%s: extract %s', ', '.join(utt_names), manager.features)
+        features = _process_batch(
+            manager.get_features_processor(utt_names[0]), audios,
+            manager.chunk_duration)
+
+        batch = [
+            _extract_pass_one_utterance(
+                utt_name, manager, audio, feats, log=log)
+            for utt_name, audio, feats in zip(utt_names, audios, features)]
+
+    if accumulate:
+        _accumulate_cmvn(batch, manager, log=log)
+    return batch
+
+
+def _process_batch(processor, audios, chunk_duration=None):
+    # the signals longer than chunk_duration are processed by chunks,
+    # sequentially because the utterances are already processed in
+    # parallel jobs
+    if chunk_duration is None:
+        return processor.process_batch(audios)
+
+    features = [None] * len(audios)
+    short = [i for i, a in enumerate(audios) if a.duration <= chunk_duration]
+    for i, feats in zip(short, processor.process_batch(
+            [audios[i] for i in short])):
+        features[i] = feats
+    for i, audio in enumerate(audios):
+        if features[i] is None:
+            features[i] = processor.process_chunked(
+                audio, chunk_duration=chunk_duration, njobs=1)
     return features
 
 
-def _extract_pass_one(utt_name, manager, log=get_logger()):
-    # load audio signal of the utterance
-    log.debug('%s: load audio', utt_name)
-    audio = manager.get_audio(utt_name)
-
-    # main features extraction
-    log.debug('%s: extract %s', utt_name, manager.features)
-    features = manager.get_features_processor(utt_name).process(audio)
-
-    # cmvn accumulation
-    if 'cmvn' in manager.config:
-        log.debug('%s: accumulate cmvn', utt_name)
-        # weight CMVN by voice activity detection (null weights on
-        # non-voiced frames)
-        if manager.config['cmvn']['with_vad']:
-            energy = manager.get_energy_processor(utt_name).process(audio)
-            vad = manager.get_vad_processor(utt_name).process(energy)
-            vad = vad.data.reshape((vad.shape[0], ))  # reshape as 1d array
-        else:
-            vad = None
-
-        manager.get_cmvn_processor(utt_name).accumulate(features, weights=vad)
+def _accumulate_cmvn(batch, manager, log=get_logger()):
+    for utt_name, features, _, weights in batch:
+        if manager.accumulate_cmvn(utt_name):
+            log.debug('%s: accumulate cmvn', utt_name)
+            manager.get_cmvn_processor(utt_name).accumulate(
+                features, weights=weights)
+
+
+def _extract_pass_one_utterance(utt_name, manager, audio, features,
+                                log=get_logger()):
+    # weights for cmvn accumulation (accumulation is not done if the
+    # stats have been loaded from a previous run). Weight CMVN by
+    # voice activity detection (null weights on non-voiced frames)
+    if (manager.accumulate_cmvn(utt_name)
+            and manager.config['cmvn']['with_vad']):
+        log.debug('%s: compute vad', utt_name)
+        energy = manager.get_energy_processor(utt_name).process(audio)
+        vad = manager.get_vad_processor(utt_name).process(energy)
+        vad = vad.data.reshape((vad.shape[0], ))  # reshape as 1d array
+    else:
+        vad = None
 
     # pitch extraction
     if 'pitch' in manager.config:
@@ -571,49 +1213,70 @@ def _extract_pass_one(utt_name, manager, log=get_logger()):
         features.properties['speaker'] = speaker
 
     utterance = manager.utterances[utt_name]
-    features.properties['audio'] = {
-        'file': os.path.abspath(utterance.file),
-        'sample_rate': manager._wavs_metadata[utterance.file].sample_rate}
+    metadata = manager.get_metadata(utt_name)
+    audio = {}
+    if utterance.file is not None:
+        audio['file'] = os.path.abspath(utterance.file)
+    audio['sample_rate'] = metadata.sample_rate
+    if utterance.channel is not None:
+        audio['channel'] = utterance.channel
     if utterance.tstart is not None:
-        features.properties['audio']['tstart'] = utterance.tstart
-        features.properties['audio']['tstop'] = utterance.tstop
-        features.properties['audio']['duration'] = min(
+        audio['tstart'] = utterance.tstart
+        audio['tstop'] = utterance.tstop
+        audio['duration'] = min(
             utterance.tstop - utterance.tstart,
-            manager._wavs_metadata[utterance.file].duration - utterance.tstart)
+            metadata.duration - utterance.tstart)
     else:
-        features.properties['audio']['duration'] = (
-            manager._wavs_metadata[utterance.file].duration)
-
-    return utt_name, features, pitch
-
-
-def _extract_pass_two(utt_name, manager, features, pitch,
-                      tolerance=2, log=get_logger()):
-    # apply cmvn
-    if 'cmvn' in manager.config:
-        log.debug('%s: apply cmvn', utt_name)
-        features = manager.get_cmvn_processor(utt_name).process(features)
-
-    # apply delta
-    if 'delta' in manager.config:
-        log.debug('%s: apply delta', utt_name)
-        features = manager.get_delta_processor(utt_name).process(features)
-
-    # concatenate the pitch features to the main ones. because of
-    # downsampling in pitch processing the resulting number of frames
-    # can differ (the same tolerance is applied in Kaldi, see
-    # the paste-feats binary)
-    if pitch:
-        log.debug('%s: concatenate pitch', utt_name)
-        features._log = log
-        features = features.concatenate(pitch, tolerance=tolerance)
-
+        audio['duration'] = metadata.duration
+    features.properties['audio'] = freeze(audio)
+
+    return utt_name, features, pitch, vad
+
+
+def _extract_pass_two(batch, manager, tolerance=2, log=get_logger()):
+    return [
+        _extract_pass_two_utterance(
+            utt_name, manager, features, pitch, tolerance=tolerance, log=log)
+        for utt_name, features, pitch, _ in batch]
+
+
+def _extract_pass_two_utterance(utt_name, manager, features, pitch,
+                                tolerance=2, log=get_logger()):
+    with Features.validation(False):
+        # apply cmvn
+        if 'cmvn' in manager.config:
+            log.debug('%s: apply cmvn', utt_name)
+            features = manager.get_cmvn_processor(utt_name).process(features)
+
+        # apply delta
+        if 'delta' in manager.config:
+            log.debug('%s: apply delta', utt_name)
+            features = manager.get_delta_processor(
+                utt_name).process(features)
+
+        # concatenate the pitch features to the main ones. because of
+        # downsampling in pitch processing the resulting number of
+        # frames can differ (the same tolerance is applied in Kaldi,
+        # see the paste-feats binary)
+        if pitch:
+            log.debug('%s: concatenate pitch', utt_name)
+            features._log = log
+            features = features.concatenate(pitch, tolerance=tolerance)
+
+        # convert the features to the precision of the pipeline
+        if manager.dtype is not None and features.dtype != manager.dtype:
+            features = Features(
+                features.data.astype(manager.dtype), features.time_axis,
+                properties=features.properties)
+
+    # the output features are validated once
+    features.validate()
     return utt_name, features
 
 
-def _extract_single_pass(utt_name, manager, log=get_logger()):
-    _, features, pitch = _extract_pass_one(utt_name, manager, log=log)
-    return _extract_pass_two(utt_name, manager, features, pitch, log=log)
+def _extract_single_pass(utt_names, manager, log=get_logger()):
+    return _extract_pass_two(
+        _extract_pass_one(utt_names, manager, log=log), manager, log=log)
 
 
 class _Manager:
@@ -639,15 +1302,45 @@ class _Manager:
         'rastaplp': ('processor', 'RastaPlpProcessor'),
         'spectrogram': ('processor', 'SpectrogramProcessor'),
         'cmvn': ('postprocessor', 'CmvnPostProcessor'),
+        'sliding_cmvn': ('postprocessor', 'SlidingCmvnPostProcessor'),
         'delta': ('postprocessor', 'DeltaPostProcessor'),
         'vad': ('postprocessor', 'VadPostProcessor')}
     """The features processors as a dict {name: (module, class)}"""
 
-    def __init__(self, config, utterances, log=get_logger()):
+    _valid_dtypes = ('float64', 'float32', 'float16')
+    """The precisions of the features extracted by the pipeline"""
+
+    _max_batch_size = 64
+    """The maximal number of utterances processed in a single batch"""
+
+    _sparse_ratio = 0.5
+    """Wavs covered by segments below that ratio are read partially"""
+
+    def __init__(self, config, utterances, log=get_logger(), audios=None,
+                 wavs_metadata=None, processors=None, cmvn_stats=None):
         self._config = config
         self._utterances = utterances
         self.log = log
 
+        # the audio signals already loaded in memory as a dict
+        # {utterance: audio}, the file of those utterances is None
+        self._audios = audios or {}
+        self._audios_metadata = {
+            utt: Audio._metawav(
+                audio.nchannels, audio.sample_rate,
+                audio.nsamples, audio.duration)
+            for utt, audio in self._audios.items()}
+
+        # cached processors and wavs metadata, shared with a Pipeline
+        # instance across several runs
+        self._processors = processors if processors is not None else {}
+        wavs_metadata = wavs_metadata if wavs_metadata is not None else {}
+
+        # the CMVN statistics loaded from a previous run as a dict
+        # {speaker or utterance: stats}, no accumulation is done for
+        # them
+        self._cmvn_stats = cmvn_stats or {}
+
         # the list of speakers
         self._speakers = set(u.speaker for u in self.utterances.values())
         if self._speakers == {None}:
@@ -656,13 +1349,26 @@ class _Manager:
 
         # store the metadata because we need to access the sample rate
         # for processors instanciation
-        wavs = set(u.file for u in utterances.values())
-        self._wavs_metadata = {w: Audio.scan(w) for w in wavs}
+        wavs = set(
+            u.file for u in utterances.values() if u.file is not None)
+        for wav in wavs - wavs_metadata.keys():
+            wavs_metadata[wav] = _scan_wav(wav)
+        self._wavs_metadata = {w: wavs_metadata[w] for w in wavs}
 
         # make sure all the wavs are compatible with the pipeline
-        log.info(f'scanning {len(self._utterances)} utterances...')
+        if self._wavs_metadata:
+            log.info(f'scanning {len(self._utterances)} utterances...')
         self._check_wavs()
 
+        # the multi-channel utterances are splitted in one utterance
+        # per channel
+        self._expand_channels()
+
+        # the wavs from which only a small part is required, the
+        # segments are read directly from them instead of loading the
+        # whole file
+        self._sparse_wavs = self._get_sparse_wavs()
+
         # the features type to be extracted
         self.features = [
             k for k in self.config.keys() if k in self._valid_features][0]
@@ -674,16 +1380,15 @@ class _Manager:
         self.frame_shift = p.frame_shift
 
         # if CMVN by speaker, instanciate a CMVN processor by speaker
-        # here, else instanciate a processor per utterance
-        if 'cmvn' in self.config:
-            if self.config['cmvn']['by_speaker']:
-                self._cmvn_processors = {
-                    spk: self.get_processor_class('cmvn')(p.ndims)
-                    for spk in self.speakers}
-            else:
-                self._cmvn_processors = {
-                    utt: self.get_processor_class('cmvn')(p.ndims)
-                    for utt in self.utterances}
+        # here, else instanciate a processor per utterance (sliding
+        # CMVN needs no accumulation)
+        if 'cmvn' in self.config and not self.sliding_cmvn:
+            keys = (self.speakers if self.config['cmvn']['by_speaker']
+                    else self.utterances)
+            self._cmvn_processors = {
+                key: self.get_processor_class('cmvn')(
+                    p.ndims, stats=self._cmvn_stats.get(key))
+                for key in keys}
 
     @property
     def config(self):
@@ -697,6 +1402,28 @@ class _Manager:
     def speakers(self):
         return self._speakers
 
+    @property
+    def dtype(self):
+        """The precision of the extracted features, None if not specified"""
+        return self.config.get('dtype')
+
+    @property
+    def chunk_duration(self):
+        """The duration of chunks in seconds, None if not specified"""
+        return self.config.get('chunk_duration')
+
+    @property
+    def compute_dtype(self):
+        """The precision of the computations, None if not specified"""
+        if self.dtype is None:
+            return None
+        return 'float64' if self.dtype == 'float64' else 'float32'
+
+    @property
+    def sliding_cmvn(self):
+        """True if the pipeline uses sliding-window CMVN"""
+        return 'cmvn' in self.config and 'sliding' in self.config['cmvn']
+
     def _check_speakers(self):
         """Ensures the configuration is compatible with speakers information
 
@@ -725,22 +1452,30 @@ class _Manager:
     def _check_wavs(self):
         """Ensures all the wav files are compatible with the pipeline"""
         # log the total duration and the number of speakers
-        total_duration = sum(w.duration for w in self._wavs_metadata.values())
-        # nspeakers = len(self.speakers or self.utterances)
-        speakers = ('' if not self.speakers
-                    else ' from {} speakers'.format(len(self.speakers)))
-        self.log.info(
-            'get %s utterances%s in %s wavs, total wavs duration: %s',
-            len(self.utterances), speakers, len(self._wavs_metadata),
-            datetime.timedelta(seconds=total_duration))
-
-        # make sure all wavs are mono
-        if not all(w.nchannels == 1 for w in self._wavs_metadata.values()):
-            raise ValueError('all wav files are not mono')
+        if self._wavs_metadata:
+            total_duration = sum(
+                w.duration for w in self._wavs_metadata.values())
+            speakers = ('' if not self.speakers
+                        else ' from {} speakers'.format(len(self.speakers)))
+            self.log.info(
+                'get %s utterances%s in %s wavs, total wavs duration: %s',
+                len(self.utterances), speakers, len(self._wavs_metadata),
+                datetime.timedelta(seconds=total_duration))
+
+        metadata = (
+            list(self._wavs_metadata.values()) +
+            list(self._audios_metadata.values()))
+
+        # features are extracted on each channel of multi-channel wavs
+        multichannel = sum(w.nchannels > 1 for w in metadata)
+        if multichannel:
+            self.log.info(
+                'found %s multi-channel wavs, features are extracted on '
+                'each channel', multichannel)
 
         # check the sample rate (warning if all the wavs are not at the
         # same sample rate)
-        samplerates = set(w.sample_rate for w in self._wavs_metadata.values())
+        samplerates = set(w.sample_rate for w in metadata)
         if len(samplerates) > 1:
             self.log.warning(
                 'several sample rates found in wav files: %s, features '
@@ -758,6 +1493,58 @@ class _Manager:
                     'timestamps are not in increasing order for {}: '
                     '{} >= {}'.format(wfile, tstart, tstop))
 
+    def _expand_channels(self):
+        """Splits the multi-channel utterances in one utterance per channel
+
+        The utterance `utt` on a wav with n channels is replaced by the
+        utterances `utt_channel_0` to `utt_channel_<n-1>`. The channels
+        of an utterance are contiguous, so they are processed in the
+        same batch.
+
+        """
+        utterances = {}
+        for name, utt in self._utterances.items():
+            nchannels = self.get_metadata(name).nchannels
+            if nchannels == 1:
+                utterances[name] = utt
+                continue
+
+            for channel in range(nchannels):
+                channel_name = '{}_channel_{}'.format(name, channel)
+                utterances[channel_name] = utt._replace(channel=channel)
+                if name in self._audios:
+                    self._audios[channel_name] = self._audios[name]
+                    self._audios_metadata[channel_name] = (
+                        self._audios_metadata[name])
+
+        self._utterances = utterances
+
+    def _get_sparse_wavs(self):
+        """Returns the wavs sparsely covered by the utterances segments
+
+        A wav is sparse if the total duration of the segments extracted
+        from it is below `_sparse_ratio` times the wav duration. Only
+        the mono wavs supported by :func:`Audio.load_segment` are
+        returned (the channels of a wav are read once in the cache of
+        :func:`Audio.load`). The wavs are not read again, their format
+        is known from the metadata scanned at initialization.
+
+        """
+        covered = collections.defaultdict(float)
+        for utt in self.utterances.values():
+            if utt.file is None or utt.channel is not None:
+                continue
+            if utt.tstart is None:
+                covered[utt.file] = float('inf')
+            else:
+                covered[utt.file] += utt.tstop - utt.tstart
+
+        return {
+            wav for wav, duration in covered.items()
+            if self._wavs_metadata[wav].partial
+            and (duration < self._sparse_ratio
+                 * self._wavs_metadata[wav].duration)}
+
     @classmethod
     def get_processor_class(cls, name):
         """Returns the (post)processor class given its `name`
@@ -774,6 +1561,8 @@ class _Manager:
             raise ValueError('invalid processor "{}"'.format(name))
         if name == 'pitch_post':
             name = 'pitch'
+        if name == 'sliding_cmvn':
+            name = 'cmvn'
 
         module = 'shennong.features.{}.{}'.format(_module, name)
         try:
@@ -818,13 +1607,45 @@ class _Manager:
 
         return docstring.strip()
 
+    def accumulate_cmvn(self, utterance):
+        """True if CMVN stats must be accumulated on that `utterance`
+
+        This is False if the pipeline has no CMVN, uses sliding CMVN or
+        if CMVN stats have been loaded for that `utterance` (or its
+        speaker).
+
+        """
+        if 'cmvn' not in self.config or self.sliding_cmvn:
+            return False
+        key = (self.utterances[utterance].speaker
+               if self.config['cmvn']['by_speaker'] else utterance)
+        return key not in self._cmvn_stats
+
+    def get_metadata(self, utterance):
+        """Returns the metadata of the audio signal of that `utterance`"""
+        try:
+            return self._audios_metadata[utterance]
+        except KeyError:
+            return self._wavs_metadata[self.utterances[utterance].file]
+
     def get_audio(self, utterance):
         """Returns the audio data for that `utterance`"""
         utt = self.utterances[utterance]
-        audio = Audio.load(utt.file)
-        if utt.tstart is not None:
-            assert utt.tstop > utt.tstart
-            audio = audio.segment([(utt.tstart, utt.tstop)])[0]
+        if utterance in self._audios:
+            audio = self._audios[utterance]
+        elif utt.file in self._sparse_wavs:
+            # read only the segment from the file
+            audio = Audio.load_segment(utt.file, utt.tstart, utt.tstop)
+        else:
+            # memory-map the file when we need only a segment of it
+            audio = Audio.load(utt.file, mmap=utt.tstart is not None)
+            if utt.tstart is not None:
+                assert utt.tstop > utt.tstart
+                audio = audio.segment([(utt.tstart, utt.tstop)])[0]
+
+        # a strided view on the channel (no copy)
+        if utt.channel is not None:
+            audio = audio.channel(utt.channel)
 
         if self.features == 'bottleneck':
             # resample here the signal (this avoid bugs if one part of
@@ -836,32 +1657,81 @@ class _Manager:
                 audio.sample_rate, audio.dtype.itemsize * 8, 8000, 16)
 
             audio = audio.resample(8000).astype(np.int16)
-            self._wavs_metadata[self.utterances[utterance].file] = (
-                Audio._metawav(
-                    audio.nchannels, audio.sample_rate,
-                    audio.nsamples, audio.duration))
+            metadata = Audio._metawav(
+                audio.nchannels, audio.sample_rate,
+                audio.nsamples, audio.duration)
+            if utterance in self._audios:
+                self._audios_metadata[utterance] = metadata
+            else:
+                self._wavs_metadata[utt.file] = _WavMetadata(
+                    *metadata, self._wavs_metadata[utt.file].partial)
         return audio
 
+    def __getstate__(self):
+        # the cached processors are not sent to subprocesses
+        state = self.__dict__.copy()
+        state['_processors'] = {}
+        return state
+
+    def get_batches(self, njobs):
+        """Returns the utterances grouped by batches to be processed
+
+        The utterances in a batch share the same sample rate, so that
+        they can be processed by a single features processor (see
+        :func:`FeaturesProcessor.process_batch
+        <shennong.features.processor.base.FeaturesProcessor.process_batch>`).
+        The batches are small enough to be distributed among the
+        ``njobs`` parallel jobs.
+
+        """
+        utterances = list(self.utterances.keys())
+        size = max(1, min(
+            self._max_batch_size, -(-len(utterances) // njobs)))
+
+        batches = []
+        for _, group in itertools.groupby(
+                utterances, key=lambda u: self.get_metadata(u).sample_rate):
+            group = list(group)
+            batches += [group[i:i+size] for i in range(0, len(group), size)]
+        return batches
+
     def get_features_processor(self, utterance):
-        """Instanciates and returns a features extraction processor"""
-        wav = self.utterances[utterance].file
-        proc = self.get_processor_class(self.features)(
-            **self.config[self.features])
+        """Instanciates and returns a features extraction processor
+
+        The processors are instanciated once per sample rate and then
+        reused.
+
+        """
+        sample_rate = self.get_metadata(utterance).sample_rate
+        try:
+            return self._processors[(self.features, sample_rate)]
+        except KeyError:
+            pass
+
+        # the processors computing in several precisions follow the
+        # pipeline precision
+        cls = self.get_processor_class(self.features)
+        params = dict(self.config[self.features])
+        if self.compute_dtype and 'dtype' in cls._get_param_names():
+            params['dtype'] = self.compute_dtype
+
+        proc = cls(**params)
         proc._log = self.log
         try:
-            proc.sample_rate = self._wavs_metadata[wav].sample_rate
+            proc.sample_rate = sample_rate
         except AttributeError:
             # bottleneck does not support changing sample rate
             pass
+
+        self._processors[(self.features, sample_rate)] = proc
         return proc
 
     def get_energy_processor(self, utterance):
         """Instanciates and returns an energy processor"""
-        wav = self.utterances[utterance].file
         proc = self.get_processor_class('energy')()
         proc.frame_length = self.frame_length
         proc.frame_shift = self.frame_shift
-        proc.sample_rate = self._wavs_metadata[wav].sample_rate
+        proc.sample_rate = self.get_metadata(utterance).sample_rate
         return proc
 
     def get_vad_processor(self, utterance):
@@ -871,6 +1741,9 @@ class _Manager:
 
     def get_cmvn_processor(self, utterance):
         """Instanciates and returns a CMVN processor"""
+        if self.sliding_cmvn:
+            return self.get_processor_class('sliding_cmvn')(
+                **self.config['cmvn']['sliding'])
         if self.config['cmvn']['by_speaker']:
             speaker = self.utterances[utterance].speaker
             return self._cmvn_processors[speaker]
@@ -879,10 +1752,9 @@ class _Manager:
 
     def get_pitch_processor(self, utterance):
         """Instanciates and returns a pitch processor"""
-        wav = self.utterances[utterance].file
         params = {k: v for k, v in self.config['pitch'].items()
                   if k != 'postprocessing'}
-        params['sample_rate'] = self._wavs_metadata[wav].sample_rate
+        params['sample_rate'] = self.get_metadata(utterance).sample_rate
         params['frame_shift'] = self.frame_shift
         params['frame_length'] = self.frame_length
         return self.get_processor_class('pitch')(**params)
@@ -7,9 +7,13 @@
 """
 
 import abc
-import copy
+import joblib
+import numpy as np
 
-from shennong.features.processor.base import FeaturesProcessor
+from shennong.features import Features
+from shennong.features.processor.base import (
+    FeaturesProcessor, _process_chunk)
+from shennong.utils import freeze, get_njobs, intern_dict
 
 
 class FeaturesPostProcessor(FeaturesProcessor):
@@ -18,15 +22,88 @@ class FeaturesPostProcessor(FeaturesProcessor):
         """Returns features post-processed from input `features`"""
         pass  # pragma: no cover
 
-    def get_properties(self, features):
-        properties = copy.deepcopy(features.properties)
-        properties[self.name] = self.get_params()
+    @property
+    def context(self):
+        """The number of (left, right) frames required to process a frame
+
+        This is used to process features by chunks (see
+        :mod:`shennong.features.online`): the output for a given frame
+        depends only on that frame and on its `context`. It is None
+        for post-processors that need the whole features at once
+        (e.g. to accumulate statistics).
+
+        """
+        return None
+
+    def process_chunked(self, features, chunk_size=100000, njobs=None):
+        """Returns post-processed `features` computed by chunks
+
+        The features are split in chunks of `chunk_size` frames, each
+        chunk being extended on both sides by the :attr:`context` of
+        the post-processor. The chunks are processed in parallel jobs
+        and stitched back together, the result is the same as
+        :func:`process` on the whole features.
+
+        Parameters
+        ----------
+        features : :class:`~shennong.features.features.Features`
+            The input features to post-process
+        chunk_size : int, optional
+            The number of frames in a chunk, default to 100000
+        njobs : int, optional
+            The number of parallel jobs to run in background. Default
+            to the number of CPU cores available on the machine.
 
-        if 'pipeline' not in properties:
-            properties['pipeline'] = []
+        Returns
+        -------
+        features : :class:`~shennong.features.features.Features`
+            The post-processed features
 
-        properties['pipeline'].append({
-            'name': self.name,
-            'columns': [0, self.ndims - 1]})
+        Raises
+        ------
+        ValueError
+            If the post-processor has no context, if `chunk_size` is
+            not strictly positive or if `njobs` is <= 0
+
+        """
+        if self.context is None:
+            raise ValueError(
+                '{} cannot process features by chunks'.format(self.name))
+        if chunk_size <= 0:
+            raise ValueError(
+                'chunk size must be strictly positive, it is {}'
+                .format(chunk_size))
+        njobs = get_njobs(njobs, log=self._log)
+        if not features.nframes:
+            return self.process(features)
+
+        left, right = self.context
+        times = features.times
+        chunks = []
+        for first in range(0, features.nframes, chunk_size):
+            last = min(first + chunk_size, features.nframes)
+            start = max(0, first - left)
+            stop = min(features.nframes, last + right)
+            chunks.append((
+                Features(
+                    features.data[start:stop], times[start:stop],
+                    properties=features.properties, validate=False),
+                first - start, last - start))
+
+        data = joblib.Parallel(n_jobs=njobs, verbose=0)(
+            joblib.delayed(_process_chunk)(self, *chunk) for chunk in chunks)
+
+        return Features(
+            np.concatenate(data), features.time_axis,
+            properties=self.get_properties(features))
+
+    def get_properties(self, features):
+        # copy on write: the entries of the properties are read-only
+        # and shared with the input features, only the top-level dict
+        # is copied
+        properties = dict(features.properties)
+        properties[self.name] = intern_dict(self.get_params())
+        properties['pipeline'] = freeze(properties.get('pipeline', ())) + (
+            intern_dict({'name': self.name, 'columns': [0, self.ndims - 1]}), )
 
         return properties
@@ -50,12 +50,32 @@ True
 >>> np.all(np.isclose(cmvn.data.var(axis=0), np.ones(cmvn.ndims), atol=1e-6))
 True
 
+When global statistics are not available (e.g. when processing
+features on the fly), the :class:`SlidingCmvnPostProcessor` normalizes
+each frame with the statistics computed on a window of neighbouring
+frames (this is the Kaldi ``apply-cmvn-sliding`` program):
+
+>>> from shennong.features.postprocessor.cmvn import SlidingCmvnPostProcessor
+>>> processor = SlidingCmvnPostProcessor(window=300, center=True)
+>>> cmvn = processor.process(mfcc)
+>>> cmvn.shape == mfcc.shape
+True
+
+When the window is larger than the features, this is the same as
+a global normalization:
+
+>>> np.all(np.isclose(cmvn.data.mean(axis=0), np.zeros(cmvn.ndims), atol=1e-5))
+True
+
 
 References
 ----------
 
 .. [kaldi-cmvn] https://kaldi-asr.org/doc/transform.html#transform_cmvn
 
+.. [kaldi-cmvn-sliding]
+     https://kaldi-asr.org/doc/apply-cmvn-sliding_8cc.html
+
 """
 
 import numpy as np
@@ -63,7 +83,8 @@ import kaldi.matrix
 import kaldi.transform.cmvn
 
 from shennong.features.postprocessor.base import FeaturesPostProcessor
-from shennong.features import Features, FeaturesCollection
+from shennong.features import Features, FeaturesCollection, RegularTimes
+from shennong.utils import freeze, intern_dict
 
 
 class CmvnPostProcessor(FeaturesPostProcessor):
@@ -96,7 +117,9 @@ class CmvnPostProcessor(FeaturesPostProcessor):
 
         # init the stats if specified
         if stats is not None:
-            stats = np.asarray(stats)
+            # copy the stats, they can be read-only when taken from
+            # features properties
+            stats = np.array(stats)
             if stats.shape != (2, self.dim+1):
                 raise ValueError(
                     'stats must be an array of shape {}, but is shaped as {}'
@@ -145,7 +168,8 @@ class CmvnPostProcessor(FeaturesPostProcessor):
 
     def get_properties(self, features):
         properties = super().get_properties(features)
-        properties[self.name]['stats'] = self.stats
+        properties[self.name] = intern_dict(
+            dict(properties[self.name], stats=self.stats))
         return properties
 
     def accumulate(self, features, weights=None):
@@ -249,7 +273,166 @@ class CmvnPostProcessor(FeaturesPostProcessor):
         cmvn.apply(data, norm_vars=norm_vars, reverse=reverse)
 
         return Features(
-            data.numpy(), features.times,
+            data.numpy(), features.time_axis,
+            properties=self.get_properties(features))
+
+
+class SlidingCmvnPostProcessor(FeaturesPostProcessor):
+    """Applies sliding-window CMVN on speech features
+
+    Each frame is normalized with the mean (and optionally the
+    variance) computed on a window of neighbouring frames. This does
+    not require to accumulate statistics beforehand, so it can be
+    applied on each utterance independently and in a single pass. This
+    replicates the Kaldi ``apply-cmvn-sliding`` program (see
+    [kaldi-cmvn-sliding]_), the window statistics being computed from
+    cumulative sums.
+
+    Parameters
+    ----------
+    window : int, optional
+        Window size in frames, default to 600.
+    center : bool, optional
+        Whether the window is centered on the current frame, default
+        to False.
+    min_window : int, optional
+        Minimum window size in frames, default to 100.
+    norm_vars : bool, optional
+        Whether to normalize variance, default to False.
+
+    Raises
+    ------
+    ValueError
+        If `window` or `min_window` are not strictly positive integers
+        or if `min_window` is greater than `window`.
+
+    """
+    def __init__(self, window=600, center=False, min_window=100,
+                 norm_vars=False):
+        if not isinstance(window, int) or window <= 0:
+            raise ValueError(
+                'window must be a strictly positive integer, it is {}'
+                .format(window))
+        if not isinstance(min_window, int) or not 0 < min_window <= window:
+            raise ValueError(
+                'min_window must be an integer in [1, {}], it is {}'
+                .format(window, min_window))
+
+        self._window = window
+        self._center = bool(center)
+        self._min_window = min_window
+        self._norm_vars = bool(norm_vars)
+
+    @property
+    def name(self):
+        return 'sliding_cmvn'
+
+    @property
+    def window(self):
+        """Window size in frames for running average CMN computation"""
+        return self._window
+
+    @property
+    def center(self):
+        """Whether the window is centered on the current frame
+
+        If true, use a window centered on the current frame (to the
+        extent possible, modulo end effects). If false, the window
+        ends on the current frame.
+
+        """
+        return self._center
+
+    @property
+    def min_window(self):
+        """Minimum window size in frames
+
+        Used at the start of decoding (adds latency only at the start).
+        Only applicable if center is false, ignored if center is true.
+
+        """
+        return self._min_window
+
+    @property
+    def norm_vars(self):
+        """Whether to normalize variance as well as mean"""
+        return self._norm_vars
+
+    @property
+    def context(self):
+        if self.center:
+            return (self.window, self.window)
+        return (self.window, self.min_window)
+
+    @property
+    def ndims(self):
+        raise ValueError(
+            'output dimension for sliding cmvn processor depends on input')
+
+    def get_properties(self, features):
+        properties = dict(features.properties)
+        properties[self.name] = intern_dict(self.get_params())
+        properties['pipeline'] = freeze(properties.get('pipeline', ())) + (
+            intern_dict({
+                'name': self.name, 'columns': [0, features.ndims - 1]}), )
+
+        return properties
+
+    def _windows(self, nframes):
+        """Returns the [start, end[ indices of the window of each frame"""
+        frames = np.arange(nframes)
+        if self.center:
+            start = frames - self.window // 2
+            end = start + self.window
+        else:
+            start = frames - self.window
+            end = frames + 1
+
+        # window shifted to the right at the start
+        end = np.where(start < 0, end - start, end)
+        start = np.maximum(start, 0)
+
+        if not self.center:
+            end = np.maximum(frames + 1, self.min_window)
+
+        # window shifted to the left at the end
+        start = np.where(end > nframes, start - (end - nframes), start)
+        start = np.maximum(start, 0)
+        end = np.minimum(end, nframes)
+
+        return start, end
+
+    def process(self, features):
+        """Applies sliding-window CMVN on the given `features`
+
+        Parameters
+        ----------
+        features : :class:`~shennong.features.features.Features`
+            The input features on which to apply CMVN.
+
+        Returns
+        -------
+        cmvn_features : :class:`~shennong.features.features.Features`
+            The normalized features
+
+        """
+        data = features.data.astype(np.float64)
+        start, end = self._windows(features.nframes)
+        count = (end - start)[:, np.newaxis]
+
+        # sums of features over [0, t[ for all frames t
+        cumsum = np.zeros((features.nframes + 1, features.ndims))
+        np.cumsum(data, axis=0, out=cumsum[1:])
+        mean = (cumsum[end] - cumsum[start]) / count
+        normalized = data - mean
+
+        if self.norm_vars:
+            cumsum[1:] = np.cumsum(data ** 2, axis=0)
+            variance = (cumsum[end] - cumsum[start]) / count - mean ** 2
+            normalized /= np.sqrt(np.maximum(variance, 1e-10))
+
+        return Features(
+            normalized.astype(features.dtype), features.time_axis,
             properties=self.get_properties(features))
 
 
@@ -325,6 +508,10 @@ def apply_cmvn(feats_collection, by_collection=True, norm_vars=True,
                 'out of bounds dimensions in skip_dims, must be in [0, {}] '
                 'but are in [{}, {}]'.format(dim-1, sdmin, sdmax))
 
+    if by_collection and feats_collection.packed is not None:
+        return _apply_cmvn_packed(
+            feats_collection, dim, norm_vars, weights, skip_dims)
+
     if by_collection:
         # accumulate CMVN stats over the whole collection
         cmvn = CmvnPostProcessor(dim)
@@ -348,3 +535,45 @@ def apply_cmvn(feats_collection, by_collection=True, norm_vars=True,
                 f, norm_vars=norm_vars, skip_dims=skip_dims)
 
         return cmvn_collection
+
+
+def _apply_cmvn_packed(feats_collection, dim, norm_vars, weights, skip_dims):
+    # CMVN over a packed collection: the stats are accumulated and
+    # applied at once on the whole features buffer, the normalized
+    # collection is packed as well
+    packed = feats_collection.packed
+    nframes = np.diff(packed.offsets)
+
+    if weights is not None:
+        given = [weights[k] for k in packed.keys if weights[k] is not None]
+        if not given:
+            weights = None
+        else:
+            dtype = np.result_type(*given)
+            weights = [
+                np.ones((n,), dtype=dtype) if weights[k] is None
+                else weights[k]
+                for k, n in zip(packed.keys, nframes)]
+            for k, w, n in zip(packed.keys, weights, nframes):
+                if w.shape[0] != n:
+                    raise ValueError(
+                        'there is {} weights but {} feature frames for {}, '
+                        'must be equal'.format(w.shape[0], n, k))
+            weights = np.concatenate(weights)
+
+    # the whole buffer is seen as a single features, its time axis is
+    # a placeholder
+    features = Features(
+        packed.data, RegularTimes(0, 1, 1, packed.data.shape[0]),
+        validate=False)
+
+    cmvn = CmvnPostProcessor(dim)
+    cmvn.accumulate(features, weights=weights)
+    data = cmvn.process(
+        features, norm_vars=norm_vars, skip_dims=skip_dims).data
+
+    return FeaturesCollection._from_packed(
+        data, packed.offsets, packed.keys,
+        [feats_collection[k].time_axis for k in packed.keys],
+        [cmvn.get_properties(feats_collection[k]) for k in packed.keys],
+        validate=False)
@@ -43,12 +43,12 @@ References
 
 """
 
-import copy
 import kaldi.feat.functions
 import kaldi.matrix
 
 from shennong.features import Features
 from shennong.features.postprocessor.base import FeaturesPostProcessor
+from shennong.utils import freeze, intern_dict
 
 
 class DeltaPostProcessor(FeaturesPostProcessor):
@@ -88,6 +88,10 @@ class DeltaPostProcessor(FeaturesPostProcessor):
                 'window must be in [1, 999], it is {}'.format(value))
         self._options.window = value
 
+    @property
+    def context(self):
+        return (self.order * self.window, self.order * self.window)
+
     @property
     def ndims(self):
         raise ValueError(
@@ -95,17 +99,12 @@ class DeltaPostProcessor(FeaturesPostProcessor):
 
     def get_properties(self, features):
         ndims = (self.order + 1) * features.ndims
-        properties = copy.deepcopy(features.properties)
-        properties[self.name] = {
+        properties = dict(features.properties)
+        properties[self.name] = intern_dict({
             'order': self.order,
-            'window': self.window}
-
-        if 'pipeline' not in properties:
-            properties['pipeline'] = []
-
-        properties['pipeline'].append({
-            'name': self.name,
-            'columns': [0, ndims - 1]})
+            'window': self.window})
+        properties['pipeline'] = freeze(properties.get('pipeline', ())) + (
+            intern_dict({'name': self.name, 'columns': [0, ndims - 1]}), )
 
         return properties
 
@@ -131,5 +130,5 @@ class DeltaPostProcessor(FeaturesPostProcessor):
 
         return Features(
             data,
-            features.times,
+            features.time_axis,
             self.get_properties(features))
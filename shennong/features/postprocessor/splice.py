@@ -0,0 +1,167 @@
+"""Splice features frames with their left and right context
+
+Concatenates each frame with its neighbours, as done by the Kaldi
+program splice-feats (see [kaldi-splice]_):
+
+    :class:`~shennong.features.features.Features` -->
+    SplicePostProcessor -->
+    :class:`~shennong.features.features.Features`
+
+The frame `t` of the spliced features is the concatenation of the
+frames ``t - left_context`` to ``t + right_context`` of the input
+features, the first and last frames being replicated at the edges.
+
+The spliced features are, by default, a read-only view on the input
+features padded with the replicated edges: the frames are not
+duplicated in memory. A writeable copy is made on request only. Note
+that the Kaldi based post-processors (such as
+:class:`~shennong.features.postprocessor.cmvn.CmvnPostProcessor`)
+cannot operate on such a view and require a copy.
+
+Examples
+--------
+
+>>> import numpy as np
+>>> from shennong.audio import Audio
+>>> from shennong.features.processor.mfcc import MfccProcessor
+>>> from shennong.features.postprocessor.splice import SplicePostProcessor
+>>> audio = Audio.load('./test/data/test.wav')
+>>> mfcc = MfccProcessor().process(audio)
+
+Splice the MFCC frames with a context of 2 frames on each side:
+
+>>> processor = SplicePostProcessor(left_context=2, right_context=2)
+>>> spliced = processor.process(mfcc)
+>>> spliced.shape[1] == mfcc.shape[1] * 5
+True
+
+The central columns of the spliced features are the original frames,
+the data is a read-only view:
+
+>>> nmfcc = mfcc.shape[1]
+>>> np.array_equal(spliced.data[:, 2*nmfcc:3*nmfcc], mfcc.data)
+True
+>>> spliced.data.flags.writeable
+False
+
+Get a writeable copy instead:
+
+>>> spliced = processor.process(mfcc, writeable=True)
+>>> spliced.data.flags.writeable
+True
+
+References
+----------
+
+.. [kaldi-splice] http://kaldi-asr.org/doc/splice-feats_8cc.html
+
+"""
+
+import numpy as np
+
+from shennong.features import Features
+from shennong.features.postprocessor.base import FeaturesPostProcessor
+from shennong.utils import freeze, intern_dict
+
+
+class SplicePostProcessor(FeaturesPostProcessor):
+    def __init__(self, left_context=4, right_context=4):
+        self.left_context = left_context
+        self.right_context = right_context
+
+    @property
+    def name(self):
+        return 'splice'
+
+    @property
+    def left_context(self):
+        """Number of frames of left context"""
+        return self._left_context
+
+    @left_context.setter
+    def left_context(self, value):
+        if int(value) != value or value < 0:
+            raise ValueError(
+                'left context must be a positive integer, it is {}'
+                .format(value))
+        self._left_context = int(value)
+
+    @property
+    def right_context(self):
+        """Number of frames of right context"""
+        return self._right_context
+
+    @right_context.setter
+    def right_context(self, value):
+        if int(value) != value or value < 0:
+            raise ValueError(
+                'right context must be a positive integer, it is {}'
+                .format(value))
+        self._right_context = int(value)
+
+    @property
+    def context(self):
+        return (self.left_context, self.right_context)
+
+    @property
+    def ndims(self):
+        raise ValueError(
+            'output dimension for splice processor depends on input')
+
+    def get_properties(self, features):
+        ndims = (self.left_context + self.right_context + 1) * features.ndims
+        properties = dict(features.properties)
+        properties[self.name] = intern_dict(self.get_params())
+        properties['pipeline'] = freeze(properties.get('pipeline', ())) + (
+            intern_dict({'name': self.name, 'columns': [0, ndims - 1]}), )
+
+        return properties
+
+    def process(self, features, writeable=False):
+        """Splices the frames of `features` with their context
+
+        Parameters
+        ----------
+        features : Features, shape = [nframes, ncols]
+            The input features to splice
+        writeable : bool, optional
+            Default to False. When True, the returned features are a
+            writeable copy. When False, the returned features are a
+            read-only view on the input `features` padded with the
+            replicated edges, no frame is duplicated in memory.
+
+        Returns
+        -------
+        spliced : Features, shape = [nframes, ncols * (`left_context` + 1 + `right_context`)]
+            The spliced features, made of the concatenation of each
+            frame with its left and right context.
+
+        """
+        left, right = self.context
+        nframes, ndims = features.shape
+
+        if not nframes:
+            data = np.empty(
+                (0, (left + 1 + right) * ndims), dtype=features.dtype)
+        else:
+            # replicate the first and last frames at the edges, the
+            # padded array is contiguous so the context of a frame
+            # is a contiguous block of memory
+            padded = np.ascontiguousarray(np.concatenate((
+                np.repeat(features.data[:1], left, axis=0),
+                features.data,
+                np.repeat(features.data[-1:], right, axis=0)))
+                if left or right else features.data)
+
+            # each spliced frame starts at the next padded frame
+            data = np.lib.stride_tricks.as_strided(
+                padded,
+                shape=(nframes, (left + 1 + right) * ndims),
+                strides=padded.strides,
+                writeable=False)
+
+        if writeable is True:
+            data = data.copy()
+
+        return Features(
+            data, features.time_axis, self.get_properties(features))
@@ -186,4 +186,4 @@ class VadPostProcessor(FeaturesPostProcessor):
 
         return Features(
             np.atleast_2d(data.astype(np.uint8)).T,
-            features.times, properties=self.get_properties(features))
+            features.time_axis, properties=self.get_properties(features))
@@ -13,9 +13,10 @@ import kaldi.feat.mel
 import joblib
 import numpy as np
 
+from shennong.audio import Audio
 from shennong.base import BaseProcessor
-from shennong.features import Features, FeaturesCollection
-from shennong.utils import get_njobs
+from shennong.features import Features, FeaturesCollection, RegularTimes
+from shennong.utils import get_njobs, intern_dict
 
 
 class FeaturesProcessor(BaseProcessor, metaclass=abc.ABCMeta):
@@ -33,9 +34,10 @@ class FeaturesProcessor(BaseProcessor, metaclass=abc.ABCMeta):
     def get_properties(self):
         """Return the processors properties as a dictionary"""
         return {
-            'pipeline': [
-                {'name': self.name, 'columns': [0, self.ndims-1]}],
-            self.name: self.get_params()}
+            'pipeline': (
+                intern_dict({'name': self.name, 'columns': [0, self.ndims-1]}),
+            ),
+            self.name: intern_dict(self.get_params())}
 
     @abc.abstractmethod
     def process(self, signal):
@@ -54,6 +56,55 @@ class FeaturesProcessor(BaseProcessor, metaclass=abc.ABCMeta):
         """
         pass  # pragma: no cover
 
+    def process_batch(self, signals):
+        """Returns features processed from a sequence of input `signals`
+
+        The signals are processed sequentially and the returned
+        features are the same as calling :func:`process` on each
+        signal. Some processors override this method to share the
+        setup overhead (options checking, instanciation of the
+        underlying Kaldi computer, properties) among all the signals,
+        which is of interest when processing a lot of short signals.
+
+        Parameters
+        ----------
+        signals: sequence of :class`~shennong.audio.Audio`
+            The input audio signals to process features on
+
+        Returns
+        -------
+        features: list of :class:`~shennong.features.features.Features`
+            The computed features, in the order of the input `signals`
+
+        """
+        return [self.process(signal) for signal in signals]
+
+    def process_channels(self, signal):
+        """Returns features processed on each channel of a `signal`
+
+        The channels are strided views on the multi-channel `signal`
+        (no data is copied) and are processed with
+        :func:`process_batch`, so that the framing parameters and
+        features properties are shared among the channels.
+
+        Parameters
+        ----------
+        signal : :class:`~shennong.audio.Audio`
+            The input audio signal, can have any number of channels
+
+        Returns
+        -------
+        features : :class:`~shennong.features.features.FeaturesCollection`
+            The features computed on each channel, indexed by
+            'channel_0', 'channel_1', etc.
+
+        """
+        return FeaturesCollection(**{
+            'channel_{}'.format(index): features
+            for index, features in enumerate(self.process_batch(
+                [signal.channel(index)
+                 for index in range(signal.nchannels)]))})
+
     def process_all(self, signals, njobs=None):
         """Returns features processed from several input `signals`
 
@@ -93,6 +144,17 @@ class FeaturesProcessor(BaseProcessor, metaclass=abc.ABCMeta):
                 for name, signal in signals.items())})
 
 
+def _process_chunk(processor, data, first, last):
+    """Returns the frames [first, last) of `data` processed by `processor`
+
+    Auxiliary function to :func:`FramesProcessor.process_chunked` and
+    :func:`FeaturesPostProcessor.process_chunked` executed in a
+    subprocess.
+
+    """
+    return processor.process(data).data[first:last]
+
+
 class FramesProcessor(FeaturesProcessor, metaclass=abc.ABCMeta):
     """A base class for frame based features processors.
 
@@ -247,9 +309,143 @@ class FramesProcessor(FeaturesProcessor, metaclass=abc.ABCMeta):
 
     def times(self, nframes):
         """Returns the times label for the rows given by :func:`process`"""
-        return np.vstack((
-            np.arange(nframes) * self.frame_shift,
-            np.arange(nframes) * self.frame_shift + self.frame_length)).T
+        return self._regular_times(nframes).to_array()
+
+    def _regular_times(self, nframes):
+        """Returns the times of :func:`times` as a compact time axis"""
+        return RegularTimes(0, self.frame_shift, self.frame_length, nframes)
+
+    def _chunk_margin(self):
+        """Number of frames added on both sides of a chunk
+
+        See :func:`process_chunked`. The margin covers the frame
+        length, so that the frames at the border of a chunk are
+        extracted from the exact same samples as in the whole signal.
+
+        """
+        return int(np.ceil(self.frame_length / self.frame_shift))
+
+    def process_chunked(self, signal, chunk_duration=60, njobs=None):
+        """Returns features processed on a long `signal` split in chunks
+
+        The signal is split in chunks of `chunk_duration` seconds,
+        each chunk being extended by an overlapping margin on both
+        sides. The chunks are processed in parallel jobs and the
+        features are stitched back together. This is useful to
+        process very long recordings on several CPU cores.
+
+        The returned features are the same as computed by
+        :func:`process` on the whole signal (when `dither` is 0,
+        otherwise the dithering noise differs). For processors with a
+        recursive filter along frames (RASTA-PLP), the margin is long
+        enough for the filter to forget the start of the chunk and the
+        features are equal up to the float32 rounding.
+
+        Parameters
+        ----------
+        signal : :class:`~shennong.audio.Audio`
+            The input audio signal to process features on
+        chunk_duration : float, optional
+            The duration of a chunk in seconds, default to 60
+        njobs : int, optional
+            The number of parallel jobs to run in background. Default
+            to the number of CPU cores available on the machine.
+
+        Returns
+        -------
+        features : :class:`~shennong.features.features.Features`
+            The computed features
+
+        Raises
+        ------
+        ValueError
+            If the signal cannot be processed, if `chunk_duration` is
+            not strictly positive or if `njobs` is <= 0
+
+        """
+        self._check_signal(signal)
+        if chunk_duration <= 0:
+            raise ValueError(
+                'chunk duration must be strictly positive, it is {}'
+                .format(chunk_duration))
+        njobs = get_njobs(njobs, log=self._log)
+
+        shift = self._frame_options.window_shift()
+        length = self._frame_options.window_size()
+        # the first sample of the frame 0, negative when the signal
+        # is reflected on the left edge (see Kaldi FirstSampleOfFrame)
+        offset = 0 if self.snip_edges else shift // 2 - length // 2
+
+        nframes = kaldi.feat.window.num_frames(
+            signal.nsamples, self._frame_options)
+        chunk_size = max(1, int(round(chunk_duration / self.frame_shift)))
+        margin = self._chunk_margin()
+
+        # for each chunk of frames [first, last), process a segment
+        # starting on a frame boundary and extended by the margin, and
+        # keep only the frames of the chunk
+        chunks = []
+        for first in range(0, nframes, chunk_size):
+            last = min(first + chunk_size, nframes)
+            start = max(0, first - margin)
+            stop = min(
+                signal.nsamples,
+                (last - 1 + margin) * shift + offset + length)
+            chunks.append((
+                Audio(
+                    signal.data[start * shift:stop], signal.sample_rate,
+                    validate=False),
+                first - start, last - start))
+
+        # chunks are processed in subprocesses because the Python part
+        # of some processors (e.g. RASTA filtering) holds the GIL
+        data = joblib.Parallel(n_jobs=njobs, verbose=0)(
+            joblib.delayed(_process_chunk)(self, *chunk) for chunk in chunks)
+
+        data = np.concatenate(data) if data else np.zeros(
+            (0, self.ndims), dtype=np.float32)
+        return Features(
+            data, self._regular_times(data.shape[0]),
+            properties=self.get_properties())
+
+    def _check_signal(self, signal):
+        """Raises a ValueError if `signal` cannot be processed"""
+        if signal.nchannels != 1:
+            raise ValueError(
+                'signal must have one dimension, but it has {}'
+                .format(signal.nchannels))
+
+        if self.sample_rate != signal.sample_rate:
+            raise ValueError(
+                'processor and signal mismatch in sample rates: '
+                '{} != {}'.format(self.sample_rate, signal.sample_rate))
+
+    @staticmethod
+    def _compute(computer, signal, vtln_warp):
+        """Returns the features computed by a Kaldi `computer` on `signal`"""
+        # force 16 bits samples, as floats for Kaldi
+        signal = signal.as_int16_float32()
+        return kaldi.matrix.SubMatrix(
+            computer.compute(
+                kaldi.matrix.SubVector(signal), vtln_warp)).numpy()
+
+    def _batch_features(self, data):
+        """Returns a list of features from a list of `data` arrays
+
+        Auxiliary method to :func:`process_batch`: the properties are
+        computed once and each features has its own shallow copy of
+        them (the read-only entries are shared).
+
+        """
+        if not data:
+            return []
+
+        properties = self.get_properties()
+        return [
+            Features(
+                d, self._regular_times(d.shape[0]),
+                properties=dict(properties), validate=False)
+            for d in data]
 
 
 class MelFeaturesProcessor(FramesProcessor):
@@ -389,30 +585,58 @@ class MelFeaturesProcessor(FramesProcessor):
         """
         return self._process(self._kaldi_processor, signal, vtln_warp)
 
-    def _process(self, cls, signal, vtln_warp):
-        """Inner process method common to all Kaldi Mel processors"""
-        # ensure the signal is correct
-        if signal.nchannels != 1:
-            raise ValueError(
-                'signal must have one dimension, but it has {}'
-                .format(signal.nchannels))
+    def process_batch(self, signals, vtln_warp=1.0):
+        """Compute features on a sequence of signals
 
-        if self.sample_rate != signal.sample_rate:
-            raise ValueError(
-                'processor and signal mismatch in sample rates: '
-                '{} != {}'.format(self.sample_rate, signal.sample_rate))
+        This is the same as calling :func:`process` on each signal,
+        but the Kaldi computer and the features properties are built
+        only once for all the signals.
 
+        Parameters
+        ----------
+        signals : sequence of Audio
+            The input audio signals to compute the features on, must
+            be mono
+        vtln_warp : float, optional
+            The VTLN warping factor to be applied when computing
+            features. Be 1.0 by default, meaning no warping is to be
+            done.
+
+        Returns
+        -------
+        features : list of `Features`
+            The computed features, in the order of the input `signals`
+
+        Raises
+        ------
+        ValueError
+            If an input signal has more than one channel (i.e. is not
+            mono). If `sample_rate` != `signal.sample_rate`.
+
+        """
+        for signal in signals:
+            self._check_signal(signal)
+
+        computer = self._get_computer(self._kaldi_processor)
+        return self._batch_features(
+            [self._compute(computer, signal, vtln_warp)
+             for signal in signals])
+
+    def _get_computer(self, cls):
+        """Returns an instance of the Kaldi computer `cls`"""
         # we need to forward options (because the assignation here is
         # done by copy, not by reference. If the user do 'p =
         # Processor(); p.dither = 0', this is forwarded to Kaldi here)
         self._options.frame_opts = self._frame_options
         self._options.mel_opts = self._mel_options
+        return cls(self._options)
 
-        # force 16 bits integers
-        signal = signal.astype(np.int16).data
-        data = kaldi.matrix.SubMatrix(
-            cls(self._options).compute(
-                kaldi.matrix.SubVector(signal), vtln_warp)).numpy()
+    def _process(self, cls, signal, vtln_warp):
+        """Inner process method common to all Kaldi Mel processors"""
+        # ensure the signal is correct
+        self._check_signal(signal)
 
+        data = self._compute(self._get_computer(cls), signal, vtln_warp)
         return Features(
-            data, self.times(data.shape[0]), properties=self.get_properties())
+            data, self._regular_times(data.shape[0]),
+            properties=self.get_properties())
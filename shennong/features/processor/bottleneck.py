@@ -108,7 +108,7 @@ import scipy as sp
 import scipy.linalg as spl
 import scipy.fftpack
 
-from shennong.features import Features
+from shennong.features import Features, RegularTimes
 from shennong.features.processor.base import FeaturesProcessor
 
 
@@ -506,11 +506,16 @@ class BottleneckProcessor(FeaturesProcessor):
     ----------
     weights : 'BabelMulti', 'FisherMono' or 'FisherMulti'
         The pretrained weights to use for features extraction
+    dither : float, optional
+        Amount of dithering, 0.0 means no dither
+    dtype : 'float32' or 'float64', optional
+        The precision of the neural network computations and of the
+        extracted features, default to 'float32'
 
     Raises
     ------
     ValueError
-        If the `weights` are invalid
+        If the `weights` or the `dtype` are invalid
 
     RuntimeError
         If the weights file cannot be found (meaning shennong is not
@@ -522,9 +527,10 @@ class BottleneckProcessor(FeaturesProcessor):
     # BottleneckProcessor)
     _loaded_weights = {}
 
-    def __init__(self, weights='BabelMulti', dither=0.1):
+    def __init__(self, weights='BabelMulti', dither=0.1, dtype='float32'):
         self.weights = weights
         self.dither = dither
+        self.dtype = dtype
         self._get_weights()
 
     @property
@@ -544,6 +550,28 @@ class BottleneckProcessor(FeaturesProcessor):
     def dither(self, value):
         self._dither = float(value)
 
+    @property
+    def dtype(self):
+        """The precision of the neural network computations
+
+        Must be 'float32' or 'float64', this is also the type of the
+        extracted features.
+
+        """
+        return self._dtype
+
+    @dtype.setter
+    def dtype(self, value):
+        try:
+            name = np.dtype(value).name
+        except TypeError:
+            name = None
+        if name not in ('float32', 'float64'):
+            raise ValueError(
+                'invalid dtype "{}", choose in "float32, float64"'
+                .format(value))
+        self._dtype = name
+
     @property
     def weights(self):
         """The name of the pretrained weights used to extract the features
@@ -614,7 +642,15 @@ class BottleneckProcessor(FeaturesProcessor):
                 self._loaded_weights[self.weights] = {
                     k: v for k, v in w.items()}
 
-        return self._loaded_weights[self.weights]
+        # the weights converted to the computations precision
+        key = (self.weights, self.dtype)
+        if key not in self._loaded_weights:
+            self._loaded_weights[key] = {
+                k: v.astype(self.dtype)
+                if np.issubdtype(v.dtype, np.floating) else v
+                for k, v in self._loaded_weights[self.weights].items()}
+
+        return self._loaded_weights[key]
 
     @classmethod
     def available_weights(cls):
@@ -745,14 +781,14 @@ class BottleneckProcessor(FeaturesProcessor):
 
         # compute the network output from mel features
         left_ctx_bn1 = right_ctx_bn1 = self._get_weights()['context']
-        nn_input = _preprocess_nn_input(fea, left_ctx_bn1, right_ctx_bn1)
+        nn_input = _preprocess_nn_input(
+            fea, left_ctx_bn1, right_ctx_bn1).astype(self.dtype)
         nn_output = np.vstack(_create_nn_extract_st_BN(
             nn_input, self._get_weights(), 2)[0])
 
-        # compute the timestamps for each output frame
-        times = (1.0 / 8000) * np.vstack((
-            np.arange(nn_output.shape[0]) * frame_shift,
-            np.arange(nn_output.shape[0]) * frame_shift + frame_length)).T
+        # the timestamps of the output frames are regularly spaced
+        times = RegularTimes(
+            0, frame_shift / 8000, frame_length / 8000, nn_output.shape[0])
 
         # return the final bottleneck features
         return Features(nn_output, times, self.get_properties())
@@ -164,8 +164,9 @@ class EnergyProcessor(FramesProcessor):
         # compression function to compress energy
         compression = self._compression_fun[self._compression]
 
-        # pre-allocate the resulting energy
-        energy = np.zeros((nframes, 1))
+        # pre-allocate the resulting energy, computed in float64 but
+        # stored in float32 as the other Kaldi features
+        energy = np.zeros((nframes, 1), dtype=np.float32)
 
         # pre-allocate a buffer for the frames, extract the frames and
         # compute the energy on them
@@ -185,4 +186,5 @@ class EnergyProcessor(FramesProcessor):
         if self.raw_energy:
             self.set_params(**old_conf)
 
-        return Features(energy, self.times(nframes), self.get_properties())
+        return Features(
+            energy, self._regular_times(nframes), self.get_properties())
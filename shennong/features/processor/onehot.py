@@ -49,6 +49,7 @@ import shennong.features.window
 from shennong.features import Features
 from shennong.features.frames import Frames
 from shennong.features.processor.base import FeaturesProcessor
+from shennong.utils import intern_dict
 
 
 class _OneHotBase(FeaturesProcessor):
@@ -133,7 +134,8 @@ class OneHotProcessor(_OneHotBase):
             self.tokens = token2index.keys()
             properties = self.get_properties()
             self.tokens = None
-        properties[self.name].update({'token2index': token2index})
+        properties[self.name] = intern_dict(
+            dict(properties[self.name], token2index=token2index))
 
         return Features(
             data, alignment.times, properties=properties)
@@ -258,7 +260,8 @@ class FramedOneHotProcessor(_OneHotBase):
             self.tokens = token2index.keys()
             properties = self.get_properties()
             self.tokens = None
-        properties[self.name].update({'token2index': token2index})
+        properties[self.name] = intern_dict(
+            dict(properties[self.name], token2index=token2index))
 
         return Features(
             data,
@@ -65,14 +65,14 @@ References
 
 """
 
-import copy
 import kaldi.feat.pitch
 import kaldi.matrix
 import numpy as np
 
-from shennong.features import Features
+from shennong.features import Features, RegularTimes
 from shennong.features.processor.base import FeaturesProcessor
 from shennong.features.postprocessor.base import FeaturesPostProcessor
+from shennong.utils import freeze, intern_dict
 
 
 class PitchProcessor(FeaturesProcessor):
@@ -251,9 +251,11 @@ class PitchProcessor(FeaturesProcessor):
 
     def times(self, nframes):
         """Returns the time label for the rows given by the `process` method"""
-        return np.vstack((
-            np.arange(nframes) * self.frame_shift,
-            np.arange(nframes) * self.frame_shift + self.frame_length)).T
+        return self._regular_times(nframes).to_array()
+
+    def _regular_times(self, nframes):
+        """Returns the times of :func:`times` as a compact time axis"""
+        return RegularTimes(0, self.frame_shift, self.frame_length, nframes)
 
     def process(self, signal):
         """Extracts the (NCCF, pitch) from a given speech `signal`
@@ -290,14 +292,15 @@ class PitchProcessor(FeaturesProcessor):
                 'processor and signal mismatch in sample rates: '
                 '{} != {}'.format(self.sample_rate, signal.sample_rate))
 
-        # force 16 bits integers
-        signal = signal.astype(np.int16).data
+        # force 16 bits samples, as floats for Kaldi
+        signal = signal.as_int16_float32()
         data = kaldi.matrix.SubMatrix(
             kaldi.feat.pitch.compute_kaldi_pitch(
                 self._options, kaldi.matrix.SubVector(signal))).numpy()
 
         return Features(
-            data, self.times(data.shape[0]), properties=self.get_properties())
+            data, self._regular_times(data.shape[0]),
+            properties=self.get_properties())
 
 
 class PitchPostProcessor(FeaturesPostProcessor):
@@ -485,10 +488,21 @@ class PitchPostProcessor(FeaturesPostProcessor):
             + self.add_delta_pitch
             + self.add_raw_log_pitch)
 
+    @property
+    def context(self):
+        # the output frame t is computed from the raw pitch frame (t -
+        # delay) and from a normalization and delta windows around it
+        left = max(self.normalization_left_context, self.delta_window)
+        right = max(self.normalization_right_context, self.delta_window)
+        return (left + self.delay, max(0, right - self.delay))
+
     def get_properties(self, features):
-        properties = copy.deepcopy(features.properties)
-        properties['pitch'][self.name] = self.get_params()
-        properties['pipeline'][0]['columns'] = [0, self.ndims - 1]
+        properties = dict(features.properties)
+        properties['pitch'] = intern_dict(
+            dict(properties['pitch'], **{self.name: self.get_params()}))
+        pipeline = freeze(properties['pipeline'])
+        properties['pipeline'] = (intern_dict(
+            dict(pipeline[0], columns=[0, self.ndims - 1])), ) + pipeline[1:]
         return properties
 
     def process(self, raw_pitch):
@@ -535,4 +549,5 @@ class PitchPostProcessor(FeaturesPostProcessor):
                 self._options, kaldi.matrix.SubMatrix(raw_pitch.data))).numpy()
 
         return Features(
-            data, raw_pitch.times, properties=self.get_properties(raw_pitch))
+            data, raw_pitch.time_axis,
+            properties=self.get_properties(raw_pitch))
@@ -190,10 +190,14 @@ def _mel2hz(z, htk=False):  # pragma: nocover
     return f
 
 
+# the pole of the RASTA filter
+_RASTA_POLE = 0.94
+
+
 def _rastafilt(x):
     numer = np.arange(-2, 3)
     numer = -numer / np.sum(numer ** 2)
-    denom = np.array([1, -0.94])
+    denom = np.array([1, -_RASTA_POLE])
 
     zi = scipy.signal.lfilter_zi(numer, 1)
     y = np.zeros((x.shape))
@@ -600,6 +604,22 @@ class RastaPlpProcessor(FramesProcessor):
             raise ValueError('order must be an integer in [0, 12]')
         self._order = value
 
+    def _chunk_margin(self):
+        margin = super()._chunk_margin()
+        if not self.do_rasta:
+            return margin
+
+        # the RASTA filter is an IIR filter: the initial conditions of
+        # a chunk differ from the filter state in the whole signal and
+        # their effect decays as the impulse response of the pole. The
+        # margin covers the 4 frames zeroed at the start of the filter
+        # and the frames until the impulse response is below the
+        # float32 resolution of the features (262 frames). The chunked
+        # features are thus equal to the whole ones up to the float32
+        # rounding, not exactly.
+        decay = np.log(np.finfo(np.float32).eps) / np.log(_RASTA_POLE)
+        return margin + 4 + int(np.ceil(decay))
+
     def _power_spectrum(self, signal, block_size=64):
         num_frames = kaldi.feat.window.num_frames(
             signal.nsamples, self._frame_options)
@@ -686,5 +706,5 @@ class RastaPlpProcessor(FramesProcessor):
 
         return Features(
             data.T.astype(np.float32),
-            self.times(data.T.shape[0]),
+            self._regular_times(data.T.shape[0]),
             properties=self.get_properties())
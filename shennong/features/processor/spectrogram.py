@@ -31,7 +31,6 @@ References
 """
 
 import kaldi.feat.spectrogram
-import numpy as np
 
 from shennong.features import Features
 from shennong.features.processor.base import FramesProcessor
@@ -118,26 +117,54 @@ class SpectrogramProcessor(FramesProcessor):
 
         """
         # ensure the signal is correct
-        if signal.nchannels != 1:
-            raise ValueError(
-                'signal must have one dimension, but it has {}'
-                .format(signal.nchannels))
+        self._check_signal(signal)
 
-        if self.sample_rate != signal.sample_rate:
-            raise ValueError(
-                'processor and signal mismatch in sample rates: '
-                '{} != {}'.format(self.sample_rate, signal.sample_rate))
+        data = self._compute(self._get_computer(), signal, vtln_warp)
+        return Features(
+            data, self._regular_times(data.shape[0]),
+            properties=self.get_properties())
+
+    def process_batch(self, signals, vtln_warp=1.0):
+        """Compute spectrogram on a sequence of signals
+
+        This is the same as calling :func:`process` on each signal,
+        but the Kaldi computer and the features properties are built
+        only once for all the signals.
+
+        Parameters
+        ----------
+        signals : sequence of Audio
+            The input audio signals to compute the features on, must
+            be mono
+        vtln_warp : float, optional
+            The VTLN warping factor to be applied when computing
+            features. Be 1.0 by default, meaning no warping is to be
+            done.
 
+        Returns
+        -------
+        features : list of `Features`
+            The computed features, in the order of the input `signals`
+
+        Raises
+        ------
+        ValueError
+            If an input signal has more than one channel (i.e. is not
+            mono). If `sample_rate` != `signal.sample_rate`.
+
+        """
+        for signal in signals:
+            self._check_signal(signal)
+
+        computer = self._get_computer()
+        return self._batch_features(
+            [self._compute(computer, signal, vtln_warp)
+             for signal in signals])
+
+    def _get_computer(self):
+        """Returns an instance of the Kaldi spectrogram computer"""
         # we need to forward options (because the assignation here is
         # done by copy, not by reference. If the user do 'p =
         # Processor(); p.dither = 0', this is forwarded to Kaldi here)
         self._options.frame_opts = self._frame_options
-
-        # force 16 bits integers
-        signal = signal.astype(np.int16).data
-        data = kaldi.matrix.SubMatrix(
-            kaldi.feat.spectrogram.Spectrogram(self._options).compute(
-                kaldi.matrix.SubVector(signal), vtln_warp)).numpy()
-
-        return Features(
-            data, self.times(data.shape[0]), properties=self.get_properties())
+        return kaldi.feat.spectrogram.Spectrogram(self._options)
@@ -20,9 +20,10 @@ JSON         .json      6.3 GB     0:11:34       1:04:25
 """
 
 import abc
-import copy
 import os
 import pickle
+import struct
+import zipfile
 
 import h5features
 import json_tricks
@@ -125,6 +126,40 @@ def get_serializer(cls, filename, serializer=None):
     return serializer(cls, filename)
 
 
+def _npz_memmap(filename, name):
+    """Memory maps the array `name` stored in the numpy archive `filename`
+
+    Returns None if the array is compressed and cannot be mapped.
+
+    """
+    with zipfile.ZipFile(filename) as archive:
+        info = archive.getinfo(name + '.npy')
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+
+    with open(filename, 'rb') as fh:
+        # skip the zip local file header to get the .npy file
+        fh.seek(info.header_offset + 26)
+        name_length, extra_length = struct.unpack('<HH', fh.read(4))
+        fh.seek(name_length + extra_length, os.SEEK_CUR)
+
+        version = np.lib.format.read_magic(fh)
+        if version == (1, 0):
+            header = np.lib.format.read_array_header_1_0(fh)
+        elif version == (2, 0):
+            header = np.lib.format.read_array_header_2_0(fh)
+        else:
+            return None
+        shape, fortran_order, dtype = header
+        offset = fh.tell()
+
+    if dtype.hasobject or 0 in shape:
+        return None
+    return np.memmap(
+        filename, dtype=dtype, mode='r', offset=offset, shape=shape,
+        order='F' if fortran_order else 'C')
+
+
 class FeaturesSerializer(metaclass=abc.ABCMeta):
     """Base class of a features file serializer
 
@@ -144,6 +179,7 @@ class FeaturesSerializer(metaclass=abc.ABCMeta):
     def __init__(self, cls, filename):
         self._features_collection = cls
         self._features = self._features_collection._value_type
+        self._times = self._features_collection._times_type
         self._filename = filename
 
     @property
@@ -158,15 +194,21 @@ class FeaturesSerializer(metaclass=abc.ABCMeta):
     def _load(self):  # pragma: nocover
         pass
 
-    def load(self, **kwargs):
+    def load(self, validate=True, **kwargs):
         """Returns a collection of features from the `filename`
 
+        Parameters
+        ----------
+        validate : bool, optional
+            When True (default), make sure the loaded features are in
+            a valid state.
+        kwargs : optional
+            Optional supplementary arguments, specific to each serializer.
+
         Returns
         -------
         features : :class:`~shennong.features.FeaturesCollection`
             The features stored in the file.
-        kwargs : optional
-            Optional supplementary arguments, specific to each serializer.
 
         Raises
         ------
@@ -178,26 +220,71 @@ class FeaturesSerializer(metaclass=abc.ABCMeta):
             in a valid state.
 
         """
-        if not os.path.isfile(self.filename):
-            raise IOError('file not found: {}'.format(self.filename))
-        if not os.access(self.filename, os.R_OK):
-            raise IOError('file not readable: {}'.format(self.filename))
-
+        self._check_readable()
         features = self._load(**kwargs)
 
-        if not features.is_valid():
+        if validate and not features.is_valid():
             raise ValueError(
                 'features not valid in file: {}'.format(self.filename))
 
         return features
 
-    def save(self, features, **kwargs):
+    def open(self, **kwargs):
+        """Opens the `filename` to load its features one by one
+
+        Only the index of the stored items is read at opening, see
+        :func:`~shennong.features.FeaturesCollection.open`.
+
+        Parameters
+        ----------
+        kwargs : optional
+            Optional supplementary arguments, specific to each serializer.
+
+        Returns
+        -------
+        keys : list of str
+            The items stored in the file
+        load : function
+            ``load(key)`` returns the features of the item `key`,
+            they are not validated.
+        close : function
+            ``close()`` releases the resources opened for loading
+
+        Raises
+        ------
+        IOError
+            If the input file does not exist or cannot be read.
+
+        ValueError
+            If the serializer does not support loading the features
+            one by one.
+
+        """
+        self._check_readable()
+        return self._open(**kwargs)
+
+    def _open(self):
+        raise ValueError(
+            '{} does not support loading features one by one'
+            .format(self.__class__.__name__))
+
+    def _check_readable(self):
+        if not os.path.isfile(self.filename):
+            raise IOError('file not found: {}'.format(self.filename))
+        if not os.access(self.filename, os.R_OK):
+            raise IOError('file not readable: {}'.format(self.filename))
+
+    def save(self, features, validate=True, **kwargs):
         """Saves a collection of `features` to a file
 
         Parameters
         ----------
         features : :class:`~shennong.features.FeaturesCollection`
             The features to store in the file.
+        validate : bool, optional
+            When True (default), make sure the features are in a valid
+            state before saving them. Disable it when the features
+            have already been validated.
         kwargs : optional
             Optional supplementary arguments, specific to each serializer.
 
@@ -222,7 +309,7 @@ class FeaturesSerializer(metaclass=abc.ABCMeta):
                     self._features_collection.__name__,
                     features.__class__.__name__))
 
-        if not features.is_valid():
+        if validate and not features.is_valid():
             raise ValueError('features are not valid')
 
         self._save(features, **kwargs)
@@ -233,33 +320,111 @@ class NumpySerializer(FeaturesSerializer):
     def _save(self, features, compress=True):
         self._log.info('writing %s', self.filename)
 
-        # represent the features as dictionaries
-        data = {k: v._to_dict() for k, v in features.items()}
-
-        # save (and optionally compress) the features
         save = np.savez_compressed if compress is True else np.savez
-        save(open(self.filename, 'wb'), features=data, allow_pickle=True)
+
+        packed = features.packed
+        if packed is None:
+            # represent the features as dictionaries
+            data = {k: v._to_dict() for k, v in features.items()}
+
+            # save (and optionally compress) the features
+            save(open(self.filename, 'wb'), features=data, allow_pickle=True)
+        else:
+            # a packed collection is saved as a single array, the
+            # dictionaries store only the times and properties
+            data = {}
+            for k in packed.keys:
+                data[k] = features[k]._to_dict()
+                del data[k]['data']
+
+            save(open(self.filename, 'wb'), features=data,
+                 data=packed.data, offsets=packed.offsets, allow_pickle=True)
 
     def _load(self):
         self._log.info('loading %s', self.filename)
 
-        data = np.load(
-            open(self.filename, 'rb'), allow_pickle=True)['features'].tolist()
+        archive = np.load(open(self.filename, 'rb'), allow_pickle=True)
+        data = archive['features'].tolist()
+
+        if 'offsets' in archive.files:
+            # load a packed collection
+            offsets = archive['offsets']
+            return self._features_collection._from_packed(
+                archive['data'], offsets, list(data.keys()),
+                [self._packed_times(v['times'], offsets[i+1] - offsets[i])
+                 for i, v in enumerate(data.values())],
+                [v['properties'] for v in data.values()], validate=False)
 
         features = self._features_collection()
         for k, v in data.items():
             features[k] = self._features._from_dict(v, validate=False)
         return features
 
+    def _open(self):
+        self._log.info('opening %s', self.filename)
+
+        with np.load(self.filename, allow_pickle=True) as archive:
+            index = archive['features'].tolist()
+
+            if 'offsets' not in archive.files:
+                # the features are stored in a single dictionary, they
+                # are all loaded at once
+                self._log.warning(
+                    '%s is not a packed collection, all the features are '
+                    'loaded at opening, save it with '
+                    'features.pack().save(filename, compress=False) '
+                    'for lazy access', self.filename)
+                return (
+                    list(index.keys()),
+                    lambda key: self._features._from_dict(
+                        index[key], validate=False),
+                    lambda: None)
+
+            # a packed collection, the features are read from the
+            # packed array, memory mapped if not compressed
+            offsets = archive['offsets']
+            data = _npz_memmap(self.filename, 'data')
+            if data is None:
+                data = archive['data']
+                if data.size:
+                    self._log.warning(
+                        '%s is compressed, all the features are loaded at '
+                        'opening, save it with compress=False for lazy '
+                        'access', self.filename)
+
+        position = {k: i for i, k in enumerate(index.keys())}
+
+        def load(key):
+            start, stop = offsets[position[key]:position[key]+2]
+            return self._features(
+                np.array(data[start:stop]),
+                self._packed_times(index[key]['times'], stop - start),
+                properties=index[key]['properties'], validate=False)
+
+        return list(index.keys()), load, lambda: None
+
+    def _packed_times(self, times, nframes):
+        # the regular times of a packed collection are stored as a dict
+        # without the number of frames
+        if isinstance(times, dict):
+            return self._times(
+                times['offset'], times['shift'], times['length'], nframes)
+        return times
+
 
 class MatlabSerializer(FeaturesSerializer):
     """Saves and loads features to/from the matlab '.mat' format"""
     def _save(self, features, compress=True):
         self._log.info('writing %s', self.filename)
 
-        # represent the features as dictionaries
+        # represent the features as dictionaries. Matlab has no half
+        # precision, float16 features are stored as float32 and
+        # converted back on loading.
         data = {k: v._to_dict() for k, v in features.items()}
-        # print(data['test']['properties'])
+        for v in data.values():
+            if v['data'].dtype == np.float16:
+                v['data'] = v['data'].astype(np.float32)
+                v['dtype'] = 'float16'
 
         # save (and optionally compress) the features
         scipy.io.savemat(
@@ -278,10 +443,12 @@ class MatlabSerializer(FeaturesSerializer):
         features = self._features_collection()
         for k, v in data.items():
             if k not in ('__header__', '__version__', '__globals__'):
-                features[k] = self._features(
-                    v['data'],
-                    v['times'],
-                    self._make_list(self._check_keys(v['properties'])),
+                features[k] = self._features._from_dict({
+                    'data': v['data'].astype(v['dtype'])
+                    if 'dtype' in v else v['data'],
+                    'times': v['times'],
+                    'properties': self._make_list(
+                        self._check_keys(v['properties']))},
                     validate=False)
         return features
 
@@ -388,6 +555,38 @@ class H5featuresSerializer(FeaturesSerializer):
                 validate=False)
         return features
 
+    def _open(self, groupname='features'):
+        self._log.info('opening %s', self.filename)
+
+        reader = h5features.Reader(self.filename, groupname=groupname)
+        keys = reader.items.data
+        properties = reader.properties
+        position = {k: i for i, k in enumerate(keys)}
+
+        if reader.version != '1.1' or reader.dformat != 'dense':
+            # older formats are read through h5features
+            def load(key):
+                data = reader.read(from_item=key)
+                return self._features(
+                    data.features()[0], data.labels()[0],
+                    properties=data.properties()[0], validate=False)
+
+            return keys, load, reader.close
+
+        # index[i] is the last frame of the item i
+        index = h5features.index.read_index(reader.group, reader.version)
+        features = reader.group['features']
+        labels = reader.group['labels']
+
+        def load(key):
+            i = position[key]
+            start, stop = (0 if i == 0 else index[i - 1] + 1), index[i] + 1
+            return self._features(
+                features[start:stop], labels[start:stop],
+                properties=properties[i], validate=False)
+
+        return keys, load, reader.close
+
 
 class KaldiSerializer(FeaturesSerializer):
     def __init__(self, cls, filename):
@@ -412,9 +611,20 @@ class KaldiSerializer(FeaturesSerializer):
         else:
             self._log.info('writing %s', ark)
             wspecifier = 'ark:' + ark
-        with kaldi.util.table.DoubleMatrixWriter(wspecifier) as writer:
+        # features in single or half precision are stored as float
+        # matrices, the other ones as double matrices (the original
+        # dtype is restored on loading)
+        if all(v.dtype in (np.float16, np.float32)
+               for v in features.values()):
+            writer = kaldi.util.table.MatrixWriter
+            matrix, dtype = kaldi.matrix.SubMatrix, np.float32
+        else:
+            writer = kaldi.util.table.DoubleMatrixWriter
+            matrix, dtype = kaldi.matrix.DoubleSubMatrix, np.float64
+
+        with writer(wspecifier) as writer:
             for k, v in features.items():
-                writer[k] = kaldi.matrix.DoubleSubMatrix(v.data)
+                writer[k] = matrix(np.ascontiguousarray(v.data, dtype=dtype))
 
         # writing times
         ark = self._fileroot + '.times.ark'
@@ -427,32 +637,37 @@ class KaldiSerializer(FeaturesSerializer):
             wspecifier = 'ark:' + ark
         with kaldi.util.table.DoubleMatrixWriter(wspecifier) as writer:
             for k, v in features.items():
-                # in case times are 1d, we force them to 2d so they
-                # can be wrote as kaldi matrices (we do the reverse
-                # 2d->1d on loading). We are copying the array to
-                # avoid a bug on macos.
-                writer[k] = kaldi.matrix.DoubleSubMatrix(
-                    np.atleast_2d(v.times).copy())
+                if isinstance(v.time_axis, self._times):
+                    # regular times are stored in properties, write
+                    # an empty matrix as a placeholder
+                    writer[k] = kaldi.matrix.DoubleMatrix()
+                else:
+                    # in case times are 1d, we force them to 2d so
+                    # they can be wrote as kaldi matrices (we do the
+                    # reverse 2d->1d on loading). We are copying the
+                    # array to avoid a bug on macos.
+                    writer[k] = kaldi.matrix.DoubleSubMatrix(
+                        np.atleast_2d(v.times).copy())
 
         # writing properties. As we are writing double arrays, we need
         # to track the original dtype of features in the properties,
         # to ensure equality on load
         filename = self._fileroot + '.properties.json'
         self._log.info('writing %s', filename)
-        data = {k: copy.deepcopy(v.properties) for k, v in features.items()}
+        data = {k: dict(v.properties) for k, v in features.items()}
         for k, v in data.items():
+            times = features[k].time_axis
             data[k]['__dtype_data__'] = str(features[k].dtype)
-            data[k]['__dtype_times__'] = str(features[k].times.dtype)
+            if isinstance(times, self._times):
+                data[k]['__times__'] = [
+                    times.offset, times.shift, times.length]
+            else:
+                data[k]['__dtype_times__'] = str(times.dtype)
         open(filename, 'wt').write(json_tricks.dumps(data, indent=4))
 
     def _load(self):
         # loading properties
-        filename = self._fileroot + '.properties.json'
-        self._log.info('loading %s', filename)
-        if not os.path.isfile(filename):
-            raise IOError('file not found: {}'.format(filename))
-
-        properties = json_tricks.loads(open(filename, 'r').read())
+        properties = self._load_properties()
 
         # loading times
         ark = self._fileroot + '.times.ark'
@@ -465,11 +680,6 @@ class KaldiSerializer(FeaturesSerializer):
                 rspecifier) as reader:
             times = {k: v.numpy() for k, v in reader}
 
-        # postprocess times: do 2d->1d if they are 1d vectors
-        for k, v in times.items():
-            if v.shape[0] == 1:
-                times[k] = v.reshape((v.shape[1]))
-
         # loading features
         ark = self._fileroot + '.ark'
         self._log.info('loading %s', ark)
@@ -489,11 +699,54 @@ class KaldiSerializer(FeaturesSerializer):
                 'invalid features: items differ in data and times')
 
         return self._features_collection(
-            **{k: self._features(
-                data[k].astype(properties[k]['__dtype_data__']),
-                times[k].astype(properties[k]['__dtype_times__']),
-                properties={
-                    k: p for k, p in properties[k].items()
-                    if '__dtype_' not in k},
-                validate=False)
+            **{k: self._make_features(data[k], times[k], properties[k])
                for k in data.keys()})
+
+    def _open(self):
+        # the features are read by key from the scp files
+        properties = self._load_properties()
+        for scp in (self._fileroot + '.scp', self._fileroot + '.times.scp'):
+            if not os.path.isfile(scp):
+                raise IOError('file not found: {}'.format(scp))
+        self._log.info('opening %s', self._fileroot + '.scp')
+
+        data = kaldi.util.table.RandomAccessDoubleMatrixReader(
+            'scp:' + self._fileroot + '.scp')
+        times = kaldi.util.table.RandomAccessDoubleMatrixReader(
+            'scp:' + self._fileroot + '.times.scp')
+
+        def load(key):
+            return self._make_features(
+                data[key].numpy(), times[key].numpy(), properties[key])
+
+        def close():
+            data.close()
+            times.close()
+
+        return list(properties.keys()), load, close
+
+    def _load_properties(self):
+        filename = self._fileroot + '.properties.json'
+        self._log.info('loading %s', filename)
+        if not os.path.isfile(filename):
+            raise IOError('file not found: {}'.format(filename))
+
+        return json_tricks.loads(open(filename, 'r').read())
+
+    def _make_features(self, data, times, properties):
+        # restore the original dtypes and the regular times from the
+        # properties
+        if '__times__' in properties:
+            times = self._times(*properties['__times__'], data.shape[0])
+        else:
+            # do 2d->1d if times are 1d vectors
+            if times.shape[0] == 1:
+                times = times.reshape((times.shape[1]))
+            times = times.astype(properties['__dtype_times__'])
+
+        return self._features(
+            data.astype(properties['__dtype_data__']), times,
+            properties={
+                k: v for k, v in properties.items()
+                if not k.startswith('__')},
+            validate=False)
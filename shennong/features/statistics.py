@@ -0,0 +1,477 @@
+"""Per-dimension statistics of features over a whole corpus
+
+This module computes the count, mean, variance, minimum and maximum of
+each features dimension, and optionally histograms and quantiles, over
+a collection of features in a single pass. The features are never
+concatenated: each utterance is accumulated and released, so that the
+statistics can be computed on corpora not fitting in memory, either
+from a :class:`~shennong.features.features.LazyFeaturesCollection`
+(see :func:`~shennong.features.features.FeaturesCollection.open`) or
+from the features yielded by the pipeline.
+
+The statistics are accumulated in :class:`FeaturesStatistics`
+instances, in float64 with a numerically stable algorithm [Chan1979]_
+so that partial statistics can be merged. This is used to compute the
+statistics in parallel and grouped by speaker, or by any partition of
+the utterances (see
+:func:`~shennong.features.features.FeaturesCollection.partition`).
+
+Examples
+--------
+
+>>> import numpy as np
+>>> from shennong.features import Features, FeaturesCollection
+>>> from shennong.features.statistics import compute_statistics
+>>> collection = FeaturesCollection(
+...     utt1=Features(np.random.random((100, 2)), np.arange(100)),
+...     utt2=Features(np.random.random((50, 2)), np.arange(50)))
+
+Statistics over the whole collection:
+
+>>> stats = compute_statistics(collection)
+>>> stats.count
+150
+>>> stats.mean.shape
+(2,)
+
+Statistics grouped by speaker, with histograms of 10 bins on [0, 1]:
+
+>>> index = {'utt1': 'spk1', 'utt2': 'spk2'}
+>>> stats = compute_statistics(
+...     collection, index=index, bins=10, range=(0, 1))
+>>> sorted(stats.keys())
+['spk1', 'spk2']
+>>> stats['spk2'].histogram.shape
+(2, 10)
+>>> stats['spk2'].quantile(0.5).shape
+(2,)
+
+References
+----------
+
+.. [Chan1979] Chan, Tony F., Gene H. Golub and Randall J. LeVeque.
+     "Updating formulae and a pairwise algorithm for computing sample
+     variances". Technical Report STAN-CS-79-773, Stanford University
+     (1979).
+
+"""
+
+import collections.abc
+import concurrent.futures
+import threading
+
+import numpy as np
+
+from shennong.features import Features
+from shennong.utils import get_njobs
+
+
+class FeaturesStatistics:
+    """Per-dimension statistics accumulated over features
+
+    Parameters
+    ----------
+    ndims : int
+        The dimension of the features frames
+    bins : int, optional
+        The number of bins of the histograms, default to no histogram
+    range : tuple, optional
+        The lower and upper edges of the histograms, as scalars or as
+        arrays of shape [`ndims`] for a range per dimension. Must be
+        specified with `bins`. The values outside of the range are
+        counted in the first or last bin.
+
+    Raises
+    ------
+    ValueError
+        If `ndims` or `bins` are not strictly positive integers, or if
+        `range` is invalid.
+
+    """
+    def __init__(self, ndims, bins=None, range=None):
+        if int(ndims) != ndims or ndims <= 0:
+            raise ValueError(
+                'ndims must be a strictly positive integer, it is {}'
+                .format(ndims))
+        self._ndims = int(ndims)
+
+        self._count = 0
+        self._mean = np.zeros((self._ndims,), dtype=np.float64)
+        self._m2 = np.zeros((self._ndims,), dtype=np.float64)
+        self._min = np.full((self._ndims,), np.inf)
+        self._max = np.full((self._ndims,), -np.inf)
+
+        if bins is None:
+            if range is not None:
+                raise ValueError('range specified but bins is not')
+            self._bins = None
+            self._range = None
+            self._histogram = None
+            return
+
+        if int(bins) != bins or bins <= 0:
+            raise ValueError(
+                'bins must be a strictly positive integer, it is {}'
+                .format(bins))
+        if range is None:
+            raise ValueError('bins specified but range is not')
+
+        low, high = (
+            np.broadcast_to(np.asarray(r, dtype=np.float64), (self._ndims,))
+            for r in range)
+        if not np.all(low < high):
+            raise ValueError(
+                'range must be (low, high) with low < high, it is {}'
+                .format(range))
+
+        self._bins = int(bins)
+        self._range = (low, high)
+        self._histogram = np.zeros(
+            (self._ndims, self._bins), dtype=np.int64)
+
+    @property
+    def ndims(self):
+        """The dimension of the features frames"""
+        return self._ndims
+
+    @property
+    def count(self):
+        """The number of accumulated frames"""
+        return self._count
+
+    @property
+    def mean(self):
+        """The mean of each dimension"""
+        return self._mean
+
+    @property
+    def variance(self):
+        """The (biased) variance of each dimension"""
+        if not self._count:
+            return np.zeros((self._ndims,))
+        return self._m2 / self._count
+
+    @property
+    def std(self):
+        """The standard deviation of each dimension"""
+        return np.sqrt(self.variance)
+
+    @property
+    def min(self):
+        """The minimum of each dimension"""
+        return self._min
+
+    @property
+    def max(self):
+        """The maximum of each dimension"""
+        return self._max
+
+    @property
+    def bin_edges(self):
+        """The edges of the histograms, shape = [ndims, bins + 1]
+
+        None when no histogram is accumulated.
+
+        """
+        if self._bins is None:
+            return None
+        low, high = self._range
+        return np.linspace(low, high, self._bins + 1, axis=1)
+
+    @property
+    def histogram(self):
+        """The histograms of each dimension, shape = [ndims, bins]
+
+        None when no histogram is accumulated.
+
+        """
+        return self._histogram
+
+    def quantile(self, q):
+        """Estimates quantiles of each dimension from the histograms
+
+        The quantiles are linearly interpolated within the bins of the
+        histograms, so their precision depends on the number of bins.
+
+        Parameters
+        ----------
+        q : float or array of float
+            The quantiles to compute, in [0, 1]
+
+        Returns
+        -------
+        quantiles : array, shape = [ndims] or [len(q), ndims]
+            The estimated quantiles for each dimension
+
+        Raises
+        ------
+        ValueError
+            If no histogram is accumulated, if no frame is accumulated
+            or if `q` is not in [0, 1].
+
+        """
+        if self._histogram is None:
+            raise ValueError(
+                'quantiles require histograms, bins must be specified')
+        if not self._count:
+            raise ValueError('cannot compute quantiles on empty statistics')
+
+        q = np.asarray(q, dtype=np.float64)
+        if np.any(q < 0) or np.any(q > 1):
+            raise ValueError('quantiles must be in [0, 1]')
+
+        cumsum = np.concatenate(
+            (np.zeros((self._ndims, 1)), np.cumsum(self._histogram, axis=1)),
+            axis=1) / self._count
+        edges = self.bin_edges
+
+        quantiles = np.asarray(
+            [[np.interp(qq, cumsum[d], edges[d])
+              for d in range(self._ndims)]
+             for qq in np.atleast_1d(q)])
+
+        # the extreme bins may extend beyond the observed values
+        quantiles = np.clip(quantiles, self._min, self._max)
+        return quantiles[0] if q.ndim == 0 else quantiles
+
+    def accumulate(self, features):
+        """Accumulates statistics from features
+
+        Parameters
+        ----------
+        features : :class:`~shennong.features.features.Features` or array
+            The features to accumulate, of shape [nframes, ndims]
+
+        Raises
+        ------
+        ValueError
+            If the features dimension is not `ndims`.
+
+        """
+        data = np.asarray(
+            features.data if isinstance(features, Features) else features)
+        if data.ndim != 2 or data.shape[1] != self._ndims:
+            raise ValueError(
+                'features must have {} dimensions but have shape {}'
+                .format(self._ndims, data.shape))
+        if not data.shape[0]:
+            return
+
+        data = data.astype(np.float64, copy=False)
+        mean = data.mean(axis=0)
+        self._update(
+            data.shape[0], mean, np.square(data - mean).sum(axis=0),
+            data.min(axis=0), data.max(axis=0),
+            None if self._bins is None else self._compute_histogram(data))
+
+    def merge(self, other):
+        """Merges the statistics from `other` into this instance
+
+        Parameters
+        ----------
+        other : :class:`FeaturesStatistics`
+            The statistics to merge, must have the same dimension and
+            histograms parameters as this instance
+
+        Returns
+        -------
+        self : :class:`FeaturesStatistics`
+            This instance, updated with `other`
+
+        Raises
+        ------
+        ValueError
+            If `other` is not compatible with this instance.
+
+        """
+        if other._ndims != self._ndims:
+            raise ValueError(
+                'cannot merge statistics of different dimensions: {} != {}'
+                .format(self._ndims, other._ndims))
+        if other._bins != self._bins or (
+                self._bins is not None and not (
+                    np.array_equal(self._range[0], other._range[0])
+                    and np.array_equal(self._range[1], other._range[1]))):
+            raise ValueError(
+                'cannot merge statistics with different histograms')
+
+        self._update(
+            other._count, other._mean, other._m2, other._min, other._max,
+            other._histogram)
+        return self
+
+    def _update(self, count, mean, m2, min, max, histogram):
+        # merge partial statistics into this instance, the variance is
+        # updated as in [Chan1979]_
+        if not count:
+            return
+
+        total = self._count + count
+        delta = mean - self._mean
+        self._mean = self._mean + delta * (count / total)
+        self._m2 = (
+            self._m2 + m2 + np.square(delta) * (self._count * count / total))
+        self._count = total
+        self._min = np.minimum(self._min, min)
+        self._max = np.maximum(self._max, max)
+        if self._histogram is not None:
+            self._histogram = self._histogram + histogram
+
+    def _compute_histogram(self, data):
+        # the bin index of each value, the values outside the range go
+        # in the first or last bin
+        low, high = self._range
+        index = np.floor((data - low) * (self._bins / (high - low)))
+        index = np.clip(index, 0, self._bins - 1).astype(np.int64)
+
+        # offset the bins of each dimension to count them in one shot
+        index += np.arange(self._ndims) * self._bins
+        return np.bincount(
+            index.ravel(), minlength=self._ndims * self._bins).reshape(
+                (self._ndims, self._bins))
+
+
+def compute_statistics(features, index=None, bins=None, range=None,
+                       njobs=1):
+    """Computes per-dimension statistics of features in a single pass
+
+    Parameters
+    ----------
+    features : mapping or iterable
+        The features to compute the statistics on. Either a mapping of
+        :class:`~shennong.features.features.Features` indexed by
+        utterances (such as a
+        :class:`~shennong.features.features.FeaturesCollection` or a
+        :class:`~shennong.features.features.LazyFeaturesCollection`),
+        or an iterable of pairs (utterance, features), such as the
+        features yielded by the pipeline. The features are read only
+        once, one after the other.
+    index : dict, optional
+        A mapping with, for each utterance, the group it belongs to
+        (for instance the speaker), as in
+        :func:`~shennong.features.features.FeaturesCollection.partition`.
+        Default to a single group.
+    bins : int, optional
+        The number of bins of the histograms, default to no histogram,
+        see :class:`FeaturesStatistics`.
+    range : tuple, optional
+        The range of the histograms, see :class:`FeaturesStatistics`.
+    njobs : int, optional
+        The number of threads used to accumulate the statistics,
+        default to 1. The utterances are distributed among the threads
+        and their partial statistics merged at the end.
+
+    Returns
+    -------
+    statistics : :class:`FeaturesStatistics` or dict
+        The statistics over all the features when `index` is not
+        specified, otherwise a dict of :class:`FeaturesStatistics`
+        indexed by groups. None if `features` has no frame and
+        `index` is not specified.
+
+    Raises
+    ------
+    ValueError
+        If an utterance is not defined in the `index`, if the features
+        have inconsistent dimensions or if `bins` or `range` are
+        invalid.
+
+    """
+    njobs = get_njobs(njobs)
+
+    # fast path on a packed collection, the statistics are computed
+    # directly on the buffer shared by all the features
+    packed = getattr(features, 'packed', None)
+    if index is None and packed is not None:
+        if not packed.data.shape[0]:
+            return None
+
+        def worker(chunk):
+            stats = FeaturesStatistics(packed.data.shape[1], bins, range)
+            stats.accumulate(chunk)
+            return {None: stats}
+
+        return _merge_partials(_run(
+            worker, np.array_split(packed.data, njobs), njobs))[None]
+
+    if isinstance(features, collections.abc.Mapping):
+        mapping = features
+        items = ((key, None) for key in mapping.keys())
+    else:
+        mapping = None
+        items = iter(features)
+
+    if index is not None and mapping is not None:
+        undefined_utts = set(mapping.keys()).difference(index.keys())
+        if undefined_utts:
+            raise ValueError(
+                'following items are not defined in the partition index: {}'
+                .format(', '.join(sorted(undefined_utts))))
+
+    # the items are consumed from a single iterator shared by the
+    # workers, each worker accumulating its own statistics per group
+    lock = threading.Lock()
+    failed = threading.Event()
+
+    def worker(_):
+        statistics = {}
+        while not failed.is_set():
+            with lock:
+                try:
+                    name, feats = next(items)
+                except StopIteration:
+                    break
+
+            try:
+                if mapping is not None:
+                    feats = mapping[name]
+
+                group = None
+                if index is not None:
+                    if name not in index:
+                        raise ValueError(
+                            'following items are not defined in the '
+                            'partition index: {}'.format(name))
+                    group = index[name]
+
+                if group not in statistics:
+                    statistics[group] = FeaturesStatistics(
+                        feats.ndims, bins, range)
+                statistics[group].accumulate(feats)
+            except Exception:
+                # stop the other workers
+                failed.set()
+                raise
+        return statistics
+
+    statistics = _merge_partials(_run(worker, [None] * njobs, njobs))
+    if index is None:
+        stats = statistics.get(None)
+        return stats if stats is not None and stats.count else None
+    return statistics
+
+
+def _run(function, arguments, njobs):
+    """Returns the results of `function` on each argument
+
+    The calls are done in `njobs` threads, the numpy computations
+    releasing the GIL.
+
+    """
+    if njobs == 1:
+        return [function(argument) for argument in arguments]
+
+    with concurrent.futures.ThreadPoolExecutor(njobs) as executor:
+        return list(executor.map(function, arguments))
+
+
+def _merge_partials(partials):
+    """Merges a list of dicts {group: FeaturesStatistics} into one"""
+    statistics = {}
+    for partial in partials:
+        for group, stats in partial.items():
+            if group in statistics:
+                statistics[group].merge(stats)
+            else:
+                statistics[group] = stats
+    return statistics
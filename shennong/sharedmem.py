@@ -0,0 +1,345 @@
+"""Shared memory transport of audio signals and features between processes
+
+When the features are extracted in subprocesses (for instance with a
+:class:`~concurrent.futures.ProcessPoolExecutor`), the audio signals
+and features sent to and received from the workers are pickled and
+copied through a pipe, which can dominate the computation time for
+large arrays.
+
+This module moves the arrays in shared memory (see
+:mod:`multiprocessing.shared_memory`). A shared object is pickled as
+a small descriptor (the name of the shared memory block, the shape and
+type of the array) and the receiving process attaches to the shared
+memory to access the data.
+
+The process creating a shared object writes the data once in shared
+memory. The consumer on the other side gets the data with
+:func:`unshare` as read-only views on the shared memory, no data is
+copied. The shared memory is released once the consumer is done with
+it, that is when the views are garbage collected. A consumer
+modifying the data must copy it first.
+
+Examples
+--------
+
+>>> import pickle
+>>> from shennong.audio import Audio
+>>> from shennong.sharedmem import share, unshare
+>>> audio = Audio.load('./test/data/test.wav')
+
+The shared audio is pickled as a descriptor of a few bytes:
+
+>>> shared = share(audio)
+>>> len(pickle.dumps(shared)) < 300
+True
+
+On the consumer side, the shared audio is a read-only view on the
+shared memory, released when the view is garbage collected:
+
+>>> audio2 = unshare(pickle.loads(pickle.dumps(shared)))
+>>> audio2 == audio
+True
+>>> audio2.data.flags.writeable
+False
+>>> shared.close()
+
+"""
+
+import multiprocessing.resource_tracker
+import multiprocessing.shared_memory
+import os
+import weakref
+
+import numpy as np
+
+from shennong.audio import Audio
+from shennong.features import Features, RegularTimes
+
+
+class _SharedBuffer:
+    """Exposes a shared memory block to numpy
+
+    The arrays built on this buffer (with :func:`numpy.asarray`) have
+    it as base and keep a reference to the shared memory, so that the
+    block stays mapped as long as they are alive.
+
+    """
+    def __init__(self, shm, shape, dtype):
+        self._shm = shm
+        self.__array_interface__ = np.ndarray(
+            shape, dtype=dtype, buffer=shm.buf).__array_interface__
+
+
+def _unlink(shm):
+    """Releases the shared memory block `shm` if not already done"""
+    try:
+        shm.unlink()
+    except FileNotFoundError:  # already released
+        pass
+
+
+class SharedArray:
+    """A numpy array stored in shared memory
+
+    The array is copied in a new shared memory block at
+    instanciation. When pickled, only a descriptor of the array is
+    sent and the unpickled instance attaches to the shared memory.
+
+    Parameters
+    ----------
+    array : numpy array
+        The array to copy in shared memory
+
+    """
+    def __init__(self, array):
+        array = np.asarray(array)
+        self._shape = array.shape
+        self._dtype = array.dtype
+        # a shared memory block cannot be empty
+        self._shm = multiprocessing.shared_memory.SharedMemory(
+            create=True, size=max(array.nbytes, 1))
+        self._name = self._shm.name
+        self._buffer = None
+        self.array[...] = array
+
+    def __getstate__(self):
+        return {
+            'name': self._shm.name, 'shape': self._shape,
+            'dtype': self._dtype.str}
+
+    def __setstate__(self, state):
+        self._shape = state['shape']
+        self._dtype = np.dtype(state['dtype'])
+        self._shm = multiprocessing.shared_memory.SharedMemory(
+            name=state['name'])
+        self._name = self._shm.name
+        self._buffer = None
+
+    @property
+    def name(self):
+        """The name of the shared memory block"""
+        return self._name
+
+    @property
+    def array(self):
+        """The array as a writable view on the shared memory
+
+        The shared memory stays mapped as long as the view is alive,
+        even if this instance is closed.
+
+        """
+        if self._shm is None:
+            raise ValueError('shared memory {} is closed'.format(self.name))
+
+        # all the views of this instance share the same buffer, so
+        # that the release can wait for all of them
+        buffer = self._buffer() if self._buffer is not None else None
+        if buffer is None:
+            buffer = _SharedBuffer(self._shm, self._shape, self._dtype)
+            self._buffer = weakref.ref(buffer)
+        return np.asarray(buffer)
+
+    def view(self):
+        """Returns the array as a read-only view on the shared memory"""
+        array = self.array
+        array.flags.writeable = False
+        return array
+
+    def copy(self):
+        """Returns a copy of the array in private memory"""
+        return self.array.copy()
+
+    def close(self):
+        """Closes the access to the shared memory from this instance
+
+        The shared memory block is not released, other processes can
+        still access it. It is unmapped from this process once the
+        views on it are garbage collected.
+
+        """
+        self._shm = None
+
+    def release(self):
+        """Closes and releases the shared memory block
+
+        Once released, the shared memory block cannot be accessed
+        anymore by any process. When views from this instance are
+        alive (see :func:`view`), the block is released only once
+        they are garbage collected.
+
+        """
+        shm, self._shm = self._shm, None
+        if shm is None:
+            try:
+                shm = multiprocessing.shared_memory.SharedMemory(
+                    name=self.name)
+            except FileNotFoundError:  # already released
+                return
+
+        buffer = self._buffer() if self._buffer is not None else None
+        if buffer is None:
+            _unlink(shm)
+        else:
+            weakref.finalize(buffer, _unlink, shm)
+
+
+class SharedAudio:
+    """An :class:`~shennong.audio.Audio` with samples in shared memory
+
+    Parameters
+    ----------
+    audio : :class:`~shennong.audio.Audio`
+        The audio signal to share
+
+    """
+    def __init__(self, audio):
+        self._data = SharedArray(audio.data)
+        self._sample_rate = audio.sample_rate
+
+    def get(self):
+        """Returns the shared audio signal, as a read-only view"""
+        return Audio(self._data.view(), self._sample_rate, validate=False)
+
+    def close(self):
+        """Closes the shared memory, see :func:`SharedArray.close`"""
+        self._data.close()
+
+    def release(self):
+        """Releases the shared memory, see :func:`SharedArray.release`"""
+        self._data.release()
+
+
+class SharedFeatures:
+    """A :class:`~shennong.features.features.Features` in shared memory
+
+    The features data and times are shared, the properties (and the
+    times when they are a compact
+    :class:`~shennong.features.features.RegularTimes`) are pickled
+    along with the descriptor.
+
+    Parameters
+    ----------
+    features : :class:`~shennong.features.features.Features`
+        The features to share
+
+    """
+    def __init__(self, features):
+        self._data = SharedArray(features.data)
+        self._times = features.time_axis
+        if not isinstance(self._times, RegularTimes):
+            self._times = SharedArray(self._times)
+        self._properties = features.properties
+
+    def get(self):
+        """Returns the shared features, as read-only views"""
+        return Features(
+            self._data.view(),
+            self._times if isinstance(self._times, RegularTimes)
+            else self._times.view(),
+            properties=self._properties, validate=False)
+
+    def close(self):
+        """Closes the shared memory, see :func:`SharedArray.close`"""
+        self._data.close()
+        if isinstance(self._times, SharedArray):
+            self._times.close()
+
+    def release(self):
+        """Releases the shared memory, see :func:`SharedArray.release`"""
+        self._data.release()
+        if isinstance(self._times, SharedArray):
+            self._times.release()
+
+
+_SHARED_TYPES = (SharedAudio, SharedFeatures)
+
+
+def share(obj):
+    """Moves the audio signals and features in `obj` to shared memory
+
+    Parameters
+    ----------
+    obj : object
+        An :class:`~shennong.audio.Audio`, a
+        :class:`~shennong.features.features.Features` or a (possibly
+        nested) list, tuple or dict of them. The other objects are left
+        untouched.
+
+    Returns
+    -------
+    shared : object
+        The same structure as `obj`, where the audio and features are
+        replaced by :class:`SharedAudio` and :class:`SharedFeatures`.
+
+    """
+    if isinstance(obj, Audio):
+        return SharedAudio(obj)
+    if isinstance(obj, Features):
+        return SharedFeatures(obj)
+    if isinstance(obj, dict):
+        return type(obj)((k, share(v)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(share(o) for o in obj)
+    return obj
+
+
+def unshare(obj, release=True):
+    """Gets back the audio signals and features shared by :func:`share`
+
+    Parameters
+    ----------
+    obj : object
+        The structure returned by :func:`share`
+    release : bool, optional
+        When True (default), the shared memory is released once the
+        returned audio and features are garbage collected. Otherwise
+        the shared memory is only closed in this process.
+
+    Returns
+    -------
+    obj : object
+        The same structure as `obj` where the shared objects are
+        replaced by audio and features with read-only views on the
+        shared memory as data.
+
+    """
+    if isinstance(obj, _SHARED_TYPES):
+        try:
+            return obj.get()
+        finally:
+            if release:
+                obj.release()
+            else:
+                obj.close()
+    if isinstance(obj, dict):
+        return type(obj)(
+            (k, unshare(v, release=release)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(unshare(o, release=release) for o in obj)
+    return obj
+
+
+def release(obj):
+    """Releases the shared memory of the shared objects in `obj`"""
+    if isinstance(obj, _SHARED_TYPES):
+        obj.release()
+    elif isinstance(obj, dict):
+        for v in obj.values():
+            release(v)
+    elif isinstance(obj, (list, tuple)):
+        for o in obj:
+            release(o)
+
+
+def start_tracker():
+    """Starts the tracker of the shared memory blocks in this process
+
+    The subprocesses forked afterwards share the tracker of this
+    process instead of starting their own one. This must be called
+    before starting workers exchanging shared memory with this
+    process, otherwise the blocks created by a worker and released by
+    this process are reported as leaked by the worker's tracker.
+
+    """
+    if os.name == 'posix':
+        multiprocessing.resource_tracker.ensure_running()
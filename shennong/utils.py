@@ -4,6 +4,7 @@ Those fonctions are not designed to be used by the end-user.
 
 """
 
+import collections
 import logging
 import multiprocessing
 import numpy as np
@@ -11,6 +12,8 @@ import os
 import pkg_resources
 import re
 import sys
+import threading
+import weakref
 
 
 _logger = logging.getLogger()
@@ -138,13 +141,15 @@ def list2array(x):
 
 
 def array2list(x):
-    """Converts numpy arrays in `x` into lists"""
+    """Converts numpy arrays and tuples in `x` into lists"""
     if isinstance(x, dict):
         return {
             k: array2list(v)
             for k, v in x.items()}
     elif isinstance(x, np.ndarray):
         return x.tolist()
+    elif isinstance(x, tuple):
+        return [array2list(v) for v in x]
     return x
 
 
@@ -217,6 +222,248 @@ def list_files_with_extension(
     return sorted(matched)
 
 
+class LRUCache:
+    """A thread-safe least recently used cache bounded in bytes
+
+    The cache stores values up to a total size of `maxbytes` (and, if
+    specified, up to `maxitems` values), the least recently used values
+    being evicted first. Values bigger than `maxbytes` are not cached.
+
+    The values are built on cache misses by a `load` function given to
+    :func:`get`. Two threads requesting the same missing key do not
+    load it twice: the second one waits for the first to load it.
+
+    Parameters
+    ----------
+    maxbytes : int
+        The maximal size of the cached values, in bytes
+    sizeof : function, optional
+        A function returning the size of a cached value in bytes,
+        default to `value.nbytes`
+    maxitems : int, optional
+        The maximal number of cached values, default to no limit
+
+    """
+    CacheInfo = collections.namedtuple(
+        'CacheInfo', 'hits misses nitems currbytes maxbytes')
+
+    def __init__(self, maxbytes, sizeof=lambda value: value.nbytes,
+                 maxitems=None):
+        if maxitems is not None and maxitems < 0:
+            raise ValueError(
+                'cache items must be positive, it is {}'.format(maxitems))
+        self._sizeof = sizeof
+        self._maxitems = maxitems
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._items = collections.OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._currbytes = 0
+        self.maxbytes = maxbytes
+
+    @property
+    def maxbytes(self):
+        """The maximal size of the cached values, in bytes"""
+        return self._maxbytes
+
+    @maxbytes.setter
+    def maxbytes(self, value):
+        if value < 0:
+            raise ValueError(
+                'cache size must be positive, it is {}'.format(value))
+        with self._lock:
+            self._maxbytes = int(value)
+            self._evict(0, nitems=0)
+
+    @property
+    def maxitems(self):
+        """The maximal number of cached values, None if unbounded"""
+        return self._maxitems
+
+    def info(self):
+        """Returns the cache statistics as a named tuple
+
+        The fields are hits, misses, nitems (the number of cached
+        values), currbytes (the size of the cached values) and
+        maxbytes.
+
+        """
+        with self._lock:
+            return self.CacheInfo(
+                self._hits, self._misses, len(self._items),
+                self._currbytes, self._maxbytes)
+
+    def clear(self):
+        """Empties the cache and resets the statistics"""
+        with self._lock:
+            self._items.clear()
+            self._hits = 0
+            self._misses = 0
+            self._currbytes = 0
+
+    def get(self, key, load):
+        """Returns the value cached for `key`, calls `load()` if missing"""
+        with self._lock:
+            if key in self._items:
+                return self._hit(key)
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # the value may have been loaded by another thread while
+            # we were waiting
+            with self._lock:
+                if key in self._items:
+                    return self._hit(key)
+                self._misses += 1
+
+            try:
+                value = load()
+                size = self._sizeof(value)
+                with self._lock:
+                    if size <= self._maxbytes and self._maxitems != 0:
+                        self._evict(size)
+                        self._items[key] = (value, size)
+                        self._currbytes += size
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+            return value
+
+    def _hit(self, key):
+        # must be called with the lock acquired
+        self._hits += 1
+        self._items.move_to_end(key)
+        return self._items[key][0]
+
+    def _evict(self, size, nitems=1):
+        # must be called with the lock acquired, removes the least
+        # recently used values until `nitems` values of `size` bytes
+        # can be added
+        while self._items and (
+                self._currbytes + size > self._maxbytes or (
+                    self._maxitems is not None and
+                    len(self._items) + nitems > self._maxitems)):
+            _, (_, evicted) = self._items.popitem(last=False)
+            self._currbytes -= evicted
+
+
+class FrozenDict(dict):
+    """A read-only dictionary
+
+    This is a dict which cannot be modified in place: any attempt to
+    modify it raises a TypeError. Because it cannot change, a
+    FrozenDict is never duplicated by :func:`copy.copy` or
+    :func:`copy.deepcopy`, and :func:`copy` returns a modifiable
+    dict (copy on write).
+
+    A FrozenDict should be built with :func:`freeze` or
+    :func:`intern_dict` so that the nested values are read-only as
+    well.
+
+    """
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(
+            '{} is read-only'.format(self.__class__.__name__))
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    __ior__ = _readonly
+    clear = _readonly
+    pop = _readonly
+    popitem = _readonly
+    setdefault = _readonly
+    update = _readonly
+
+    def __reduce__(self):
+        return self.__class__, (dict(self), )
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def copy(self):
+        """Returns a modifiable shallow copy of the dict"""
+        return dict(self)
+
+
+def freeze(value):
+    """Returns a read-only version of `value`
+
+    Dictionaries are converted to :class:`FrozenDict`, lists, tuples
+    and sets to tuples and numpy arrays to read-only copies,
+    recursively. Other values are returned as is.
+
+    """
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, np.ndarray):
+        if not value.flags.writeable:
+            return value
+        value = value.copy()
+        value.flags.writeable = False
+        return value
+    if isinstance(value, (list, tuple, set, type({}.keys()))):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def _intern_key(value):
+    """Returns a hashable key for `value`, raises TypeError if not possible
+
+    The type of the values is part of the key so that, for instance,
+    1 and True have distinct keys.
+
+    """
+    if isinstance(value, dict):
+        return dict, tuple((k, _intern_key(v)) for k, v in value.items())
+    if isinstance(value, np.ndarray):
+        return np.ndarray, value.dtype.str, value.shape, value.tobytes()
+    if isinstance(value, (list, tuple)):
+        return tuple, tuple(_intern_key(v) for v in value)
+    return type(value), hash(value), value
+
+
+_interned = weakref.WeakValueDictionary()
+_interned_lock = threading.Lock()
+
+
+def intern_dict(value):
+    """Returns a read-only dictionary shared among equal dictionaries
+
+    This is used to store the parameters of processors in the features
+    properties: all the features computed with the same parameters
+    refer to a single read-only dictionary instead of each having its
+    own copy. The interned dictionaries are released when they are not
+    referenced anymore.
+
+    Parameters
+    ----------
+    value : dict
+        The dictionary to intern
+
+    Returns
+    -------
+    interned : :class:`FrozenDict`
+        A read-only dictionary equal to `value`. When `value` contains
+        unhashable objects it is not interned, a new FrozenDict is
+        returned.
+
+    """
+    value = freeze(value)
+    try:
+        key = _intern_key(value)
+    except TypeError:  # unhashable values
+        return value
+
+    with _interned_lock:
+        return _interned.setdefault(key, value)
+
+
 class CatchExceptions(object):
     """Decorator wrapping a function in a try/except block
 
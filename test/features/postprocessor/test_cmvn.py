@@ -4,7 +4,9 @@ import pytest
 import numpy as np
 
 from shennong.features import Features, FeaturesCollection
-from shennong.features.postprocessor.cmvn import CmvnPostProcessor, apply_cmvn
+from shennong.features.postprocessor.cmvn import (
+    CmvnPostProcessor, SlidingCmvnPostProcessor, apply_cmvn)
+from shennong.utils import freeze
 
 
 def test_params():
@@ -191,6 +193,29 @@ def test_apply_cmvn_bycollection(features_collection):
     assert cmvns.var(axis=0) == pytest.approx(1, abs=1e-5)
 
 
+@pytest.mark.parametrize('weighted', [False, True])
+def test_apply_cmvn_packed(features_collection, weighted):
+    weights = None
+    if weighted:
+        weights = {
+            k: np.random.random((v.nframes,)).astype(np.float32)
+            for k, v in features_collection.items()}
+        weights['0'] = None
+
+    packed = features_collection.pack()
+    cmvn1 = apply_cmvn(features_collection, weights=weights)
+    cmvn2 = apply_cmvn(packed, weights=weights)
+    assert cmvn2.packed is not None
+    assert cmvn2.is_close(cmvn1)
+    assert (cmvn2['1'].properties['pipeline']
+            == cmvn1['1'].properties['pipeline'])
+
+    if weighted:
+        weights['1'] = weights['1'][1:]
+        with pytest.raises(ValueError) as err:
+            apply_cmvn(packed, weights=weights)
+        assert 'weights but' in str(err)
+
 @pytest.mark.parametrize('skip_dims', [[0, 1], [-1], [13]])
 def test_apply_cmvn_skipdims(features_collection, skip_dims):
     if skip_dims in ([-1], [13]):
@@ -213,3 +238,109 @@ def test_apply_cmvn_byfeatures(features_collection):
     for feat in cmvns.values():
         assert feat.data.mean(axis=0) == pytest.approx(0, abs=1e-5)
         assert feat.data.var(axis=0) == pytest.approx(1, abs=1e-5)
+
+
+def _sliding_cmvn(data, window, center, min_window, norm_vars):
+    # straightforward frame by frame implementation, as in Kaldi
+    nframes = data.shape[0]
+    output = np.empty(data.shape)
+    for t in range(nframes):
+        if center:
+            start = t - window // 2
+            end = start + window
+        else:
+            start = t - window
+            end = t + 1
+        if start < 0:
+            end -= start
+            start = 0
+        if not center:
+            end = max(t + 1, min_window)
+        if end > nframes:
+            start = max(0, start - (end - nframes))
+            end = nframes
+
+        mean = data[start:end].mean(axis=0)
+        output[t] = data[t] - mean
+        if norm_vars:
+            var = (data[start:end] ** 2).mean(axis=0) - mean ** 2
+            output[t] /= np.sqrt(var)
+    return output
+
+
+def test_sliding_params():
+    proc = SlidingCmvnPostProcessor()
+    assert proc.get_params() == {
+        'window': 600, 'center': False, 'min_window': 100,
+        'norm_vars': False}
+    assert proc.context == (600, 100)
+    assert SlidingCmvnPostProcessor(center=True).context == (600, 600)
+
+    with pytest.raises(ValueError) as err:
+        proc.ndims
+    assert 'depends on input' in str(err)
+
+    for window, min_window in ((0, 100), (1.5, 1), (10, 0), (10, 11)):
+        with pytest.raises(ValueError):
+            SlidingCmvnPostProcessor(window=window, min_window=min_window)
+
+
+@pytest.mark.parametrize(
+    'window, center, min_window, norm_vars',
+    [(w, c, m, n) for w in (1, 10, 50, 500) for c in (True, False)
+     for m in (1, 10) for n in (True, False) if m <= w])
+def test_sliding(mfcc, window, center, min_window, norm_vars):
+    proc = SlidingCmvnPostProcessor(
+        window=window, center=center, min_window=min_window,
+        norm_vars=norm_vars)
+    cmvn = proc.process(mfcc)
+
+    assert cmvn.shape == mfcc.shape
+    assert cmvn.dtype == mfcc.dtype
+    assert np.array_equal(cmvn.times, mfcc.times)
+    assert cmvn.properties['sliding_cmvn'] == proc.get_params()
+    assert cmvn.properties['pipeline'][-1]['name'] == 'sliding_cmvn'
+
+    if window > 1 or not norm_vars:
+        expected = _sliding_cmvn(
+            mfcc.data.astype(np.float64), window, center, min_window,
+            norm_vars)
+        assert cmvn.data == pytest.approx(expected, abs=1e-4)
+
+
+def test_sliding_global(mfcc):
+    # with a window larger than the features this is a global cmvn
+    proc = CmvnPostProcessor(mfcc.ndims)
+    proc.accumulate(mfcc)
+    cmvn1 = proc.process(mfcc, norm_vars=True)
+
+    cmvn2 = SlidingCmvnPostProcessor(
+        window=mfcc.nframes, center=True, norm_vars=True).process(mfcc)
+    assert cmvn1.data == pytest.approx(cmvn2.data, abs=1e-4)
+
+
+@pytest.mark.parametrize('sliding', [True, False])
+def test_properties_copy(mfcc, sliding):
+    # the output properties are a shallow copy of the input ones
+    audio = freeze({'file': 'a.wav', 'sample_rate': 16000})
+    feats = Features(
+        mfcc.data, mfcc.time_axis,
+        properties=dict(mfcc.properties, audio=audio))
+    if sliding:
+        output = SlidingCmvnPostProcessor().process(feats)
+    else:
+        proc = CmvnPostProcessor(feats.ndims)
+        proc.accumulate(feats)
+        output = proc.process(feats)
+    assert output.properties['mfcc'] is feats.properties['mfcc']
+
+    assert output.properties['audio'] is feats.properties['audio']
+    assert output.properties['pipeline'][0] is feats.properties['pipeline'][0]
+
+    # the shared entries are read-only, they are replaced, not modified
+    with pytest.raises(TypeError):
+        output.properties['audio']['file'] = 'b.wav'
+    with pytest.raises(TypeError):
+        output.properties['pipeline'][0]['columns'][0] = 42
+    output.properties['audio'] = {'file': 'b.wav'}
+    assert feats.properties['audio'] == {'file': 'a.wav', 'sample_rate': 16000}
@@ -3,7 +3,9 @@
 import numpy as np
 import pytest
 
+from shennong.features import Features
 from shennong.features.postprocessor.delta import DeltaPostProcessor
+from shennong.utils import freeze
 
 
 def test_params():
@@ -39,3 +41,24 @@ def test_ndims():
     with pytest.raises(ValueError) as err:
         DeltaPostProcessor().ndims
     assert 'output dimension for delta processor depends on input' in str(err)
+
+
+def test_properties_copy(mfcc):
+    # the output properties are a shallow copy of the input ones
+    audio = freeze({'file': 'a.wav', 'sample_rate': 16000})
+    feats = Features(
+        mfcc.data, mfcc.time_axis,
+        properties=dict(mfcc.properties, audio=audio))
+    output = DeltaPostProcessor().process(feats)
+    assert output.properties['mfcc'] is feats.properties['mfcc']
+
+    assert output.properties['audio'] is feats.properties['audio']
+    assert output.properties['pipeline'][0] is feats.properties['pipeline'][0]
+
+    # the shared entries are read-only, they are replaced, not modified
+    with pytest.raises(TypeError):
+        output.properties['audio']['file'] = 'b.wav'
+    with pytest.raises(TypeError):
+        output.properties['pipeline'][0]['columns'][0] = 42
+    output.properties['audio'] = {'file': 'b.wav'}
+    assert feats.properties['audio'] == {'file': 'a.wav', 'sample_rate': 16000}
@@ -0,0 +1,107 @@
+"""Test of the module shennong.features.postprocessor.splice"""
+
+import numpy as np
+import pytest
+
+from shennong.features import Features, RegularTimes
+from shennong.features.postprocessor.splice import SplicePostProcessor
+from shennong.utils import freeze
+
+
+def _splice(data, left, right):
+    # straightforward frame by frame implementation, as in Kaldi
+    nframes = data.shape[0]
+    output = []
+    for t in range(nframes):
+        output.append(np.concatenate([
+            data[min(max(t + c, 0), nframes - 1)]
+            for c in range(-left, right + 1)]))
+    return np.asarray(output).reshape((nframes, -1))
+
+
+def test_params():
+    s = SplicePostProcessor()
+    assert s.get_params() == {'left_context': 4, 'right_context': 4}
+    assert s.context == (4, 4)
+
+    s.set_params(left_context=0, right_context=2)
+    assert s.context == (0, 2)
+
+    for value in (-1, 1.5):
+        with pytest.raises(ValueError) as err:
+            SplicePostProcessor(left_context=value)
+        assert 'left context must be a positive integer' in str(err)
+        with pytest.raises(ValueError) as err:
+            SplicePostProcessor(right_context=value)
+        assert 'right context must be a positive integer' in str(err)
+
+    with pytest.raises(ValueError) as err:
+        SplicePostProcessor().ndims
+    assert 'output dimension for splice processor depends on input' in str(err)
+
+
+@pytest.mark.parametrize(
+    'left, right, nframes',
+    [(l, r, n) for l in (0, 1, 4) for r in (0, 3) for n in (1, 2, 20)])
+def test_output(left, right, nframes):
+    feats = Features(
+        np.random.random((nframes, 3)).astype(np.float32),
+        RegularTimes(0, 0.01, 0.025, nframes),
+        properties={'pipeline': [{'name': 'foo', 'columns': [0, 2]}]})
+
+    spliced = SplicePostProcessor(left, right).process(feats)
+    assert spliced.shape == (nframes, 3 * (left + 1 + right))
+    assert spliced.dtype == feats.dtype
+    assert spliced.time_axis is feats.time_axis
+    assert np.array_equal(spliced.data, _splice(feats.data, left, right))
+    assert spliced.is_valid()
+    assert spliced.properties['splice'] == {
+        'left_context': left, 'right_context': right}
+    assert spliced.properties['pipeline'][-1] == {
+        'name': 'splice', 'columns': (0, spliced.ndims - 1)}
+
+    # read-only view
+    assert not spliced.data.flags.writeable
+    assert spliced.data.base is not None
+    if not left and not right:
+        assert np.shares_memory(spliced.data, feats.data)
+
+    # writeable copy
+    copied = SplicePostProcessor(left, right).process(feats, writeable=True)
+    assert copied.data.flags.writeable
+    assert copied.data.flags.c_contiguous
+    assert copied == spliced
+
+
+def test_empty():
+    feats = Features(np.zeros((0, 3)), np.zeros((0,)))
+    spliced = SplicePostProcessor(2, 2).process(feats)
+    assert spliced.shape == (0, 15)
+
+
+def test_chunked(mfcc):
+    proc = SplicePostProcessor(3, 5)
+    assert proc.process_chunked(mfcc, chunk_size=10, njobs=2) == (
+        proc.process(mfcc, writeable=True))
+
+
+def test_properties_copy():
+    # the output properties are a shallow copy of the input ones
+    feats = Features(
+        np.random.random((10, 2)), np.arange(10), properties={
+            'audio': freeze({'file': 'a.wav', 'sample_rate': 16000}),
+            'pipeline': freeze([{'name': 'foo', 'columns': [0, 1]}])})
+    output = SplicePostProcessor(1, 1).process(feats)
+    output2 = SplicePostProcessor(1, 1).process(feats)
+    assert output.properties['splice'] is output2.properties['splice']
+
+    assert output.properties['audio'] is feats.properties['audio']
+    assert output.properties['pipeline'][0] is feats.properties['pipeline'][0]
+
+    # the shared entries are read-only, they are replaced, not modified
+    with pytest.raises(TypeError):
+        output.properties['audio']['file'] = 'b.wav'
+    with pytest.raises(TypeError):
+        output.properties['pipeline'][0]['columns'][0] = 42
+    output.properties['audio'] = {'file': 'b.wav'}
+    assert feats.properties['audio'] == {'file': 'a.wav', 'sample_rate': 16000}
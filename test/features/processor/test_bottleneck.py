@@ -12,7 +12,7 @@ from shennong.features.processor.bottleneck import (
 
 @pytest.mark.parametrize('weights', ['BabelMulti', 'FisherMono', 'FisherTri'])
 def test_params(weights):
-    p = {'weights': weights, 'dither': 0.1}
+    p = {'weights': weights, 'dither': 0.1, 'dtype': 'float64'}
     assert BottleneckProcessor(**p).get_params() == p
 
     b = BottleneckProcessor()
@@ -33,6 +33,11 @@ def test_bad_params():
         b.set_params(**{'weights': w})
     assert 'invalid weights' in str(err)
 
+    for dtype in ('float16', 'bad'):
+        with pytest.raises(ValueError) as err:
+            BottleneckProcessor(dtype=dtype)
+        assert 'invalid dtype' in str(err)
+
 
 def test_available_weights():
     weights = BottleneckProcessor.available_weights()
@@ -62,6 +67,7 @@ def test_process(capsys, audio, mfcc, weights):
     proc = BottleneckProcessor(weights=weights)
     feat = proc.process(audio)
     assert feat.shape == (140, 80)
+    assert feat.dtype == np.float32
     assert feat.shape[1] == proc.ndims
     assert np.allclose(feat.times, mfcc.times)
     assert proc.frame_length == 0.025
@@ -81,6 +87,12 @@ def test_compare_original(audio_8k, bottleneck_original):
     assert bottleneck_original.shape == feat.shape
     assert bottleneck_original == pytest.approx(feat.data, abs=2e-2)
 
+    # computing in float64 gives almost the same features
+    feat64 = BottleneckProcessor(
+        weights='BabelMulti', dither=0, dtype='float64').process(audio_8k)
+    assert feat64.dtype == np.float64
+    assert np.allclose(feat64.data, feat.data, atol=1e-3)
+
 
 def test_silence():
     silence = Audio(np.zeros((100,)), 16000)
@@ -40,7 +40,9 @@ def test_raw(audio, raw_energy):
     p = {'raw_energy': raw_energy, 'dither': 0}
     mfcc = MfccProcessor(**p).process(audio).data[:, 0]
     plp = PlpProcessor(**p).process(audio).data[:, 0]
-    energy = EnergyProcessor(**p).process(audio).data[:, 0]
+    energy = EnergyProcessor(**p).process(audio)
+    assert energy.dtype == mfcc.dtype == np.float32
+    energy = energy.data[:, 0]
 
     assert np.allclose(mfcc, energy)
     assert np.allclose(plp, energy)
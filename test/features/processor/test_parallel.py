@@ -1,11 +1,23 @@
 """Test of parallel features processing"""
 
 import multiprocessing
+import numpy as np
 import pytest
 
+from shennong.audio import Audio
 from shennong.utils import get_logger
+from shennong.features.postprocessor.cmvn import (
+    CmvnPostProcessor, SlidingCmvnPostProcessor)
+from shennong.features.postprocessor.delta import DeltaPostProcessor
 from shennong.features.processor.mfcc import MfccProcessor
 from shennong.features.processor.bottleneck import BottleneckProcessor
+from shennong.features.processor.energy import EnergyProcessor
+from shennong.features.processor.filterbank import FilterbankProcessor
+from shennong.features.processor.pitch import (
+    PitchProcessor, PitchPostProcessor)
+from shennong.features.processor.plp import PlpProcessor
+from shennong.features.processor.rastaplp import RastaPlpProcessor
+from shennong.features.processor.spectrogram import SpectrogramProcessor
 
 
 @pytest.mark.parametrize('proc', [MfccProcessor, BottleneckProcessor])
@@ -39,3 +51,106 @@ def test_njobs(capsys, njobs, audio):
         assert 'CPU cores but reducing to' in capsys.readouterr().err
 
     assert signals.keys() == features.keys()
+
+
+@pytest.mark.parametrize('proc', [
+    MfccProcessor, FilterbankProcessor, PlpProcessor,
+    SpectrogramProcessor, EnergyProcessor])
+def test_process_batch(audio, proc):
+    # short signals of various durations
+    signals = [
+        Audio(audio.data[n:n + 400 + 1000 * n], audio.sample_rate)
+        for n in range(5)]
+    p = proc(sample_rate=audio.sample_rate, dither=0)
+
+    batch = p.process_batch(signals)
+    assert p.process_batch([]) == []
+    assert len(batch) == len(signals)
+    for signal, features in zip(signals, batch):
+        assert features == p.process(signal)
+
+    # each features has its own properties, their read-only entries
+    # are shared
+    batch[0].properties['foo'] = 'bar'
+    assert 'foo' not in batch[1].properties
+    assert batch[0].properties['pipeline'] is batch[1].properties['pipeline']
+
+    with pytest.raises(ValueError) as err:
+        p.process_batch(signals + [Audio(np.zeros((100, 2)), 16000)])
+    assert 'signal must have one dimension' in str(err)
+
+
+@pytest.mark.parametrize('proc', [
+    MfccProcessor, FilterbankProcessor, SpectrogramProcessor])
+def test_process_channels(audio, proc):
+    data = np.asarray((audio.data, audio.data[::-1], audio.data // 2)).T
+    signal = Audio(data, audio.sample_rate)
+    p = proc(sample_rate=audio.sample_rate, dither=0)
+
+    features = p.process_channels(signal)
+    assert list(features.keys()) == [
+        'channel_0', 'channel_1', 'channel_2']
+    for index in range(3):
+        assert features['channel_{}'.format(index)] == p.process(
+            Audio(data[:, index].copy(), audio.sample_rate))
+
+    # mono signal
+    assert p.process_channels(audio)['channel_0'] == p.process(audio)
+
+
+@pytest.mark.parametrize('proc, snip_edges', [
+    (p, s) for p in (
+        MfccProcessor, FilterbankProcessor, PlpProcessor,
+        SpectrogramProcessor, EnergyProcessor)
+    for s in (True, False)])
+def test_process_chunked(audio, proc, snip_edges):
+    p = proc(sample_rate=audio.sample_rate, dither=0, snip_edges=snip_edges)
+    features = p.process(audio)
+
+    for duration in (0.01, 0.1, 0.33, 100):
+        chunked = p.process_chunked(audio, chunk_duration=duration, njobs=2)
+        assert chunked == features
+
+    with pytest.raises(ValueError) as err:
+        p.process_chunked(audio, chunk_duration=0)
+    assert 'chunk duration must be strictly positive' in str(err)
+
+
+def test_process_chunked_rastaplp(audio):
+    # the signal must be longer than the RASTA margin
+    signal = Audio(np.tile(audio.data, 6), audio.sample_rate)
+    p = RastaPlpProcessor(sample_rate=audio.sample_rate, dither=0)
+    features = p.process(signal)
+
+    # the RASTA filter forgets the start of a chunk up to the float32
+    # resolution of the features
+    assert p._chunk_margin() == 3 + 4 + 258
+    chunked = p.process_chunked(signal, chunk_duration=2, njobs=2)
+    assert chunked.is_close(features, atol=1e-6)
+
+
+@pytest.mark.parametrize('proc', [
+    DeltaPostProcessor, SlidingCmvnPostProcessor, PitchPostProcessor])
+def test_process_chunked_postprocessor(audio, mfcc, proc):
+    if proc is PitchPostProcessor:
+        features = PitchProcessor(sample_rate=audio.sample_rate).process(
+            audio)
+        p = proc(delta_pitch_noise_stddev=0)
+    else:
+        features = mfcc
+        p = proc()
+    processed = p.process(features)
+
+    for chunk_size in (1, 7, 50, 10000):
+        chunked = p.process_chunked(features, chunk_size=chunk_size, njobs=2)
+        assert chunked.is_close(processed, atol=1e-5)
+
+    with pytest.raises(ValueError) as err:
+        p.process_chunked(features, chunk_size=0)
+    assert 'chunk size must be strictly positive' in str(err)
+
+
+def test_process_chunked_postprocessor_bad(mfcc):
+    with pytest.raises(ValueError) as err:
+        CmvnPostProcessor(mfcc.ndims).process_chunked(mfcc)
+    assert 'cannot process features by chunks' in str(err)
@@ -7,6 +7,7 @@ from shennong.audio import Audio
 from shennong.features import Features
 from shennong.features.processor.pitch import (
     PitchProcessor, PitchPostProcessor)
+from shennong.utils import freeze
 
 
 @pytest.fixture
@@ -126,3 +127,23 @@ def test_post_pitch_output(raw_pitch, options):
         with pytest.raises(ValueError) as err:
             p.process(raw_pitch)
         assert 'must be True' in str(err)
+
+
+def test_post_pitch_properties_copy(raw_pitch):
+    # the output properties are a shallow copy of the input ones
+    raw_pitch = Features(
+        raw_pitch.data, raw_pitch.time_axis, properties=dict(
+            raw_pitch.properties, audio=freeze({'file': 'a.wav'})))
+    output = PitchPostProcessor().process(raw_pitch)
+
+    assert output.properties['audio'] is raw_pitch.properties['audio']
+
+    # the shared entries are read-only, they are replaced, not modified
+    with pytest.raises(TypeError):
+        output.properties['audio']['file'] = 'b.wav'
+    with pytest.raises(TypeError):
+        output.properties['pipeline'][0]['columns'][0] = 42
+    output.properties['audio'] = {'file': 'b.wav'}
+    assert raw_pitch.properties['audio'] == {'file': 'a.wav'}
+    assert raw_pitch.properties['pipeline'][0]['columns'] == (
+        0, raw_pitch.ndims - 1)
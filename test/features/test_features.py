@@ -1,11 +1,13 @@
 """Test of the module shennong.features.features"""
 
+import concurrent.futures
+import pickle
 import numpy as np
 import pytest
 
-from shennong.features import Features, FeaturesCollection
+from shennong.features import Features, FeaturesCollection, RegularTimes
 from shennong.features.processor.mfcc import MfccProcessor
-from shennong.utils import get_logger
+from shennong.utils import freeze, get_logger
 
 
 def test_init_bad():
@@ -95,11 +97,12 @@ def test_copy(mfcc):
 
     # by explicit construction the arrays are shared
     mfcc2 = Features(
-        mfcc.data, mfcc.times, properties=mfcc.properties, validate=False)
+        mfcc.data, mfcc.time_axis, properties=mfcc.properties,
+        validate=False)
     assert mfcc2 == mfcc
     assert mfcc2 is not mfcc
     assert mfcc2.data is mfcc.data
-    assert mfcc2.times is mfcc.times
+    assert mfcc2.time_axis is mfcc.time_axis
     assert mfcc2.properties is mfcc.properties
 
 
@@ -110,6 +113,21 @@ def test_concatenate(mfcc):
     assert mfcc2.properties != mfcc.properties
     assert mfcc2.properties['mfcc'] == mfcc.properties['mfcc']
 
+    # the parameters are shared, not copied
+    assert mfcc2.properties['mfcc'] is mfcc.properties['mfcc']
+    assert mfcc2.properties['pipeline'][1]['columns'] == (
+        mfcc.ndims, 2 * mfcc.ndims - 1)
+    assert mfcc.properties['pipeline'][0]['columns'] == (0, mfcc.ndims - 1)
+
+    # the properties dict is copied, its read-only entries are shared
+    feats = Features(
+        mfcc.data, mfcc.time_axis,
+        properties=dict(mfcc.properties, audio=freeze({'file': 'a.wav'})))
+    feats2 = feats.concatenate(feats)
+    assert feats2.properties['audio'] is feats.properties['audio']
+    feats2.properties['audio'] = {'file': 'b.wav'}
+    assert feats.properties['audio'] == {'file': 'a.wav'}
+
     mfcc2 = Features(mfcc.data, mfcc.times + 1)
     with pytest.raises(ValueError) as err:
         mfcc.concatenate(mfcc2)
@@ -138,6 +156,50 @@ def test_concatenate_tolerance(capsys):
     assert 'WARNING' in capsys.readouterr().err
 
 
+def test_hstack(mfcc):
+    times = RegularTimes(0, 0.01, 0.025, 10)
+    f1 = Features(
+        np.random.random((10, 2)), times,
+        properties={'pipeline': [{'name': 'a', 'columns': [0, 1]}], 'a': 1})
+    f2 = Features(
+        np.random.random((11, 3)).astype(np.float32), times.resize(11),
+        properties={'pipeline': [{'name': 'b', 'columns': [0, 2]}], 'b': 2})
+    f3 = Features(
+        np.random.random((10, 1)), times,
+        properties={'pipeline': [{'name': 'c', 'columns': [0, 0]}], 'c': 3})
+
+    with pytest.raises(ValueError) as err:
+        Features.hstack([])
+    assert 'empty list of features' in str(err)
+
+    with pytest.raises(ValueError) as err:
+        Features.hstack([f1, f2, f3])
+    assert 'features have a different number of frames' in str(err)
+
+    f4 = Features.hstack([f1, f2, f3], tolerance=1)
+    assert f4.shape == (10, 6)
+    assert f4.dtype == np.float64
+    assert f4.time_axis == times
+    assert np.array_equal(
+        f4.data, np.hstack((f1.data, f2.data[:10], f3.data)))
+    assert f4.properties == {
+        'a': 1, 'b': 2, 'c': 3, 'pipeline': (
+            {'name': 'a', 'columns': (0, 1)},
+            {'name': 'b', 'columns': (2, 4)},
+            {'name': 'c', 'columns': (5, 5)})}
+
+    # same as successive concatenations
+    assert f4 == f1.concatenate(f2, tolerance=1).concatenate(f3)
+
+    # a single features is copied
+    assert Features.hstack([mfcc]) == mfcc
+    assert Features.hstack([mfcc]).data is not mfcc.data
+
+    with pytest.raises(ValueError) as err:
+        Features.hstack([f1, Features(f3.data, f3.times + 1)])
+    assert 'times are not equal' in str(err)
+
+
 def test_collection(mfcc):
     assert FeaturesCollection._value_type is Features
     assert FeaturesCollection().is_valid()
@@ -181,6 +243,43 @@ def test_partition():
         assert fc.is_valid()
 
 
+def test_pack():
+    f1 = Features(np.random.random((10, 2)), np.ones((10,)))
+    f2 = Features(np.random.random((5, 2)), np.ones((5,)))
+    f3 = Features(
+        np.random.random((5, 2)), RegularTimes(0, 0.01, 0.025, 5))
+    fc = FeaturesCollection(f1=f1, f2=f2, f3=f3)
+    assert fc.packed is None
+
+    packed = fc.pack()
+    assert packed == fc
+    assert packed.packed.data.shape == (20, 2)
+    assert np.array_equal(packed.packed.offsets, [0, 10, 15, 20])
+    assert packed.packed.keys == ('f1', 'f2', 'f3')
+    for features in packed.values():
+        assert np.shares_memory(features.data, packed.packed.data)
+    assert packed['f3'].time_axis is f3.time_axis
+
+    # the packed buffer is not pickled
+    assert pickle.loads(pickle.dumps(packed)).packed is None
+    assert pickle.loads(pickle.dumps(packed)) == fc
+
+    # modifying the collection invalidates the packing
+    packed['f2'] = f2
+    assert packed.packed is None
+    packed = fc.pack()
+    del packed['f2']
+    assert packed.packed is None
+
+    with pytest.raises(ValueError) as err:
+        FeaturesCollection().pack()
+    assert 'cannot pack an empty collection' in str(err)
+
+    fc['f4'] = Features(np.random.random((5, 3)), np.ones((5,)))
+    with pytest.raises(ValueError) as err:
+        fc.pack()
+    assert 'must have consistent dimensions' in str(err)
+
 def test_1d_times_sorted():
     # 10 frames, 5 dims
     data = np.random.random((10, 5))
@@ -203,3 +302,187 @@ def test_2d_times_badshape():
     with pytest.raises(ValueError) as err:
         Features(np.random.random((10, 3)), np.random.random((10, 3)))
     assert 'times shape[1] must be 2, it is 3' in str(err)
+
+
+@pytest.mark.parametrize('times, sorted', [
+    (np.asarray([]), True),
+    (np.asarray([0, 1, 1, 2]), True),
+    (np.asarray([0, 2, 1]), False),
+    (np.asarray([[0, 1], [1, 2], [1, 2], [2, 3]]), True),
+    (np.asarray([[1, 2], [0, 2], [2, 3]]), False),
+    (np.asarray([[0, 2], [1, 2], [0, 3]]), True),
+    (np.asarray([[0, 2], [1, 1]]), False)])
+def test_times_sorted(times, sorted):
+    # the vectorized check is equivalent to the lexicographic sort
+    index = (np.argsort(times, kind='stable') if times.ndim == 1
+             else np.lexsort(times.T))
+    assert np.array_equal(index, np.arange(times.shape[0])) == sorted
+
+    features = Features(
+        np.zeros((times.shape[0], 1)), times, validate=False)
+    assert features.is_valid() == sorted
+
+
+def test_validation():
+    data = np.zeros((3, 1))
+    times = np.asarray([2, 1, 0])
+
+    assert Features.validation_enabled()
+    with pytest.raises(ValueError):
+        Features(data, times)
+
+    with Features.validation(False):
+        assert not Features.validation_enabled()
+        features = Features(data, times)
+        assert not features.is_valid()
+
+        # explicit validation overrides the policy
+        with pytest.raises(ValueError):
+            Features(data, times, validate=True)
+
+        # the policy is specific to the current thread
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            assert executor.submit(Features.validation_enabled).result()
+
+    assert Features.validation_enabled()
+
+    # the policy is restored on errors
+    with pytest.raises(RuntimeError):
+        with Features.validation(False):
+            raise RuntimeError()
+    assert Features.validation_enabled()
+
+
+def test_regular_times():
+    times = RegularTimes(0, np.float32(0.01), np.float32(0.025), 10)
+    assert times.shape == (10, 2)
+    assert times == RegularTimes(
+        0, float(np.float32(0.01)), float(np.float32(0.025)), 10)
+    assert times != times.resize(9)
+    assert hash(times) == hash(times.resize(10))
+
+    # same timestamps as the processors
+    array = MfccProcessor().times(10)
+    assert np.array_equal(times.to_array(), array)
+    assert np.array_equal(np.asarray(times), array)
+
+    # with an offset
+    assert np.allclose(
+        RegularTimes(1, 0.01, 0.025, 10).to_array(), array + 1)
+
+    # an offset on the frames grid gives the same timestamps as the grid
+    assert np.array_equal(
+        RegularTimes(3 * times.shift, times.shift, times.length, 7).to_array(),
+        times.to_array()[3:])
+
+
+def test_regular_times_features():
+    data = np.random.random((10, 2))
+    times = RegularTimes(0, 0.01, 0.025, 10)
+    feats = Features(data, times)
+    assert feats.time_axis is times
+    assert np.array_equal(feats.times, times.to_array())
+
+    # equal to features with times as array
+    assert feats == Features(data, times.to_array())
+    assert feats.copy().time_axis is times
+    assert feats.copy(dtype=np.float32).time_axis is times
+
+    # validation
+    assert not Features(
+        data, times.resize(9), validate=False).is_valid()
+    assert not Features(
+        data, RegularTimes(0, -0.01, 0.025, 10), validate=False).is_valid()
+
+    # concatenation with trim
+    feats2 = Features(np.random.random((9, 1)), times.resize(9))
+    feats3 = feats.concatenate(feats2, tolerance=1)
+    assert feats3.shape == (9, 3)
+    assert feats3.time_axis == times.resize(9)
+
+    feats2 = Features(data, RegularTimes(0, 0.02, 0.025, 10))
+    with pytest.raises(ValueError) as err:
+        feats.concatenate(feats2)
+    assert 'times are not equal' in str(err)
+
+
+@pytest.mark.parametrize('regular', [True, False])
+def test_slice(regular):
+    # frames centers are at 0.0125 + 0.01 * n
+    times = RegularTimes(0, 0.01, 0.025, 100)
+    feats = Features(
+        np.random.random((100, 2)),
+        times if regular else times.to_array(),
+        properties={'audio': {'sample_rate': 16000, 'duration': 1.0}})
+
+    sliced = feats.slice(0.1, 0.5)
+    assert np.shares_memory(sliced.data, feats.data)
+    assert sliced.nframes == 40
+    assert np.array_equal(sliced.data, feats.data[9:49])
+    assert np.array_equal(sliced.times, feats.times[9:49])
+    assert sliced.is_valid()
+    assert isinstance(sliced.time_axis, RegularTimes) is regular
+    assert sliced.properties['audio'] == {
+        'sample_rate': 16000, 'tstart': 0.1, 'tstop': 0.5,
+        'duration': pytest.approx(0.4)}
+    assert feats.properties['audio'] == {
+        'sample_rate': 16000, 'duration': 1.0}
+
+    # the properties are copied on write, as for the post-processors
+    feats.properties['audio'] = freeze(feats.properties['audio'])
+    feats.properties['pipeline'] = freeze([{'name': 'a', 'columns': [0, 1]}])
+    for sliced in (feats.slice(), feats.slice(0.1, 0.5)):
+        assert sliced.properties is not feats.properties
+        assert sliced.properties['pipeline'] is feats.properties['pipeline']
+        with pytest.raises(TypeError):
+            sliced.properties['audio']['tstart'] = 0
+        sliced.properties['speaker'] = 'spk'
+        assert 'speaker' not in feats.properties
+
+    # a range starting on a frame center includes it
+    assert feats.slice(0.0125, 0.0325).nframes == 2
+
+    assert feats.slice() == feats
+    assert feats.slice(tstart=0.5).nframes == 51
+    assert feats.slice(tstop=0.5).nframes == 49
+    assert feats.slice(tstart=0.5).properties['audio']['tstop'] == 1.0
+    assert feats.slice(-1, 10).nframes == 100
+    assert feats.slice(0.5, 0.5).nframes == 0
+    assert feats.slice(2, 3).nframes == 0
+
+    with pytest.raises(ValueError) as err:
+        feats.slice(0.5, 0.1)
+    assert 'tstart must be lower than tstop' in str(err)
+
+
+def test_slice_1d():
+    feats = Features(np.random.random((5, 1)), np.asarray([0, 1, 2, 3, 4]))
+    sliced = feats.slice(1, 3)
+    assert np.array_equal(sliced.times, [1, 2])
+    assert sliced.properties == {}
+
+
+def test_slice_collection():
+    times = RegularTimes(0, 0.01, 0.025, 100)
+    fc = FeaturesCollection(
+        a=Features(np.random.random((100, 2)), times),
+        b=Features(np.random.random((100, 2)), times.to_array()))
+
+    segments = {
+        's1': ('a', 0.1, 0.5),
+        's2': ('b', 0.1, 0.5),
+        's3': ('a', None, 0.2),
+        's4': ('b', 0.9, None)}
+    sliced = fc.slice(segments)
+    assert list(sliced.keys()) == ['s1', 's2', 's3', 's4']
+    for k, (item, tstart, tstop) in segments.items():
+        assert sliced[k] == fc[item].slice(tstart, tstop)
+        assert np.shares_memory(sliced[k].data, fc[item].data)
+
+    with pytest.raises(ValueError) as err:
+        fc.slice({'s1': ('c', 0, 1)})
+    assert 'following items are not defined in the collection: c' in str(err)
+
+    with pytest.raises(ValueError) as err:
+        fc.slice({'s1': ('a', 1, 0)})
+    assert 'tstart must be lower than tstop for segment s1' in str(err)
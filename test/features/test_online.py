@@ -0,0 +1,156 @@
+"""Test of the module shennong.features.online"""
+
+import numpy as np
+import pytest
+
+from shennong.audio import Audio
+from shennong.features import Features, RegularTimes
+from shennong.features.online import (
+    get_online_processor, OnlineFramesProcessor, OnlinePitchProcessor,
+    OnlinePostProcessor)
+from shennong.features.processor.energy import EnergyProcessor
+from shennong.features.processor.filterbank import FilterbankProcessor
+from shennong.features.processor.mfcc import MfccProcessor
+from shennong.features.processor.pitch import (
+    PitchProcessor, PitchPostProcessor)
+from shennong.features.processor.plp import PlpProcessor
+from shennong.features.processor.spectrogram import SpectrogramProcessor
+from shennong.features.postprocessor.cmvn import (
+    CmvnPostProcessor, SlidingCmvnPostProcessor)
+from shennong.features.postprocessor.delta import DeltaPostProcessor
+from shennong.features.postprocessor.vad import VadPostProcessor
+
+
+def chunks(audio, size):
+    return [Audio(audio.data[n:n+size], audio.sample_rate)
+            for n in range(0, audio.nsamples, size)]
+
+
+@pytest.mark.parametrize(
+    'processor, size', [(p, s) for p in (
+        MfccProcessor, FilterbankProcessor, PlpProcessor,
+        SpectrogramProcessor, EnergyProcessor)
+                        for s in (1, 100, 400, 1600, 100000)])
+def test_frames(audio, processor, size):
+    proc = processor(sample_rate=audio.sample_rate, dither=0)
+    batch = proc.process(audio)
+
+    online = get_online_processor(proc)
+    assert isinstance(online, OnlineFramesProcessor)
+    assert online.processor is proc
+
+    # the emitted frames have a compact time axis
+    assert isinstance(online.accept(audio).time_axis, RegularTimes)
+    online.reset()
+
+    feats = online.process(chunks(audio, size))
+    assert online.nframes == 0  # reset after flush
+    assert feats.shape == batch.shape
+    assert np.array_equal(feats.times, batch.times)
+    assert feats.data == pytest.approx(batch.data, abs=1e-5)
+    assert feats.properties == batch.properties
+
+    # the processor can be used again after flush
+    assert online.process(chunks(audio, size)).is_close(feats)
+
+
+def test_frames_bad(audio):
+    with pytest.raises(ValueError) as err:
+        OnlineFramesProcessor(MfccProcessor(snip_edges=False))
+    assert 'requires snip_edges to be True' in str(err)
+
+    with pytest.raises(ValueError) as err:
+        OnlineFramesProcessor(PitchProcessor())
+    assert 'cannot be used online' in str(err)
+
+    online = OnlineFramesProcessor(MfccProcessor())
+    with pytest.raises(ValueError) as err:
+        online.accept(Audio(np.zeros((100, 2)), audio.sample_rate))
+    assert 'signal must have one dimension' in str(err)
+
+    online.accept(Audio(audio.data[:100], audio.sample_rate))
+    with pytest.raises(ValueError) as err:
+        online.accept(audio.astype(np.float32))
+    assert 'chunks must have the same dtype' in str(err)
+
+
+@pytest.mark.parametrize('size', [1, 7, 40, 10000])
+def test_delta(mfcc, size):
+    proc = DeltaPostProcessor(order=2, window=2)
+    assert proc.context == (4, 4)
+    batch = proc.process(mfcc)
+
+    online = get_online_processor(proc)
+    assert isinstance(online, OnlinePostProcessor)
+    assert online.accept(None) is None
+
+    feats = online.process(
+        [Features(mfcc.data[n:n+size], mfcc.times[n:n+size], mfcc.properties)
+         for n in range(0, mfcc.nframes, size)])
+    assert feats == batch
+
+
+@pytest.mark.parametrize('center', [True, False])
+def test_sliding_cmvn(mfcc, center):
+    proc = SlidingCmvnPostProcessor(window=40, center=center, min_window=10)
+    batch = proc.process(mfcc)
+
+    feats = get_online_processor(proc).process(
+        [Features(mfcc.data[n:n+15], mfcc.times[n:n+15], mfcc.properties)
+         for n in range(0, mfcc.nframes, 15)])
+    assert np.array_equal(feats.times, batch.times)
+    assert feats.data == pytest.approx(batch.data, abs=1e-5)
+
+
+def test_postprocessor_bad():
+    for proc in (CmvnPostProcessor(1), VadPostProcessor()):
+        assert proc.context is None
+        with pytest.raises(ValueError) as err:
+            get_online_processor(proc)
+        assert 'cannot be used online' in str(err)
+
+    with pytest.raises(ValueError) as err:
+        OnlinePostProcessor(MfccProcessor())
+    assert 'must be a FeaturesPostProcessor' in str(err)
+
+
+def test_pitch(audio):
+    proc = PitchProcessor(sample_rate=audio.sample_rate)
+    batch = proc.process(audio)
+
+    online = get_online_processor(proc)
+    assert isinstance(online, OnlinePitchProcessor)
+    assert online.latency == 0
+
+    # all the signal at once is the same as batch
+    assert online.process([audio]) == batch
+
+    # by chunks, the emitted frames are not revised and can differ a
+    # little from batch
+    feats = OnlinePitchProcessor(proc, latency=10).process(
+        chunks(audio, 1600))
+    assert feats.shape == batch.shape
+    assert np.array_equal(feats.times, batch.times)
+    assert feats.data[:, 0] == pytest.approx(batch.data[:, 0], abs=0.1)
+
+    with pytest.raises(ValueError) as err:
+        OnlinePitchProcessor(proc, latency=-1)
+    assert 'latency must be positive' in str(err)
+
+    with pytest.raises(ValueError) as err:
+        online.accept(Audio(audio.data, 8000))
+    assert 'mismatch in sample rates' in str(err)
+
+
+@pytest.mark.parametrize('delay', [0, 10, 100])
+def test_pitch_post(audio, delay):
+    raw = PitchProcessor(sample_rate=audio.sample_rate).process(audio)
+    proc = PitchPostProcessor(delta_pitch_noise_stddev=0, delay=delay)
+    batch = proc.process(raw)
+
+    feats = get_online_processor(proc).process(
+        [Features(raw.data[n:n+20], raw.times[n:n+20], raw.properties)
+         for n in range(0, raw.nframes, 20)])
+    assert feats.shape == batch.shape
+    assert np.array_equal(feats.times, batch.times)
+    assert feats.data == pytest.approx(batch.data, abs=1e-5)
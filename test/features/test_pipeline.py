@@ -1,14 +1,18 @@
 """Test of the module shennong.features.pipeline"""
 
+import asyncio
+import concurrent.futures
+import gc
 import numpy as np
 import os
+import pickle
 import pytest
 import yaml
 
 import shennong.features.pipeline as pipeline
 import shennong.utils as utils
 from shennong.audio import Audio
-from shennong.features import FeaturesCollection
+from shennong.features import Features, FeaturesCollection
 from shennong.features.serializers import supported_extensions
 
 
@@ -49,6 +53,13 @@ def test_config_good(features):
     assert equal_dict(c1, yaml.load(c2, Loader=yaml.FullLoader))
     assert equal_dict(c1, yaml.load(c3, Loader=yaml.FullLoader))
 
+    c4 = pipeline.get_default_config(features, dtype='float16')
+    c5 = pipeline.get_default_config(features, to_yaml=True, dtype='float16')
+    assert c4['dtype'] == 'float16'
+    assert 'dtype' not in c4[features]
+    assert '# The precision of the extracted features' in c5
+    assert equal_dict(c4, yaml.load(c5, Loader=yaml.FullLoader))
+
 
 @pytest.mark.parametrize('kind', ['dict', 'file', 'str'])
 def test_config_format(utterances_index, capsys, tmpdir, kind):
@@ -111,6 +122,36 @@ def test_config_bad(utterances_index):
     c = pipeline._init_config(config)
     assert c['pitch']['postprocessing'] == {}
 
+    with pytest.raises(ValueError) as err:
+        pipeline.get_default_config('mfcc', dtype='int8')
+    assert 'invalid dtype "int8"' in str(err)
+
+    config = pipeline.get_default_config('mfcc')
+    config['dtype'] = 'bad'
+    with pytest.raises(ValueError) as err:
+        pipeline._init_config(config)
+    assert 'invalid dtype "bad"' in str(err)
+
+    config = pipeline.get_default_config(
+        'mfcc', to_yaml=True, chunk_duration=10)
+    assert '# The utterances longer than this duration' in config
+    assert pipeline._init_config(config)['chunk_duration'] == 10
+
+    for features, chunk_duration, error in (
+            ('mfcc', 0, 'chunk_duration must be strictly positive'),
+            ('mfcc', 'a', 'chunk_duration must be strictly positive'),
+            ('bottleneck', 1, 'chunk_duration is not supported')):
+        with pytest.raises(ValueError) as err:
+            pipeline.get_default_config(
+                features, chunk_duration=chunk_duration)
+        assert error in str(err)
+
+    config = pipeline.get_default_config('mfcc')
+    config['chunk_duration'] = -1
+    with pytest.raises(ValueError) as err:
+        pipeline._init_config(config)
+    assert 'chunk_duration must be strictly positive' in str(err)
+
 
 def test_check_speakers(utterances_index, capsys):
     log = utils.get_logger(level='info')
@@ -173,18 +214,6 @@ def test_check_wavs_bad(wav_file, wav_file_8k, tmpdir, capsys):
         pipeline._Manager(c, u)
         return u
 
-    # build a stereo file and make sure it is not supported by the
-    # pipeline
-    audio = Audio.load(wav_file)
-    stereo = Audio(
-        np.asarray((audio.data, audio.data)).T, sample_rate=audio.sample_rate)
-    assert stereo.nchannels == 2
-    wav_file_2 = str(tmpdir.join('stereo.wav'))
-    stereo.save(wav_file_2)
-    with pytest.raises(ValueError) as err:
-        fun([(wav_file_2,)])
-    assert 'all wav files are not mono' in str(err)
-
     # ensure we catch differences in sample rates
     capsys.readouterr()  # clear buffer
     w = [(wav_file, ), (wav_file_8k, )]
@@ -199,6 +228,39 @@ def test_check_wavs_bad(wav_file, wav_file_8k, tmpdir, capsys):
     assert 'timestamps are not in increasing order for' in str(err)
 
 
+def test_multichannel(wav_file, audio, tmpdir, capsys):
+    # build a stereo file, the features are extracted on each channel
+    stereo = Audio(
+        np.asarray((audio.data, audio.data[::-1])).T,
+        sample_rate=audio.sample_rate)
+    wav_file_2 = str(tmpdir.join('stereo.wav'))
+    stereo.save(wav_file_2)
+
+    config = pipeline.get_default_config(
+        'mfcc', with_pitch=False, with_cmvn=False)
+    config['mfcc']['dither'] = 0
+    feats = pipeline.extract_features(
+        config, [('mono', wav_file), ('stereo', wav_file_2, 0, 1)],
+        log=utils.get_logger(level='info'))
+    assert 'found 1 multi-channel wavs' in capsys.readouterr().err
+    assert sorted(feats.keys()) == [
+        'mono', 'stereo_channel_0', 'stereo_channel_1']
+    assert feats['stereo_channel_0'].properties['audio']['channel'] == 0
+    assert feats['stereo_channel_1'].properties['audio']['channel'] == 1
+    assert 'channel' not in feats['mono'].properties['audio']
+    # same features excepted on the last frames (deltas context)
+    assert np.array_equal(
+        feats['stereo_channel_0'].data[:94], feats['mono'].data[:94])
+    assert feats['stereo_channel_0'] != feats['stereo_channel_1']
+
+    # in memory
+    p = pipeline.Pipeline(config)
+    feats2 = p.process(stereo)
+    assert list(feats2.keys()) == ['channel_0', 'channel_1']
+    assert np.array_equal(
+        feats2['channel_0'].data, p.process(stereo.channel(0)).data)
+
+
 def test_processor_bad():
     get = pipeline._Manager.get_processor_class
     with pytest.raises(ValueError) as err:
@@ -238,6 +300,29 @@ def test_extract_features(utterances_index, features):
     assert feat3.shape[1] == feat1.shape[1]
 
 
+@pytest.mark.parametrize('features', ['mfcc', 'bottleneck'])
+@pytest.mark.parametrize('dtype', ['float16', 'float32', 'float64'])
+def test_dtype(utterances_index, features, dtype):
+    config = pipeline.get_default_config(
+        features, with_cmvn=False, dtype=dtype)
+    feats = pipeline.extract_features(config, utterances_index)
+    assert feats[utterances_index[0][0]].dtype == dtype
+    assert feats.is_valid()
+
+
+@pytest.mark.parametrize('features', ['mfcc', 'rastaplp'])
+def test_chunk_duration(utterances_index, features):
+    config = pipeline.get_default_config(features, with_pitch=False)
+    config[features]['dither'] = 0
+    feats1 = pipeline.extract_features(config, utterances_index)
+
+    # chunks shorter than the utterances
+    config['chunk_duration'] = 0.3
+    feats2 = pipeline.extract_features(config, utterances_index)
+    assert feats2.is_valid()
+    assert feats2.is_close(feats1)
+
+
 @pytest.mark.parametrize(
     'by_speaker, with_vad',
     [(s, v) for s in (True, False) for v in (True, False)])
@@ -253,6 +338,74 @@ def test_cmvn(utterances_index, by_speaker, with_vad):
     assert feat2.shape[1] == 13
 
 
+@pytest.mark.parametrize('njobs', [1, 2])
+def test_batches(wav_file, wav_file_8k, monkeypatch, njobs):
+    index = [('u{}'.format(n), wav_file, 's1', n / 10, n / 10 + 0.3)
+             for n in range(10)] + [('u10', wav_file_8k, 's1', 0, 0.3)]
+    config = pipeline.get_default_config('mfcc', with_pitch=False)
+    config['mfcc']['dither'] = 0
+    config['cmvn']['with_vad'] = False
+
+    utterances = pipeline._init_utterances(index)
+    manager = pipeline._Manager(pipeline._init_config(config), utterances)
+    batches = manager.get_batches(njobs)
+    assert sum(batches, []) == list(utterances.keys())
+    assert ['u10'] in batches
+    assert len(batches) == (2 if njobs == 1 else 3)
+
+    feats1 = pipeline.extract_features(config, index, njobs=njobs)
+    monkeypatch.setattr(pipeline._Manager, '_max_batch_size', 1)
+    assert len(manager.get_batches(njobs)) == 11
+    feats2 = pipeline.extract_features(config, index, njobs=njobs)
+    assert feats1 == feats2
+
+
+def test_sparse_wavs(wav_file, wav_file_8k, audio, monkeypatch):
+    index = [
+        ('u1', wav_file, 0.1, 0.3), ('u2', wav_file, 1, 1.2),
+        ('u3', wav_file_8k, 0, 0.5), ('u4', wav_file_8k, 0.5, 1)]
+    config = pipeline._init_config(
+        pipeline.get_default_config('mfcc', with_cmvn=False))
+    # the wavs headers are read only once
+    read_header = Audio._read_header
+    read = []
+    monkeypatch.setattr(Audio, '_read_header', classmethod(
+        lambda cls, wav: read.append(wav) or read_header(wav)))
+    manager = pipeline._Manager(config, pipeline._init_utterances(index))
+    assert manager._sparse_wavs == {wav_file}
+    assert sorted(read) == sorted([wav_file, wav_file_8k])
+    manager.get_batches(1)
+    assert len(read) == 2
+
+    monkeypatch.setattr(Audio, 'load', None)
+    assert manager.get_audio('u1') == audio.segment([(0.1, 0.3)])[0]
+    assert manager.get_audio('u2') == audio.segment([(1, 1.2)])[0]
+
+
+def test_sliding_cmvn(utterances_index, capsys):
+    config = pipeline.get_default_config(
+        'mfcc', with_pitch=False, with_delta=False, sliding_cmvn=True)
+    assert config['cmvn'].keys() == {'sliding'}
+    assert 'sliding' in pipeline.get_default_config(
+        'mfcc', to_yaml=True, sliding_cmvn=True)
+
+    config['cmvn']['sliding']['center'] = True
+    config['cmvn']['with_vad'] = True
+    feats = pipeline.extract_features(
+        config, utterances_index, log=utils.get_logger(level='info'))
+    log_out = capsys.readouterr().err
+    assert 'sliding cmvn' in log_out
+    assert 'options are ignored with sliding cmvn' in log_out
+    assert 'pass 1' not in log_out
+
+    feat = feats[utterances_index[0][0]]
+    assert feat.is_valid()
+    assert feat.shape == (140, 13)
+    assert 'sliding_cmvn' in feat.properties
+    assert feat.properties['sliding_cmvn']['center']
+    assert feat.data.mean(axis=0) == pytest.approx(0, abs=1e-5)
+
+
 @pytest.mark.parametrize('ext', supported_extensions().keys())
 def test_extract_features_full(ext, wav_file, wav_file_8k, wav_file_float32,
                                capsys, tmpdir):
@@ -321,3 +474,192 @@ def test_extract_features_full(ext, wav_file, wav_file_8k, wav_file_float32,
     feats.save(filename)
     feats2 = FeaturesCollection.load(filename)
     assert feats2 == feats
+
+
+def test_pipeline_class(utterances_index, wav_file, audio):
+    config = pipeline.get_default_config('mfcc', with_pitch=False)
+    config['mfcc']['dither'] = 0
+    config['cmvn']['with_vad'] = False
+    feats1 = pipeline.extract_features(config, utterances_index)
+
+    p = pipeline.Pipeline(config)
+    assert p.features == 'mfcc'
+    assert p.cmvn_stats == {}
+
+    # several calls reuse the same processors
+    feats2 = p.process_many(utterances_index)
+    assert len(p._processors) == 1
+    proc = list(p._processors.values())[0]
+    feats3 = p.process_many(utterances_index)
+    assert list(p._processors.values())[0] is proc
+    assert list(p._wavs_metadata.keys()) == [wav_file]
+    assert feats1 == feats2 == feats3
+
+    # process an audio signal loaded in memory
+    feats4 = p.process(audio, speaker=utterances_index[0][2])
+    assert feats4.properties['audio'] == {
+        'sample_rate': audio.sample_rate, 'duration': audio.duration}
+    assert np.array_equal(feats4.data, feats1[utterances_index[0][0]].data)
+
+    with pytest.raises(ValueError) as err:
+        p.process(audio)
+    assert 'no speaker information provided' in str(err)
+
+
+def test_pipeline_cmvn_stats(utterances_index, audio):
+    config = pipeline.get_default_config('mfcc', with_pitch=False)
+    config['cmvn']['with_vad'] = False
+    p = pipeline.Pipeline(config)
+    feats = p.process_many(utterances_index)
+    speaker = utterances_index[0][2]
+    stats = feats[utterances_index[0][0]].properties['cmvn']['stats']
+
+    # normalize a signal with the stats of another one
+    p.load_cmvn_stats(feats)
+    assert p.cmvn_stats.keys() == {speaker}
+    assert p.cmvn_stats[speaker] == pytest.approx(stats)
+
+    silence = Audio(np.zeros(audio.nsamples, dtype=audio.dtype), 16000)
+    cmvn = p.process(silence, speaker=speaker)
+    assert cmvn.properties['cmvn']['stats'] == pytest.approx(stats)
+    assert p.process(silence, speaker='other').properties['cmvn'][
+        'stats'] != pytest.approx(stats)
+
+    p.load_cmvn_stats({'other': stats})
+    assert p.cmvn_stats.keys() == {speaker, 'other'}
+
+    with pytest.raises(ValueError) as err:
+        p.load_cmvn_stats({'bad': np.zeros((3, 3))})
+    assert 'cmvn stats must be an array of shape' in str(err)
+
+    del feats[utterances_index[0][0]].properties['speaker']
+    with pytest.raises(ValueError) as err:
+        p.load_cmvn_stats(feats)
+    assert 'cannot read cmvn stats from features' in str(err)
+
+    p = pipeline.Pipeline(pipeline.get_default_config('mfcc', with_cmvn=False))
+    with pytest.raises(ValueError) as err:
+        p.load_cmvn_stats({})
+    assert 'not configured for cmvn' in str(err)
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_pipeline_pickle(utterances_index, audio):
+    config = pipeline.get_default_config('mfcc', with_pitch=False)
+    config['mfcc']['dither'] = 0
+    p1 = pipeline.Pipeline(config)
+    p1.process_many(utterances_index)
+    assert p1._processors
+
+    p2 = pickle.loads(pickle.dumps(p1))
+    assert p2.config == p1.config
+    assert not p2._processors
+    assert p2.process(audio, speaker='spk') == p1.process(audio, speaker='spk')
+
+
+@pytest.mark.parametrize('executor', [None, 'thread', 'process'])
+def test_aprocess(audio, executor):
+    config = pipeline.get_default_config(
+        'mfcc', with_pitch=False, with_cmvn=False)
+    config['mfcc']['dither'] = 0
+    p = pipeline.Pipeline(config)
+    expected = p.process(audio)
+
+    if executor is None:
+        features = _run(p.aprocess(audio))
+    else:
+        cls = (concurrent.futures.ThreadPoolExecutor if executor == 'thread'
+               else concurrent.futures.ProcessPoolExecutor)
+        with cls(2) as pool:
+            features = _run(p.aprocess(audio, executor=pool))
+    assert features == expected
+
+
+@pytest.mark.parametrize(
+    'executor, cmvn', [(e, c) for e in (None, 'thread', 'process')
+                       for c in (None, 'global', 'sliding')])
+def test_aprocess_many(wav_file, executor, cmvn):
+    index = [('u{}'.format(n), wav_file, 's1', n / 10, n / 10 + 0.3)
+             for n in range(10)]
+    config = pipeline.get_default_config(
+        'mfcc', with_pitch=False, with_cmvn=cmvn is not None,
+        sliding_cmvn=cmvn == 'sliding')
+    config['mfcc']['dither'] = 0
+    p = pipeline.Pipeline(config)
+    expected = p.process_many(index)
+
+    async def consume():
+        return {k: v async for k, v in p.aprocess_many(
+            index, executor=executor, max_workers=2, max_pending=2)}
+
+    features = FeaturesCollection(**_run(consume()))
+    assert features == expected
+
+
+def test_aprocess_many_cancel(wav_file, monkeypatch):
+    index = [('u{}'.format(n), wav_file, n / 10, n / 10 + 0.3)
+             for n in range(10)]
+    config = pipeline.get_default_config(
+        'mfcc', with_pitch=False, with_cmvn=False)
+    p = pipeline.Pipeline(config)
+    monkeypatch.setattr(pipeline._Manager, '_max_batch_size', 1)
+
+    async def consume(executor):
+        features = p.aprocess_many(index, executor=executor, max_pending=1)
+        async for utt, _ in features:
+            break
+        await features.aclose()
+        return utt
+
+    assert _run(consume('thread')) in dict(index)
+
+    with pytest.raises(ValueError) as err:
+        _run(consume('bad'))
+    assert 'executor must be' in str(err)
+
+
+def _extract_or_fail(utt_names, manager, log=None):
+    # replaces the features extraction in subprocesses, fails on u3
+    if 'u3' in utt_names:
+        raise ValueError('extraction failed on u3')
+    return [(utt, Features(np.zeros((10, 2)), np.arange(10)))
+            for utt in utt_names]
+
+
+@pytest.mark.skipif(
+    not os.path.isdir('/dev/shm'), reason='requires /dev/shm')
+def test_aprocess_many_error(wav_file, monkeypatch):
+    index = [('u{}'.format(n), wav_file, n / 10, n / 10 + 0.3)
+             for n in range(10)]
+    config = pipeline.get_default_config(
+        'mfcc', with_pitch=False, with_cmvn=False)
+    p = pipeline.Pipeline(config)
+    monkeypatch.setattr(pipeline._Manager, '_max_batch_size', 1)
+    monkeypatch.setattr(pipeline, '_extract_single_pass', _extract_or_fail)
+
+    def shared_blocks():
+        return {f for f in os.listdir('/dev/shm') if f.startswith('psm_')}
+    blocks = shared_blocks()
+
+    async def consume(executor):
+        return {k: v async for k, v in p.aprocess_many(
+            index, executor=executor, max_pending=4)}
+
+    with concurrent.futures.ProcessPoolExecutor(2) as executor:
+        with pytest.raises(ValueError) as err:
+            _run(consume(executor))
+        assert 'extraction failed on u3' in str(err)
+
+    # the shared memory of the arguments and of the results not
+    # consumed is released, the results consumed are released once
+    # garbage collected (they are referenced by the traceback)
+    del err
+    gc.collect()
+    assert shared_blocks() == blocks
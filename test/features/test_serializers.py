@@ -9,9 +9,10 @@ import os
 import pytest
 import shutil
 
-from shennong.features import Features, FeaturesCollection
+from shennong.features import Features, FeaturesCollection, RegularTimes
 from shennong.features.processor.mfcc import MfccProcessor
 import shennong.features.serializers as serializers
+from shennong.utils import get_logger
 
 
 @pytest.fixture()
@@ -100,16 +101,18 @@ def test_load_invalid(tmpdir, mfcc_col):
     h = serializers.get_serializer(FeaturesCollection, f, None)
     h.save(mfcc_col)
 
-    # remove 2 lines in the times array to corrupt the file
+    # remove 2 frames in the (regular) times to corrupt the file
     data = json.load(open(f, 'r'))
-    data['mfcc']['attributes']['_times']['__ndarray__'] = (
-        data['mfcc']['attributes']['_times']['__ndarray__'][2:])
+    data['mfcc']['attributes']['_times']['attributes']['nframes'] -= 2
     open(f, 'w').write(json.dumps(data))
 
     with pytest.raises(ValueError) as err:
         h.load()
     assert 'features not valid in file' in str(err)
 
+    # loading without validation
+    assert not h.load(validate=False).is_valid()
+
 
 def test_save_exists(tmpdir, mfcc_col):
     f = str(tmpdir.join('foo.json'))
@@ -137,6 +140,12 @@ def test_save_invalid(tmpdir, mfcc):
         h.save(feats)
     assert 'features are not valid' in str(err)
 
+    # saving without validation
+    feats = FeaturesCollection(mfcc=Features(
+        mfcc.data, mfcc.times[::-1], validate=False))
+    h.save(feats, validate=False)
+    assert os.path.isfile(f)
+
 
 @pytest.mark.parametrize('serializer', SERIALIZERS)
 def test_simple(mfcc_col, serializer, tmpdir):
@@ -151,6 +160,38 @@ def test_simple(mfcc_col, serializer, tmpdir):
     assert mfcc_col2 == mfcc_col
 
 
+@pytest.mark.parametrize('serializer', SERIALIZERS)
+def test_regular_times(mfcc_col, serializer, tmpdir):
+    filename = ('feats.ark' if serializer is serializers.KaldiSerializer
+                else 'feats')
+    tmpfile = str(tmpdir.join(filename))
+    assert isinstance(mfcc_col['mfcc'].time_axis, RegularTimes)
+
+    serializer(mfcc_col.__class__, tmpfile).save(mfcc_col)
+    mfcc = serializer(mfcc_col.__class__, tmpfile).load()['mfcc']
+    assert mfcc == mfcc_col['mfcc']
+    assert np.array_equal(mfcc.times, mfcc_col['mfcc'].times)
+
+    # h5features requires the times as an array
+    if serializer is serializers.H5featuresSerializer:
+        assert isinstance(mfcc.time_axis, np.ndarray)
+    else:
+        assert mfcc.time_axis == mfcc_col['mfcc'].time_axis
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_numpy_packed(features_collection, compress, tmpdir):
+    packed = features_collection.pack()
+    tmpfile = str(tmpdir.join('feats.npz'))
+    serializers.NumpySerializer(FeaturesCollection, tmpfile).save(
+        packed, compress=compress)
+
+    packed2 = serializers.NumpySerializer(FeaturesCollection, tmpfile).load()
+    assert packed2 == features_collection
+    assert packed2.packed is not None
+    assert list(packed2.keys()) == list(packed.keys())
+    assert np.array_equal(packed2.packed.offsets, packed.packed.offsets)
+
 @pytest.mark.parametrize('serializer', SERIALIZERS)
 def test_times_1d(serializer, tmpdir):
     filename = ('feats.ark' if serializer is serializers.KaldiSerializer
@@ -168,6 +209,21 @@ def test_times_1d(serializer, tmpdir):
     assert col == col2
 
 
+@pytest.mark.parametrize('serializer', SERIALIZERS)
+@pytest.mark.parametrize('dtype', [np.float16, np.float32, np.float64])
+def test_dtype(serializer, dtype, tmpdir):
+    filename = ('feats.ark' if serializer is serializers.KaldiSerializer
+                else 'feats')
+    tmpfile = str(tmpdir.join(filename))
+    feats = FeaturesCollection(a=Features(
+        np.random.random((10, 3)).astype(dtype),
+        RegularTimes(0, 0.01, 0.025, 10)))
+
+    serializer(feats.__class__, tmpfile).save(feats)
+    feats2 = serializer(feats.__class__, tmpfile).load()
+    assert feats2['a'].dtype == dtype
+    assert feats2 == feats
+
 @pytest.mark.parametrize('serializer', SERIALIZERS)
 def test_utf8(mfcc_utf8, serializer, tmpdir):
     filename = ('feats.ark' if serializer is serializers.KaldiSerializer
@@ -245,3 +301,92 @@ def test_kaldiserializer_badfile(tmpdir, mfcc_col, missing):
     with pytest.raises(IOError) as err:
         FeaturesCollection.load(filename)
     assert 'file not found: {}'.format(str(tmpdir.join(missing))) in str(err)
+
+
+@pytest.mark.parametrize('filename, packed, kwargs', [
+    ('feats.npz', False, {}),
+    ('feats.npz', True, {}),
+    ('feats.npz', True, {'compress': False}),
+    ('feats.h5f', False, {}),
+    ('feats.ark', False, {'scp': True})])
+def test_open(features_collection, tmpdir, filename, packed, kwargs):
+    feats = FeaturesCollection(features_collection)
+    # h5features requires times of the same dimension for all items
+    if not filename.endswith('.h5f'):
+        feats['regular'] = Features(
+            np.random.random((5, 10)), RegularTimes(0, 0.01, 0.025, 5))
+    if packed:
+        feats = feats.pack()
+    filename = str(tmpdir.join(filename))
+    feats.save(filename, **kwargs)
+
+    with FeaturesCollection.open(filename) as lazy:
+        assert len(lazy) == len(feats)
+        assert list(lazy.keys()) == list(feats.keys())
+        assert '0' in lazy
+        assert 'missing' not in lazy
+        with pytest.raises(KeyError):
+            lazy['missing']
+
+        for k in feats.keys():
+            assert lazy[k].is_close(feats[k])
+        assert lazy.cache_info() is None
+        assert FeaturesCollection(lazy).is_close(feats)
+
+
+@pytest.mark.parametrize('packed, kwargs, lazy', [
+    (False, {}, False),
+    (False, {'compress': False}, False),
+    (True, {}, False),
+    (True, {'compress': False}, True)])
+def test_open_npz_warning(features_collection, tmpdir, capsys,
+                          packed, kwargs, lazy):
+    get_logger(level='info')
+    feats = features_collection.pack() if packed else features_collection
+    filename = str(tmpdir.join('feats.npz'))
+    feats.save(filename, **kwargs)
+    capsys.readouterr()
+
+    with FeaturesCollection.open(filename) as opened:
+        assert opened['0'].is_close(feats['0'])
+    warned = 'all the features are loaded at opening' in (
+        capsys.readouterr().err)
+    assert warned is not lazy
+
+
+def test_open_cache(features_collection, tmpdir):
+    filename = str(tmpdir.join('feats.h5f'))
+    features_collection.save(filename)
+    nbytes = features_collection['0'].data.nbytes
+
+    lazy = FeaturesCollection.open(filename, cache=nbytes)
+    feats = lazy['0']
+    assert lazy['0'] is feats
+    info = lazy.cache_info()
+    assert (info.hits, info.misses, info.nitems) == (1, 1, 1)
+
+    # a bigger item is not cached
+    if features_collection['1'].data.nbytes > nbytes:
+        assert lazy['1'] is not lazy['1']
+
+    lazy.close()
+    assert lazy.cache_info().nitems == 0
+
+
+def test_open_bad(mfcc_col, tmpdir):
+    filename = str(tmpdir.join('feats.pkl'))
+    mfcc_col.save(filename)
+    with pytest.raises(ValueError) as err:
+        FeaturesCollection.open(filename)
+    assert 'does not support loading features one by one' in str(err)
+
+    # kaldi requires a scp index
+    filename = str(tmpdir.join('feats.ark'))
+    mfcc_col.save(filename)
+    with pytest.raises(IOError) as err:
+        FeaturesCollection.open(filename)
+    assert 'file not found' in str(err)
+
+    with pytest.raises(IOError) as err:
+        FeaturesCollection.open(str(tmpdir.join('missing.h5f')))
+    assert 'file not found' in str(err)
@@ -0,0 +1,191 @@
+"""Test of the module shennong.features.statistics"""
+
+import numpy as np
+import pytest
+
+from shennong.features import Features, FeaturesCollection
+from shennong.features.statistics import (
+    FeaturesStatistics, compute_statistics)
+
+
+def _check(stats, data):
+    assert stats.count == data.shape[0]
+    assert np.allclose(stats.mean, data.mean(axis=0))
+    assert np.allclose(stats.variance, data.var(axis=0))
+    assert np.allclose(stats.std, data.std(axis=0))
+    assert np.array_equal(stats.min, data.min(axis=0))
+    assert np.array_equal(stats.max, data.max(axis=0))
+
+
+def test_params():
+    stats = FeaturesStatistics(3)
+    assert stats.ndims == 3
+    assert stats.count == 0
+    assert np.array_equal(stats.variance, np.zeros((3,)))
+    assert stats.histogram is None
+    assert stats.bin_edges is None
+    with pytest.raises(ValueError) as err:
+        stats.quantile(0.5)
+    assert 'quantiles require histograms' in str(err)
+
+    stats = FeaturesStatistics(3, bins=4, range=(0, [1, 2, 4]))
+    assert stats.histogram.shape == (3, 4)
+    assert np.array_equal(stats.bin_edges[2], [0, 1, 2, 3, 4])
+    with pytest.raises(ValueError) as err:
+        stats.quantile(0.5)
+    assert 'cannot compute quantiles on empty statistics' in str(err)
+
+    for kwargs, error in (
+            ({'ndims': 0}, 'ndims must be a strictly positive integer'),
+            ({'ndims': 1.5}, 'ndims must be a strictly positive integer'),
+            ({'ndims': 1, 'bins': 0},
+             'bins must be a strictly positive integer'),
+            ({'ndims': 1, 'bins': 2}, 'bins specified but range is not'),
+            ({'ndims': 1, 'range': (0, 1)}, 'range specified but bins'),
+            ({'ndims': 1, 'bins': 2, 'range': (1, 0)},
+             'range must be (low, high) with low < high')):
+        with pytest.raises(ValueError) as err:
+            FeaturesStatistics(**kwargs)
+        assert error in str(err)
+
+
+def test_accumulate():
+    data = np.random.random((100, 3)).astype(np.float32)
+    stats = FeaturesStatistics(3)
+    stats.accumulate(Features(data[:30], np.arange(30)))
+    stats.accumulate(data[30:30])
+    stats.accumulate(data[30:])
+    _check(stats, data.astype(np.float64))
+
+    with pytest.raises(ValueError) as err:
+        stats.accumulate(np.zeros((2, 4)))
+    assert 'features must have 3 dimensions but have shape (2, 4)' in str(err)
+
+
+def test_stable():
+    # a large offset with a small variance, the naive sum of squares
+    # formula fails here
+    data = 1e9 + np.random.random((1000, 2))
+    stats = FeaturesStatistics(2)
+    for chunk in np.array_split(data, 10):
+        stats.accumulate(chunk)
+    assert np.allclose(stats.variance, data.var(axis=0), rtol=1e-5)
+
+
+def test_merge():
+    data = np.random.random((100, 2))
+    stats1 = FeaturesStatistics(2, bins=5, range=(0, 1))
+    stats1.accumulate(data[:20])
+    stats2 = FeaturesStatistics(2, bins=5, range=(0, 1))
+    stats2.accumulate(data[20:])
+    assert stats1.merge(stats2) is stats1
+    _check(stats1, data)
+    assert stats1.histogram.sum() == 200
+
+    # merge empty statistics
+    stats1.merge(FeaturesStatistics(2, bins=5, range=(0, 1)))
+    _check(stats1, data)
+
+    with pytest.raises(ValueError) as err:
+        stats1.merge(FeaturesStatistics(3))
+    assert 'cannot merge statistics of different dimensions' in str(err)
+
+    for kwargs in ({}, {'bins': 4, 'range': (0, 1)},
+                   {'bins': 5, 'range': (0, 2)}):
+        with pytest.raises(ValueError) as err:
+            stats1.merge(FeaturesStatistics(2, **kwargs))
+        assert 'cannot merge statistics with different histograms' in str(err)
+
+
+def test_histogram():
+    data = np.random.normal(size=(10000, 2))
+    stats = FeaturesStatistics(2, bins=100, range=(-3, 3))
+    stats.accumulate(data)
+
+    # values out of the range are in the extreme bins
+    clipped = np.clip(data, -3, 3)
+    for d in range(2):
+        assert np.array_equal(
+            stats.histogram[d],
+            np.histogram(clipped[:, d], bins=100, range=(-3, 3))[0])
+
+    assert stats.quantile(0.5).shape == (2,)
+    assert stats.quantile([0.1, 0.5]).shape == (2, 2)
+    assert np.allclose(
+        stats.quantile([0.1, 0.5, 0.9]),
+        np.quantile(data, [0.1, 0.5, 0.9], axis=0), atol=0.05)
+    assert np.array_equal(stats.quantile(0), data.min(axis=0).clip(-3))
+    assert np.array_equal(stats.quantile(1), data.max(axis=0).clip(None, 3))
+
+    with pytest.raises(ValueError) as err:
+        stats.quantile(1.5)
+    assert 'quantiles must be in [0, 1]' in str(err)
+
+
+@pytest.mark.parametrize('njobs', [1, 2])
+def test_collection(features_collection, njobs):
+    data = np.concatenate([f.data for f in features_collection.values()])
+    _check(compute_statistics(features_collection, njobs=njobs), data)
+
+    # packed collection
+    packed = features_collection.pack()
+    _check(compute_statistics(packed, njobs=njobs), data)
+
+    # iterable of (utterance, features)
+    _check(compute_statistics(
+        (item for item in features_collection.items()), njobs=njobs), data)
+
+
+@pytest.mark.parametrize('njobs', [1, 2])
+def test_empty(njobs):
+    assert compute_statistics(FeaturesCollection(), njobs=njobs) is None
+    assert compute_statistics(iter([]), njobs=njobs) is None
+
+    # features without frames, packed or not
+    collection = FeaturesCollection(
+        a=Features(np.zeros((0, 2)), np.zeros((0,))),
+        b=Features(np.zeros((0, 2)), np.zeros((0,))))
+    assert collection.pack().packed.data.shape == (0, 2)
+    assert compute_statistics(collection, njobs=njobs) is None
+    assert compute_statistics(collection.pack(), njobs=njobs) is None
+
+
+@pytest.mark.parametrize('njobs', [1, 2])
+def test_partition(features_collection, njobs):
+    index = {'0': 'a', '1': 'b', '2': 'a'}
+    stats = compute_statistics(
+        features_collection, index=index, bins=10, range=(0, 1), njobs=njobs)
+    assert sorted(stats.keys()) == ['a', 'b']
+
+    for group, collection in features_collection.partition(index).items():
+        data = np.concatenate([f.data for f in collection.values()])
+        _check(stats[group], data)
+        assert stats[group].histogram.sum() == data.size
+
+    with pytest.raises(ValueError) as err:
+        compute_statistics(features_collection, index={'0': 'a'})
+    assert 'following items are not defined in the partition index' in str(err)
+
+    with pytest.raises(ValueError) as err:
+        compute_statistics(
+            iter(features_collection.items()), index={'0': 'a'}, njobs=njobs)
+    assert 'following items are not defined in the partition index' in str(err)
+
+
+def test_bad_dims(features_collection):
+    # do not modify the fixture shared by the other tests
+    collection = FeaturesCollection(features_collection)
+    collection['bad'] = Features(np.random.random((5, 2)), np.arange(5))
+    with pytest.raises(ValueError) as err:
+        compute_statistics(collection)
+    assert 'features must have 10 dimensions' in str(err)
+
+
+def test_lazy(features_collection, tmpdir):
+    filename = str(tmpdir.join('feats.npz'))
+    # a packed and uncompressed collection is memory mapped
+    features_collection.pack().save(filename, compress=False)
+    data = np.concatenate([f.data for f in features_collection.values()])
+
+    with FeaturesCollection.open(filename) as lazy:
+        _check(compute_statistics(lazy, njobs=2), data)
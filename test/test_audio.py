@@ -3,6 +3,9 @@
 import tempfile
 import numpy as np
 import pytest
+import scipy.io.wavfile
+import struct
+import wave
 
 from kaldi.util.table import SequentialWaveReader
 from shennong.audio import Audio
@@ -16,6 +19,60 @@ def test_scan(wav_file, audio):
     assert meta.duration == audio.duration == pytest.approx(1.419, rel=1e-3)
 
 
+def write_extensible(wav_file, data, sample_rate):
+    # write a float32 wav with a WAVE_FORMAT_EXTENSIBLE header and an
+    # extra chunk before the data one
+    data = data.astype(np.float32)
+    nchannels = 1 if data.ndim == 1 else data.shape[1]
+    block_align = 4 * nchannels
+    fmt = struct.pack(
+        '<HHIIHHHHI16s', 0xFFFE, nchannels, sample_rate,
+        sample_rate * block_align, block_align, 32, 22, 32, 0,
+        struct.pack('<H14s', 3, b'\x00\x00\x00\x00\x10\x00\x80\x00'
+                    b'\x00\xaa\x00\x38\x9b\x71'))
+    chunks = (
+        b'fmt ' + struct.pack('<I', len(fmt)) + fmt
+        + b'LIST' + struct.pack('<I', 5) + b'spam\x00\x00'
+        + b'data' + struct.pack('<I', data.nbytes) + data.tobytes())
+    with open(wav_file, 'wb') as fwav:
+        fwav.write(b'RIFF' + struct.pack('<I', 4 + len(chunks)) + b'WAVE')
+        fwav.write(chunks)
+
+
+@pytest.mark.parametrize(
+    'dtype, nchannels', [
+        (d, c) for d in (np.int16, np.int32, np.float32, np.float64, 'ext')
+        for c in (1, 3)])
+def test_scan_formats(tmpdir, dtype, nchannels):
+    data = (np.random.random((1000, nchannels)) - 0.5).squeeze()
+    wav_file = str(tmpdir.join('test.wav'))
+    if dtype == 'ext':
+        write_extensible(wav_file, data, 8000)
+    else:
+        Audio(data, 8000).astype(dtype).save(wav_file)
+
+    meta = Audio.scan(wav_file)
+    audio = Audio.load(wav_file)
+    assert meta.sample_rate == audio.sample_rate == 8000
+    assert meta.nchannels == audio.nchannels == nchannels
+    assert meta.nsamples == audio.nsamples == 1000
+    assert meta.duration == audio.duration == 0.125
+    assert Audio.load_segment(wav_file, 0.01, 0.02) == audio.segment(
+        [(0.01, 0.02)])[0]
+
+
+def test_scan_24bits(tmpdir):
+    wav_file = str(tmpdir.join('test.wav'))
+    with wave.open(wav_file, 'wb') as fwav:
+        fwav.setnchannels(2)
+        fwav.setsampwidth(3)
+        fwav.setframerate(16000)
+        fwav.writeframes(b'\x00' * 6 * 1600)
+
+    meta = Audio.scan(wav_file)
+    assert meta == (2, 16000, 1600, 0.1)
+
+
 def test_scan_bad():
     with pytest.raises(ValueError) as err:
         Audio.scan(__file__)
@@ -35,6 +92,178 @@ def test_load(audio):
     assert audio.dtype == np.int16
 
 
+def test_load_mmap(wav_file, audio):
+    mapped = Audio.load(wav_file, mmap=True)
+    assert isinstance(mapped.data, np.memmap)
+    assert mapped == audio
+
+    # the segments are views on the mapped data
+    chunks = mapped.segment([(0, 0.5), (0.5, 1)])
+    assert all(np.shares_memory(c.data, mapped.data) for c in chunks)
+    assert chunks[0] == audio.segment([(0, 0.5)])[0]
+
+    # copy-on-write: the file is left untouched
+    Audio.cache_clear()
+    mapped = Audio.load(wav_file, mmap=True)
+    mapped.data[:10] = 0
+    Audio.cache_clear()
+    assert Audio.load(wav_file, mmap=True) == audio
+    Audio.cache_clear()
+
+
+@pytest.mark.parametrize('dtype', [np.int16, np.int32, np.float32, np.float64])
+def test_load_segment(tmpdir, dtype):
+    audio = Audio(np.random.random((1000, 2)) - 0.5, 1000).astype(dtype)
+    wav_file = str(tmpdir.join('test.wav'))
+    audio.save(wav_file)
+
+    for tstart, tstop in [(0, 0.1), (0.123, 0.4567), (0.9, 2), (0, 1)]:
+        segment = Audio.load_segment(wav_file, tstart, tstop)
+        assert segment.dtype == dtype
+        assert segment == audio.segment([(tstart, tstop)])[0]
+
+    with pytest.raises(ValueError) as err:
+        Audio.load_segment(wav_file, 0.5, 0.5)
+    assert 'must be sorted' in str(err)
+
+
+def test_load_segment_bad(tmpdir):
+    with pytest.raises(ValueError) as err:
+        Audio.load_segment('/spam/spam/with/eggs', 0, 1)
+    assert 'file not found' in str(err)
+
+    with pytest.raises(ValueError) as err:
+        Audio.load_segment(__file__, 0, 1)
+    assert 'is it a wav?' in str(err)
+
+    wav_file = str(tmpdir.join('test.wav'))
+    scipy.io.wavfile.write(wav_file, 1000, np.zeros((100,), dtype=np.uint8))
+    with pytest.raises(ValueError) as err:
+        Audio.load_segment(wav_file, 0, 1)
+    assert 'unsupported samples format' in str(err)
+
+
+@pytest.mark.parametrize(
+    'duration, overlap', [(0.1, 0), (0.37, 0.1), (1, 0.999), (5, 0)])
+def test_stream(wav_file, audio, duration, overlap):
+    chunks = list(Audio.stream(wav_file, duration, overlap=overlap))
+    assert chunks[-1].nsamples <= chunks[0].nsamples
+
+    size = round(duration * audio.sample_rate)
+    step = round((duration - overlap) * audio.sample_rate)
+    for n, chunk in enumerate(chunks):
+        assert chunk == Audio(
+            audio.data[n * step:n * step + size], audio.sample_rate)
+
+    if overlap == 0:
+        assert np.array_equal(
+            np.concatenate([c.data for c in chunks]), audio.data)
+
+
+@pytest.mark.parametrize('overlap, step', [(0, 1600), (0.01, 1440)])
+def test_stream_long(tmpdir, overlap, step):
+    # on long signals the chunks boundaries must not drift
+    sample_rate = 16000
+    data = (np.arange(600 * sample_rate) % 30011).astype(np.int16)
+    wav_file = str(tmpdir.join('long.wav'))
+    scipy.io.wavfile.write(wav_file, sample_rate, data)
+
+    nchunks = 0
+    for n, chunk in enumerate(Audio.stream(wav_file, 0.1, overlap=overlap)):
+        nchunks += 1
+        istart = n * step
+        assert chunk.nsamples == min(1600, data.shape[0] - istart)
+        assert np.array_equal(chunk.data, data[istart:istart + 1600])
+    assert (nchunks - 1) * step + 1600 >= data.shape[0]
+    assert (nchunks - 2) * step + 1600 < data.shape[0]
+
+
+def test_stream_bad(wav_file):
+    with pytest.raises(ValueError) as err:
+        Audio.stream('/spam/spam/with/eggs', 1)
+    assert 'file not found' in str(err)
+
+    with pytest.raises(ValueError) as err:
+        Audio.stream(wav_file, 0)
+    assert 'chunk_duration must be strictly positive' in str(err)
+
+    for overlap in (-1, 1, 2):
+        with pytest.raises(ValueError) as err:
+            Audio.stream(wav_file, 1, overlap=overlap)
+        assert 'overlap must be in [0, 1[' in str(err)
+
+    with pytest.raises(ValueError) as err:
+        Audio.stream(wav_file, 1, overlap=0.99999)
+    assert 'chunk_duration - overlap must be at least one sample' in str(err)
+
+
+def test_load_cache(wav_file, wav_file_8k, audio):
+    Audio.cache_clear()
+    assert Audio.load(wav_file) is Audio.load(wav_file)
+    assert Audio.cache_info()[:4] == (1, 1, 1, audio.data.nbytes)
+
+    # the mmap and regular loads are cached separately
+    Audio.load(wav_file, mmap=True)
+    assert Audio.cache_info().nitems == 2
+
+    # the least recently used is evicted
+    try:
+        Audio.set_cache_size(audio.data.nbytes * 2)
+        Audio.load(wav_file)
+        Audio.load(wav_file_8k)
+        assert Audio.cache_info().nitems == 2
+        assert Audio.cache_info().hits == 2
+        Audio.load(wav_file)
+        assert Audio.cache_info().hits == 3
+
+        Audio.set_cache_size(0)
+        assert Audio.cache_info().nitems == 0
+        assert Audio.load(wav_file) is not Audio.load(wav_file)
+    finally:
+        Audio.set_cache_size(2 ** 28)
+        Audio.cache_clear()
+
+
+def test_load_cache_mmap(tmpdir):
+    # the memory-mapped signals are counted at a nominal size in the
+    # cache, they do not evict the signals loaded in memory
+    wavs = [str(tmpdir.join('{}.wav'.format(n))) for n in range(4)]
+    for wav in wavs:
+        Audio(np.zeros((16000 * 10,), dtype=np.int16), 16000).save(wav)
+
+    Audio.cache_clear()
+    try:
+        Audio.set_cache_size(2 ** 20)
+        Audio.load(wavs[0])
+        assert Audio.cache_info().currbytes == 320000
+        for wav in wavs:
+            Audio.load(wav, mmap=True)
+        assert Audio.cache_info().nitems == 5
+        assert Audio.cache_info().currbytes == 320000 + 4 * 2 ** 16
+        assert Audio.load(wavs[0]) is Audio.load(wavs[0])
+    finally:
+        Audio.set_cache_size(2 ** 28)
+        Audio.cache_clear()
+
+
+def test_load_cache_maxitems(tmpdir):
+    # each memory-mapped signal holds a file descriptor, the number of
+    # cached signals is bounded whatever their size
+    nitems = Audio._cache.maxitems
+    wavs = [str(tmpdir.join('{}.wav'.format(n))) for n in range(nitems + 10)]
+    for wav in wavs:
+        Audio(np.zeros((100,), dtype=np.int16), 16000).save(wav)
+
+    Audio.cache_clear()
+    try:
+        for wav in wavs:
+            Audio.load(wav, mmap=True)
+        assert Audio.cache_info().nitems == nitems
+        assert Audio.cache_info().misses == nitems + 10
+    finally:
+        Audio.cache_clear()
+
+
 def test_load_notwav():
     with pytest.raises(ValueError) as err:
         Audio.load(__file__)
@@ -166,6 +395,10 @@ def test_isvalid(audio):
     audio4 = Audio(data, audio.sample_rate, validate=False)
     assert not audio4.is_valid()
 
+    # min/max are detected in any block
+    assert Audio._minmax(data, blocksize=5) == (data.min(), data.max())
+    assert Audio._minmax(data[:0]) == (np.inf, -np.inf)
+
     # brutal cast to invalid uint8 dtype
     audio5 = Audio(
         audio.data.astype(np.uint8), audio.sample_rate, validate=False)
@@ -202,6 +435,27 @@ def test_astype(audio_tiny, dtype):
         assert audio4.astype(np.int16).data == pytest.approx(audio.data)
 
 
+@pytest.mark.parametrize('dtype', DTYPES[:-1])
+def test_astype_scales(dtype):
+    # the conversions are the same as scaling in float64
+    units = {np.int16: 2**15, np.int32: 2**30, np.float32: 1, np.float64: 1}
+    data = np.random.random((1000, 2)) * 2 - 1
+    audio = Audio(data, 16000).astype(dtype)
+    for dtype2 in DTYPES[:-1]:
+        expected = (
+            audio.data.astype(np.float64) * units[dtype2] / units[dtype]
+        ).astype(dtype2)
+        assert np.array_equal(audio.astype(dtype2).data, expected)
+
+
+@pytest.mark.parametrize('dtype', DTYPES)
+def test_as_int16_float32(audio_tiny, dtype):
+    audio = audio_tiny.astype(dtype)
+    data = audio.as_int16_float32()
+    assert data.dtype == np.float32
+    assert np.array_equal(data, audio.astype(np.int16).data)
+
+
 @pytest.mark.parametrize(
     'dtype', [np.uint8, np.int64, np.float128, str, int])
 def test_asbadtype(audio, dtype):
@@ -213,7 +467,7 @@ def test_asbadtype(audio, dtype):
 @pytest.mark.parametrize(
     'fs, backend', [
         (f, b) for f in [4000, 8000, 16000, 32000, 44100, 48000]
-        for b in ('sox', 'scipy')])
+        for b in ('polyphase', 'sox', 'scipy')])
 def test_resample(audio, fs, backend):
     audio2 = audio.resample(fs, backend=backend)
     assert audio2.nchannels == audio.nchannels
@@ -235,7 +489,30 @@ def test_resample(audio, fs, backend):
 def test_resample_bad(audio):
     with pytest.raises(ValueError) as err:
         audio.resample(5, backend='a_bad_one')
-    assert 'backend must be sox or scipy, it is' in str(err)
+    assert 'backend must be polyphase, sox or scipy, it is' in str(err)
+
+
+def test_resample_polyphase():
+    # a tone in the passband is preserved, above the Nyquist frequency
+    # it is removed
+    times = np.arange(48000) / 48000
+    for freq, rms in ((7000, 0.5 / np.sqrt(2)), (9000, 0)):
+        audio = Audio(0.5 * np.sin(2 * np.pi * freq * times), 48000)
+        data = audio.resample(16000).data[1000:-1000]
+        assert np.sqrt((data ** 2).mean()) == pytest.approx(rms, abs=1e-4)
+
+    # the filters are cached by resampling ratio
+    Audio._polyphase_filter.cache_clear()
+    audio.resample(16000)
+    audio.resample(8000)
+    audio.resample(16000)
+    assert Audio._polyphase_filter.cache_info().hits == 1
+    assert Audio._polyphase_filter.cache_info().misses == 2
+
+    # no overflow on integers
+    audio = Audio(np.asarray([32767] * 100 + [-32768] * 100, np.int16), 8000)
+    data = audio.resample(16000).data
+    assert data.max() == 32767 and data.min() == -32768
 
 
 def test_compare_kaldi(wav_file):
@@ -267,6 +544,9 @@ def test_segment(audio):
     assert Audio(
         np.concatenate([c.data for c in chunks]), audio.sample_rate) == audio
 
+    # the chunks are views on the original signal
+    assert all(np.shares_memory(c.data, audio.data) for c in chunks)
+
     chunks = audio.segment([(0, d/3), (d/3, 2*d/3), (2*d/3, d)])
     assert all(c.duration == pytest.approx(d/3, rel=1e-3) for c in chunks)
     assert sum(c.nsamples for c in chunks) == audio.nsamples
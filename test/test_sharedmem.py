@@ -0,0 +1,97 @@
+"""Test of the module shennong.sharedmem"""
+
+import concurrent.futures
+import multiprocessing.shared_memory
+import pickle
+import numpy as np
+import pytest
+
+from shennong.audio import Audio
+from shennong.features import Features, FeaturesCollection
+from shennong.sharedmem import (
+    SharedArray, SharedAudio, SharedFeatures, share, unshare, release)
+
+
+def _double(shared):
+    # executed in a subprocess, the data is received and sent back in
+    # shared memory
+    audio = unshare(shared, release=False)
+    return share(Audio(audio.data * 2, audio.sample_rate))
+
+
+@pytest.mark.parametrize('shape', [(0,), (10,), (10, 3)])
+def test_array(shape):
+    array = np.random.random(shape)
+    shared = SharedArray(array)
+    assert np.array_equal(shared.array, array)
+    assert shared.array.dtype == array.dtype
+
+    # attach from a pickled descriptor
+    shared2 = pickle.loads(pickle.dumps(shared))
+    assert shared2.name == shared.name
+    assert np.array_equal(shared2.copy(), array)
+
+    # both instances access the same memory
+    if array.size:
+        shared2.array.flat[0] = 1
+        assert shared.array.flat[0] == 1
+
+    shared2.close()
+    with pytest.raises(ValueError) as err:
+        shared2.array
+    assert 'is closed' in str(err)
+
+    shared.release()
+    shared.release()  # no error
+    with pytest.raises(FileNotFoundError):
+        multiprocessing.shared_memory.SharedMemory(name=shared.name)
+
+
+def test_audio(audio):
+    shared = share(audio)
+    assert isinstance(shared, SharedAudio)
+    assert len(pickle.dumps(shared)) < 300
+
+    audio2 = unshare(pickle.loads(pickle.dumps(shared)))
+    assert audio2 == audio
+    assert not np.shares_memory(audio2.data, audio.data)
+
+    # the audio is a read-only view on the shared memory, released
+    # only once the view is garbage collected
+    assert not audio2.data.flags.writeable
+    with pytest.raises(ValueError):
+        audio2.data[0] = 0
+    data = audio2.data[10:]
+    del audio2
+    assert np.array_equal(data, audio.data[10:])
+    pickle.loads(pickle.dumps(shared)).close()
+
+    del data
+    with pytest.raises(FileNotFoundError):
+        pickle.loads(pickle.dumps(shared))
+    shared.close()
+
+
+def test_features(mfcc):
+    collection = FeaturesCollection(a=mfcc, b=mfcc)
+    obj = [('utt', collection, None, 1)]
+    shared = share(obj)
+    assert isinstance(shared[0][1], FeaturesCollection)
+    assert isinstance(shared[0][1]['a'], SharedFeatures)
+    assert shared[0][2] is None
+
+    obj2 = unshare(pickle.loads(pickle.dumps(shared)), release=False)
+    assert obj2 == obj
+    assert not obj2[0][1]['a'].data.flags.writeable
+    release(shared)
+
+    # the views stay valid after the release
+    assert obj2 == obj
+
+
+def test_process(audio):
+    with concurrent.futures.ProcessPoolExecutor(1) as pool:
+        shared = share(audio)
+        result = pool.submit(_double, shared).result()
+        release(shared)
+    assert unshare(result) == Audio(audio.data * 2, audio.sample_rate)
@@ -1,9 +1,13 @@
 """Test of the module shennong.utils"""
 
+import copy
 import logging
 import numpy as np
 import os
+import pickle
 import pytest
+import threading
+import time
 import shennong.utils as utils
 
 
@@ -98,6 +102,7 @@ def test_dict_equal():
     assert not f({'a': 1}, {'a': 0})
 
     assert f({'a': np.asarray([1, 2])}, {'a': np.asarray([1, 2])})
+    assert f({'a': (1, 2)}, {'a': [1, 2]})
 
 
 def test_listfiles_nodir(data_path):
@@ -119,6 +124,143 @@ def test_listfiles(data_path, abspath, realpath, recursive):
         'test.8k.wav', 'test.float32.wav', 'test.wav']
 
 
+def test_lru_cache():
+    cache = utils.LRUCache(100)
+    assert cache.info() == (0, 0, 0, 0, 100)
+
+    a = cache.get('a', lambda: np.zeros(40, dtype=np.uint8))
+    assert cache.get('a', None) is a
+    cache.get('b', lambda: np.zeros(40, dtype=np.uint8))
+    assert cache.info() == (1, 2, 2, 80, 100)
+
+    # 'b' is the least recently used, evicted by 'c'
+    cache.get('a', None)
+    cache.get('c', lambda: np.zeros(40, dtype=np.uint8))
+    assert cache.info() == (2, 3, 2, 80, 100)
+    assert cache.get('a', None) is a
+    with pytest.raises(TypeError):
+        cache.get('b', None)
+
+    # too big to be cached
+    cache.get('d', lambda: np.zeros(101, dtype=np.uint8))
+    assert cache.info().currbytes == 80
+
+    # reducing the size evicts values
+    cache.maxbytes = 50
+    assert cache.info()[2:] == (1, 40, 50)
+    with pytest.raises(ValueError) as err:
+        cache.maxbytes = -1
+    assert 'cache size must be positive' in str(err)
+
+    cache.clear()
+    assert cache.info() == (0, 0, 0, 0, 50)
+
+
+def test_lru_cache_maxitems():
+    cache = utils.LRUCache(100, maxitems=2)
+    assert cache.maxitems == 2
+    for key in 'abc':
+        cache.get(key, lambda: np.zeros(10, dtype=np.uint8))
+    assert cache.info()[2:4] == (2, 20)
+    assert cache.get('b', None) is not None
+    with pytest.raises(TypeError):
+        cache.get('a', None)
+
+    # reducing the size does not evict more than needed
+    cache.maxbytes = 50
+    assert cache.info().nitems == 2
+
+    assert utils.LRUCache(100).maxitems is None
+    cache = utils.LRUCache(100, maxitems=0)
+    cache.get('a', lambda: np.zeros(10, dtype=np.uint8))
+    assert cache.info().nitems == 0
+
+    with pytest.raises(ValueError) as err:
+        utils.LRUCache(100, maxitems=-1)
+    assert 'cache items must be positive' in str(err)
+
+
+def test_lru_cache_threads():
+    cache = utils.LRUCache(100)
+    nloads = []
+
+    def load():
+        nloads.append(1)
+        time.sleep(0.1)
+        return np.zeros(10)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get(0, load)))
+        for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # loaded only once
+    assert len(nloads) == 1
+    assert all(r is results[0] for r in results)
+    assert cache.info().misses == 1
+    assert cache.info().hits == 9
+
+    # a failed load is not cached
+    def bad_load():
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        cache.get(1, bad_load)
+    assert cache.get(1, load).shape == (10,)
+
+
+def test_frozen_dict():
+    d = utils.freeze({'a': [1, 2], 'b': {'c': np.zeros(2)}, 'd': 0})
+    assert isinstance(d, utils.FrozenDict)
+    assert isinstance(d['b'], utils.FrozenDict)
+    assert d['a'] == (1, 2)
+    assert not d['b']['c'].flags.writeable
+    assert d == {'a': (1, 2), 'b': {'c': d['b']['c']}, 'd': 0}
+
+    for modify in (
+            lambda: d.__setitem__('a', 0),
+            lambda: d.__delitem__('a'),
+            lambda: d.update(a=0),
+            lambda: d.pop('a'),
+            lambda: d.setdefault('e', 0),
+            lambda: d.clear()):
+        with pytest.raises(TypeError) as err:
+            modify()
+        assert 'FrozenDict is read-only' in str(err)
+
+    # copy on write
+    assert copy.copy(d) is d
+    assert copy.deepcopy({'x': d})['x'] is d
+    d2 = d.copy()
+    d2['a'] = 0
+    assert d['a'] == (1, 2)
+
+    d3 = pickle.loads(pickle.dumps(d))
+    assert isinstance(d3, utils.FrozenDict)
+    assert utils.dict_equal(d3, d)
+
+
+def test_intern_dict():
+    d1 = utils.intern_dict({'a': 1, 'b': np.ones(2), 'c': {'d': [1]}})
+    d2 = utils.intern_dict({'a': 1, 'b': np.ones(2), 'c': {'d': [1]}})
+    assert d1 is d2
+    assert utils.intern_dict(d1) is d1
+
+    # types are part of the comparison
+    assert utils.intern_dict({'a': 1}) is not utils.intern_dict({'a': True})
+    assert utils.intern_dict({'b': np.ones(2)}) is not utils.intern_dict(
+        {'b': np.ones(2, dtype=np.float32)})
+
+    # unhashable values are not interned
+    d4 = utils.intern_dict({'a': {1}, 'b': bytearray()})
+    assert isinstance(d4, utils.FrozenDict)
+    assert d4 is not utils.intern_dict({'a': {1}, 'b': bytearray()})
+
+
 def test_catch_exceptions(capsys):
     def f1():
         raise ValueError('foo')